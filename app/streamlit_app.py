@@ -2,12 +2,24 @@ import streamlit as st
 import pandas as pd
 import numpy as np
 import matplotlib.pyplot as plt
-from sklearn.ensemble import RandomForestClassifier, IsolationForest
+from sklearn.ensemble import RandomForestClassifier
 from datetime import date
 from pathlib import Path
+import sys
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+from src.instrumentation import Recorder, enable, instrument, measure, use_recorder
+from src.modeling.backtest_core import Backtest, BarSeries
+from src.modeling.what_if import WhatIfCache
+from src.storage.feature_store import load_features
 
 st.set_page_config(layout="wide")
 
+# Mesures de temps remises à zéro à chaque rerun (panneau en bas de page)
+enable()
+timings = Recorder()
+use_recorder(timings)
+
 # ------------------- 📦 Fonctions ------------------- #
 
 def get_available_assets():
@@ -19,73 +31,97 @@ def get_available_assets():
     ))
     return assets
 
-def load_data(asset):
-    try:
-        base_path = Path(__file__).parent.parent / "data"
-        sentiment_path = base_path / f"daily_sentiment_{asset}_full.csv"
-        price_path = base_path / f"{asset.lower()}_prices.csv"
-
-        sentiment_df = pd.read_csv(sentiment_path)
-        price_df = pd.read_csv(price_path, skiprows=[1])  # Ignore la deuxième ligne (celle avec "SPY,SPY,...")
+# Nombre d'actifs gardés en cache (données + probabilités du modèle)
+MAX_CACHED_ASSETS = 8
 
+def get_data_paths(asset):
+    base_path = Path(__file__).parent.parent / "data"
+    return [
+        base_path / f"daily_sentiment_{asset}_full.csv",
+        base_path / f"{asset.lower()}_prices.csv",
+        base_path / f"sentiment_features_{asset}_full.csv",
+        base_path / "store" / "manifest.json",
+    ]
 
-        sentiment_df["date"] = pd.to_datetime(sentiment_df["date"]).dt.date
-        if "Date" in price_df.columns:
-            price_df["Date"] = pd.to_datetime(price_df["Date"], utc=True).dt.date
-        else:
-            price_df = price_df.reset_index()
-            price_df["Date"] = pd.to_datetime(price_df["index"], utc=True).dt.date
+def get_data_version(asset):
+    # Les mtimes invalident le cache dès qu'un fichier est réécrit
+    return tuple(p.stat().st_mtime if p.exists() else None for p in get_data_paths(asset))
 
-        df = pd.merge(sentiment_df, price_df, left_on="date", right_on="Date", how="inner")
-        df["return"] = df["Close"].pct_change()
-        df["target"] = (df["return"].shift(-1) > 0).astype(int)
-        df["sentiment_change"] = df["avg_sentiment"].diff()
-
-        if df.empty or df[["avg_sentiment", "return"]].dropna().empty:
-            raise ValueError(f"⚠️ Données vides ou inexploitables pour {asset}")
-
-        model = IsolationForest(contamination=0.1, random_state=42)
-        df["anomaly"] = model.fit_predict(df[["avg_sentiment", "return"]].fillna(0))
-
-        return df.dropna().reset_index(drop=True)
+@st.cache_data(max_entries=MAX_CACHED_ASSETS, show_spinner="Chargement des données...")
+def load_asset_frame(asset, data_version):
+    # Features du feature store (data/features/) : seules les nouvelles dates sont calculées
+    return load_features(asset, "full", Path(__file__).parent.parent / "data")
 
+@instrument("load_data", rows=len)
+def load_data(asset):
+    try:
+        return load_asset_frame(asset, get_data_version(asset))
     except Exception as e:
         st.warning(str(e))
         return pd.DataFrame()
 
-def compute_alerts(df, threshold):
-    return (df["avg_sentiment"] < threshold) | (df["anomaly"] == -1)
-
-def simulate_strategy(df, proba_threshold, use_alerts, enable_short, short_threshold):
-    X = df[["avg_sentiment", "sentiment_change", "return", "anomaly"]]
-    y = df["target"]
+@st.cache_data(max_entries=MAX_CACHED_ASSETS, show_spinner="Entraînement du modèle...")
+def fit_probabilities(asset, data_version, _df):
+    # Les features ne dépendent d'aucun seuil : un seul fit par actif et version des données
+    X = _df[["avg_sentiment", "sentiment_change", "return", "anomaly"]]
+    y = _df["target"]
     model = RandomForestClassifier(n_estimators=100, random_state=42)
     model.fit(X, y)
-    proba = model.predict_proba(X)[:, 1]
-    df["proba"] = proba
+    return model.predict_proba(X)[:, 1]
 
-    if enable_short:
-        df["position"] = 0
-        df.loc[(proba > proba_threshold) & (df["alert"] == 0), "position"] = 1
-        df.loc[df["avg_sentiment"] < short_threshold, "position"] = -1
-    elif use_alerts:
-        df["position"] = ((proba > proba_threshold) & (df["alert"] == 1)).astype(int)
-    else:
-        df["position"] = (proba > proba_threshold).astype(int)
-
-    df["strategy_return"] = df["return"] * df["position"]
-    df["cum_strategy"] = (1 + df["strategy_return"]).cumprod()
-    df["cum_buy_hold"] = (1 + df["return"]).cumprod()
-    return df, model
-
-def compute_metrics(df):
-    strat = df["strategy_return"]
-    cum_return = df["cum_strategy"].iloc[-1] - 1
-    volatility = strat.std() * np.sqrt(252)
-    sharpe = strat.mean() / strat.std() * np.sqrt(252) if strat.std() > 0 else 0
-    drawdown = (df["cum_strategy"].cummax() - df["cum_strategy"]).max()
-    exposure = df["position"].abs().sum() / len(df)
-    return cum_return, sharpe, drawdown, exposure
+@instrument("simulate_strategy", rows=len)
+def simulate_strategy(df, proba, sentiment_threshold, proba_threshold, use_alerts, enable_short, short_threshold):
+    # Backtest sur tableaux préalloués (backtest_core) : aucune colonne ajoutée au DataFrame en cache
+    bars = BarSeries.from_frame(df, proba)
+    if use_alerts:
+        bars.set_alerts(sentiment_threshold)
+    return Backtest(bars).run(proba_threshold, use_alerts, enable_short, short_threshold)
+
+@instrument("compute_metrics")
+def compute_metrics(backtest):
+    cum_return, sharpe, drawdown, _ = backtest.metrics()
+    return cum_return, sharpe, drawdown, backtest.exposure()
+
+def get_what_if(asset, data_version, df, proba):
+    # Métriques de toutes les positions des sliders, calculées en arrière-plan une fois par
+    # actif et version des données. Changer d'actif annule les calculs inachevés.
+    caches = st.session_state.setdefault("what_if", {})
+    key = (asset, data_version)
+    for other in [k for k, cache in caches.items() if k != key and not cache.finished]:
+        caches.pop(other).cancel()
+    if key not in caches:
+        caches[key] = WhatIfCache(df, proba).start()
+        while len(caches) > MAX_CACHED_ASSETS:
+            caches.pop(next(iter(caches)))
+    return caches[key]
+
+def render_sharpe_heatmap(what_if):
+    matrix = what_if.sharpe_matrix(use_alerts, enable_short, short_threshold)
+    if what_if.error is not None:
+        st.warning(f"Calcul what-if interrompu : {what_if.error}")
+    elif not what_if.finished:
+        st.progress(what_if.progress, text=f"Calcul des scénarios : {what_if.progress:.0%}")
+    elif not was_finished:
+        st.rerun()  # dernier rafraîchissement : KPIs servis par le cache
+    if matrix.isna().all().all():
+        return
+
+    fig, ax = plt.subplots(figsize=(12, 6))
+    image = ax.imshow(matrix.to_numpy(), aspect="auto", origin="lower", cmap="RdYlGn")
+    ax.set_xticks(range(len(matrix.columns)), [f"{p:.2f}" for p in matrix.columns])
+    ax.set_yticks(range(0, len(matrix.index), 4), [f"{s:.2f}" for s in matrix.index[::4]])
+    ax.set_xlabel("Seuil proba modèle")
+    ax.set_ylabel("Seuil de sentiment (alerte)")
+    fig.colorbar(image, ax=ax, label="Sharpe")
+    # Position actuelle des sliders
+    ax.scatter([np.abs(matrix.columns - proba_threshold).argmin()], [np.abs(matrix.index - sentiment_threshold).argmin()],
+               marker="o", s=120, facecolors="none", edgecolors="black", linewidths=2)
+    st.pyplot(fig)
+    plt.close(fig)
+
+    best = matrix.stack().idxmax()
+    st.caption(f"Meilleur Sharpe : {matrix.loc[best]:.2f} (sentiment {best[0]:.2f}, proba {best[1]:.2f})"
+               + ("" if use_alerts else " — condition alerte désactivée : le seuil de sentiment est sans effet"))
 
 # ------------------- 🎛️ Interface ------------------- #
 
@@ -109,48 +145,46 @@ df = load_data(selected_asset)
 if df.empty:
     st.stop()
 
-# Détection des alertes uniquement si nécessaire
-# Détection des alertes uniquement si nécessaire
-# Par défaut, colonne alert = False
-df["alert"] = False
+with measure("fit_probabilities", rows=len(df)):
+    proba = fit_probabilities(selected_asset, get_data_version(selected_asset), df)
+backtest = simulate_strategy(df, proba, sentiment_threshold, proba_threshold, use_alerts, enable_short, short_threshold)
 
-# Cas où alertes sont utilisées (conditionnelles à checkbox ou short)
-if use_alerts or enable_short:
-    alert_flags = compute_alerts(df, sentiment_threshold)
-    if use_alerts:
-        df["alert"] = alert_flags  # utilisé pour condition d'entrée
-    elif enable_short:
-        # On ne met pas à jour df["alert"], mais on envoie `alert_flags` à simulate_strategy
-        df["computed_alert"] = alert_flags
+# KPIs servis par le cache what-if dès que le scénario est calculé
+what_if = get_what_if(selected_asset, get_data_version(selected_asset), df, proba)
+was_finished = what_if.finished
+cached_metrics = what_if.get(proba_threshold, sentiment_threshold, short_threshold, use_alerts, enable_short)
+ret, sharpe, dd, exposure = cached_metrics if cached_metrics is not None else compute_metrics(backtest)
 
-df, model = simulate_strategy(df, proba_threshold, use_alerts, enable_short, short_threshold)
-ret, sharpe, dd, exposure = compute_metrics(df)
+# DataFrame uniquement pour le graphique
+df = backtest.to_frame()
 
 # ------------------- 📈 Visualisation ------------------- #
 
 st.subheader(f"📈 Performance cumulée : {selected_asset}")
 
-fig, ax = plt.subplots(figsize=(12, 5))
-ax.plot(df["date"], df["cum_buy_hold"], label="Buy & Hold", linewidth=2)
-ax.plot(df["date"], df["cum_strategy"], label="Stratégie ML", linestyle="--", linewidth=2)
-y_min = min(df["cum_buy_hold"].min(), df["cum_strategy"].min()) * 0.98
-y_max = max(df["cum_buy_hold"].max(), df["cum_strategy"].max()) * 1.02
-ax.set_ylim(y_min, y_max)
+with measure("render_chart", rows=len(df)):
+    fig, ax = plt.subplots(figsize=(12, 5))
+    ax.plot(df["date"], df["cum_buy_hold"], label="Buy & Hold", linewidth=2)
+    ax.plot(df["date"], df["cum_strategy"], label="Stratégie ML", linestyle="--", linewidth=2)
+    y_min = min(df["cum_buy_hold"].min(), df["cum_strategy"].min()) * 0.98
+    y_max = max(df["cum_buy_hold"].max(), df["cum_strategy"].max()) * 1.02
+    ax.set_ylim(y_min, y_max)
 
-# Alertes
-ax.scatter(df[df["alert"]]["date"], df[df["alert"]]["cum_buy_hold"], color="red", label="Alertes", marker="x")
+    # Alertes
+    ax.scatter(df[df["alert"]]["date"], df[df["alert"]]["cum_buy_hold"], color="red", label="Alertes", marker="x")
 
-# Positions longues
-ax.fill_between(df["date"], 0, df["cum_strategy"], where=df["position"]==1, color="green", alpha=0.4, label="Long")
+    # Positions longues
+    ax.fill_between(df["date"], 0, df["cum_strategy"], where=df["position"]==1, color="green", alpha=0.4, label="Long")
 
-# Positions short
-if enable_short:
-    ax.fill_between(df["date"], 0, df["cum_strategy"], where=df["position"]==-1, color="red", alpha=0.4, label="Short")
+    # Positions short
+    if enable_short:
+        ax.fill_between(df["date"], 0, df["cum_strategy"], where=df["position"]==-1, color="red", alpha=0.4, label="Short")
 
-ax.set_ylabel("Performance cumulée")
-ax.legend()
-ax.grid(True)
-st.pyplot(fig)
+    ax.set_ylabel("Performance cumulée")
+    ax.legend()
+    ax.grid(True)
+    st.pyplot(fig)
+    plt.close(fig)
 
 # ------------------- 🧮 KPIs ------------------- #
 
@@ -161,7 +195,25 @@ col2.metric("📏 Sharpe", f"{sharpe:.2f}")
 col3.metric("📉 Max Drawdown", f"{dd:.2%}")
 col4.metric("⏱️ % Temps Investi", f"{exposure:.2%}")
 
+# ------------------- 🗺️ Scénarios ------------------- #
+
+st.markdown("### 🗺️ Sharpe par seuils (proba × sentiment)")
+# Rafraîchi chaque seconde tant que le calcul en arrière-plan n'est pas terminé
+st.fragment(run_every=None if was_finished else 1.0)(render_sharpe_heatmap)(what_if)
+
 # ------------------- ℹ️ Note ------------------- #
 
 st.info("⚠️ Les données sentimentales sont spécifiques à chaque actif. Si le graphique est vide, le scraping est sans doute incomplet.")
 
+# ------------------- ⏱️ Temps d'exécution ------------------- #
+
+with st.expander("⏱️ Temps d'exécution (ce rerun)", expanded=False):
+    # Les étapes en cache Streamlit apparaissent avec leur temps de lecture du cache
+    timing_df = pd.DataFrame(timings.summary())
+    if timing_df.empty:
+        st.write("Aucune mesure.")
+    else:
+        st.dataframe(timing_df, hide_index=True, width="stretch")
+        col_json, col_prom = st.columns(2)
+        col_json.download_button("JSON", timings.to_json(), "timings.json", "application/json")
+        col_prom.download_button("Prometheus", timings.to_prometheus(), "timings.prom", "text/plain")
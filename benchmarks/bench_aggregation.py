@@ -0,0 +1,63 @@
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from src.nlp.sentiment_aggregation import resample_sentiment
+
+# --------------- POSTS SYNTHÉTIQUES --------------- #
+
+def make_posts(n_posts, n_days=365, seed=42):
+    rng = np.random.default_rng(seed)
+    start = 1_704_067_200  # 2024-01-01 UTC
+    return pd.DataFrame({
+        "created_utc": start + rng.integers(0, n_days * 86400, n_posts),
+        "sentiment": rng.uniform(-1, 1, n_posts),
+        "score": rng.integers(0, 1000, n_posts),
+        "num_comments": rng.integers(0, 200, n_posts),
+    })
+
+# --------------- RÉFÉRENCE GROUPBY --------------- #
+
+def groupby_stats(posts):
+    # Chemin historique : objets date Python puis un groupby par statistique
+    df = posts.copy()
+    df["date"] = pd.to_datetime(df["created_utc"], unit="s").dt.date
+    grouped = df.groupby("date")["sentiment"]
+    weights = df["score"].clip(lower=0) + 1
+    return pd.DataFrame({
+        "sentiment_mean": grouped.mean(),
+        "n_posts": grouped.size(),
+        "sentiment_std": grouped.std(),
+        "sentiment_score_weighted": (df["sentiment"] * weights).groupby(df["date"]).sum()
+                                    / weights.groupby(df["date"]).sum(),
+        "sentiment_q10": grouped.quantile(0.1),
+        "sentiment_q50": grouped.quantile(0.5),
+        "sentiment_q90": grouped.quantile(0.9),
+    })
+
+# --------------- BENCHMARK --------------- #
+
+def run_benchmark(n_posts):
+    posts = make_posts(n_posts)
+
+    start = time.perf_counter()
+    reference = groupby_stats(posts)
+    t_ref = time.perf_counter() - start
+    print(f"  groupby sur objets date : {t_ref * 1000:8.1f} ms")
+
+    start = time.perf_counter()
+    buckets = resample_sentiment(posts, freq="1d")
+    t_new = time.perf_counter() - start
+    print(f"  resample_sentiment (int64, une passe) : {t_new * 1000:8.1f} ms  (x{t_ref / t_new:.1f})")
+
+    for column in reference.columns:
+        assert np.allclose(buckets[column].to_numpy(dtype=float), reference[column].to_numpy(dtype=float))
+    print(f"✅ Statistiques identiques sur {len(buckets)} jours")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Agrégation multi-statistiques du sentiment : groupby vs une passe int64")
+    parser.add_argument("--posts", type=int, default=1_000_000)
+    args = parser.parse_args()
+    run_benchmark(args.posts)
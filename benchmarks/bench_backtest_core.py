@@ -0,0 +1,76 @@
+import argparse
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+from src.modeling.backtest_core import Backtest, BarSeries
+from src.modeling.compute_performance import apply_positions, compute_alerts, compute_metrics
+
+# --------------- BARRES SYNTHÉTIQUES --------------- #
+
+def make_bars(n_bars, seed=42):
+    # Barres horaires : rendements faibles, sentiment et probabilités uniformes
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        "date": np.arange(n_bars, dtype=np.int64),
+        "return": rng.normal(0, 0.002, n_bars),
+        "avg_sentiment": rng.uniform(-1, 1, n_bars),
+        "anomaly": np.where(rng.random(n_bars) < 0.1, -1, 1),
+        "proba": np.round(rng.random(n_bars), 2),
+    })
+
+# --------------- CHEMINS COMPARÉS --------------- #
+
+def pandas_path(df, strategy):
+    df = df.copy()
+    df["alert"] = compute_alerts(df, strategy["sentiment_threshold"])
+    df = apply_positions(df, strategy["proba_threshold"], strategy["use_alerts"],
+                         strategy["enable_short"], strategy["short_threshold"])
+    return compute_metrics(df)
+
+def core_path(backtest, strategy):
+    backtest.bars.set_alerts(strategy["sentiment_threshold"])
+    return backtest.run(strategy["proba_threshold"], strategy["use_alerts"],
+                        strategy["enable_short"], strategy["short_threshold"]).metrics()
+
+def measure(fn, repeat):
+    # (secondes par appel, pic mémoire Python alloué pendant les appels)
+    tracemalloc.start()
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = fn()
+    seconds = (time.perf_counter() - start) / repeat
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return result, seconds, peak
+
+# --------------- BENCHMARK --------------- #
+
+def run_benchmark(n_bars, repeat):
+    df = make_bars(n_bars)
+    strategy = {"sentiment_threshold": -0.3, "proba_threshold": 0.6, "use_alerts": True,
+                "enable_short": True, "short_threshold": -0.7}
+
+    bars = BarSeries(df["date"], df["return"], df["avg_sentiment"], df["anomaly"], df["proba"])
+    backtest = Backtest(bars)
+    core_path(backtest, strategy)  # tampons déjà alloués : on mesure le régime établi
+
+    expected, t_pandas, m_pandas = measure(lambda: pandas_path(df, strategy), repeat)
+    result, t_core, m_core = measure(lambda: core_path(backtest, strategy), repeat)
+    assert np.allclose(result, expected, rtol=1e-4, atol=1e-6), (result, expected)
+
+    print(f"\n⏱️ Backtest + métriques, {n_bars:,} barres :")
+    print(f"  DataFrame (apply_positions + compute_metrics) : {t_pandas * 1000:8.1f} ms, pic {m_pandas / 1e6:8.1f} Mo")
+    print(f"  Tableaux préalloués (backtest_core)           : {t_core * 1000:8.1f} ms, pic {m_core / 1e6:8.1f} Mo"
+          f"  (x{t_pandas / t_core:.1f})")
+    print(f"  Tampons backtest_core : {sum(a.nbytes for a in (backtest.position, backtest.strategy_return, backtest.equity, backtest.drawdown, backtest.buy_hold)) / 1e6:.1f} Mo")
+    print("✅ Métriques identiques (tolérance float32)")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Backtest DataFrame vs tableaux NumPy préalloués")
+    parser.add_argument("--bars", type=int, default=2_000_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    run_benchmark(args.bars, args.repeat)
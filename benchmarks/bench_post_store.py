@@ -0,0 +1,77 @@
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.synthetic import add_sentiment, make_reddit_posts, parse_size
+from src.config import ASSETS, PERIODS
+from src.data_collection.reddit_ingestion import KeywordMatcher, period_bounds
+from src.storage.post_store import PostStore, derive_clean_text, memory_report, route_keys
+
+# --------------- ROUTAGE SYNTHÉTIQUE --------------- #
+
+def route_posts(posts):
+    # Indices des posts de chaque (actif, période) : subreddit suivi, mot-clé et fenêtre
+    matcher = KeywordMatcher({asset: config["keywords"] for asset, config in ASSETS.items()})
+    text = posts["title"] + " " + posts["selftext"]
+    codes, uniques = pd.factorize(text)
+    tags = pd.Series([matcher.match(t) for t in uniques], dtype=object).take(codes).to_numpy()
+    created = posts["created_utc"].to_numpy().astype("datetime64[s]").astype(np.int64)
+
+    routes = {}
+    for asset, config in ASSETS.items():
+        followed = posts["subreddit"].isin(config["subreddits"]).to_numpy()
+        tagged = np.fromiter((asset in t for t in tags), dtype=bool, count=len(tags))
+        for period_name, (start, end) in PERIODS.items():
+            after, before = period_bounds(start, end)
+            routes[(asset, period_name)] = np.flatnonzero(followed & tagged & (created >= after) & (created <= before))
+    return routes
+
+def legacy_frames(posts, routes):
+    # Ancien format : un DataFrame par fichier, textes dérivés et date stockés par ligne
+    scored = posts.assign(full_text=posts["title"].fillna("") + " " + posts["selftext"].fillna(""))
+    scored["clean_text"] = derive_clean_text(scored["full_text"])
+    scored["date"] = scored["created_utc"].dt.date
+    scored = scored[["id", "title", "selftext", "score", "num_comments", "created_utc", "subreddit",
+                     "full_text", "clean_text", "sentiment", "date"]]
+    return {key: scored.take(rows).reset_index(drop=True) for key, rows in routes.items()}
+
+# --------------- BENCHMARK --------------- #
+
+def run_benchmark(n_posts):
+    posts = add_sentiment(make_reddit_posts(n_posts, n_days=365, start="2024-08-01"))
+    posts["sentiment"] = posts["sentiment"].round(4)  # compound VADER : 4 décimales
+    routes = route_posts(posts)
+    used = np.unique(np.concatenate(list(routes.values())))
+    print(f"⏱️ {n_posts:,} posts générés, {len(used):,} routés vers au moins un (actif, période)")
+
+    start = time.perf_counter()
+    frames = legacy_frames(posts, routes)
+    t_legacy = time.perf_counter() - start
+    legacy_bytes = sum(int(df.memory_usage(deep=True).sum()) for df in frames.values())
+    legacy_rows = sum(len(df) for df in frames.values())
+
+    start = time.perf_counter()
+    store = PostStore(route_keys())
+    store.add({key: posts.take(rows) for key, rows in routes.items()})
+    t_store = time.perf_counter() - start
+
+    # Même contenu qu'un fichier de l'ancien format (ordre de première apparition)
+    key = max(frames, key=lambda k: len(frames[k]))
+    expected = frames[key].sort_values("id").reset_index(drop=True)
+    result = store.frame(*key).sort_values("id").reset_index(drop=True)
+    pd.testing.assert_frame_equal(result, expected, check_dtype=False)
+
+    print(f"  Construction : ancien format {t_legacy:.1f}s, store {t_store:.1f}s")
+    print("  Colonnes du store :")
+    for column, nbytes in store.posts.memory_usage(deep=True, index=False).items():
+        print(f"    {column:<14} {str(store.posts[column].dtype):<16} {nbytes / 1e6:8.1f} Mo")
+    memory_report(store, legacy_bytes, legacy_rows)
+    print(f"✅ store.frame{key} identique au fichier reddit_{key[0]}_{key[1]}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Mémoire des posts bruts : fichiers par (actif, période) vs store dédupliqué")
+    parser.add_argument("--posts", default="1M", help="1k, 10k, 100k, 1M ou un entier")
+    args = parser.parse_args()
+    run_benchmark(parse_size(args.posts))
@@ -0,0 +1,48 @@
+import argparse
+import random
+import time
+
+from src.preprocessing.text_cleaning import preprocess_batch, preprocess_pipeline
+
+# --------------- CORPUS SYNTHÉTIQUE --------------- #
+
+WORDS = ["the", "market", "is", "going", "to", "moon", "calls", "puts", "earnings", "were", "great",
+         "terrible", "buying", "selling", "holding", "stocks", "tesla", "spy", "rates", "fed", "crash"]
+NOISE = ["🚀🚀", "$TSLA", "420.69", "!!!", "https://reddit.com/r/wallstreetbets/xyz", "YOLO", "...", "#DD"]
+
+def make_reddit_corpus(n_docs, duplicate_ratio=0.15, seed=42):
+    rng = random.Random(seed)
+    docs = []
+    for _ in range(n_docs):
+        if docs and rng.random() < duplicate_ratio:
+            docs.append(rng.choice(docs))
+            continue
+        tokens = [rng.choice(NOISE if rng.random() < 0.15 else WORDS) for _ in range(rng.randint(3, 80))]
+        docs.append(" ".join(tokens).capitalize())
+    return docs
+
+# --------------- BENCHMARK --------------- #
+
+def run_benchmark(n_docs, batch_size, n_process):
+    docs = make_reddit_corpus(n_docs)
+
+    start = time.perf_counter()
+    baseline = [preprocess_pipeline(d) for d in docs]
+    t_base = time.perf_counter() - start
+    print(f"  preprocess_pipeline (1 doc à la fois) : {n_docs / t_base:>8.0f} docs/s")
+
+    start = time.perf_counter()
+    batched = preprocess_batch(docs, batch_size=batch_size, n_process=n_process)
+    t_batch = time.perf_counter() - start
+    print(f"  preprocess_batch (nlp.pipe, {n_process} proc)  : {n_docs / t_batch:>8.0f} docs/s  (x{t_base / t_batch:.1f})")
+
+    same = sum(a == b for a, b in zip(baseline, batched))
+    print(f"✅ Sorties identiques : {same}/{n_docs}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Débit du prétraitement texte (docs/s)")
+    parser.add_argument("--docs", type=int, default=5000)
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--processes", type=int, default=1)
+    args = parser.parse_args()
+    run_benchmark(args.docs, args.batch_size, args.processes)
@@ -0,0 +1,87 @@
+import argparse
+import tempfile
+import time
+from datetime import date
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from src.storage.parquet_store import migrate_csvs, read_frame
+
+ASSETS = ["SPY", "BTC", "QQQ", "TSLA"]
+
+# --------------- DONNÉES SYNTHÉTIQUES --------------- #
+
+def write_synthetic_csvs(data_dir, n_days, seed=42):
+    rng = np.random.default_rng(seed)
+    dates = pd.date_range("2000-01-03", periods=n_days, freq="D")
+    for asset in ASSETS:
+        close = 100 * np.cumprod(1 + rng.normal(0, 0.01, n_days))
+        prices = pd.DataFrame({
+            "Price": dates.strftime("%Y-%m-%d"),
+            "Close": close, "High": close * 1.01, "Low": close * 0.99,
+            "Open": close, "Volume": rng.integers(1e6, 1e7, n_days),
+        })
+        # Même forme que les CSV yfinance : ligne "Ticker" puis ligne "Date"
+        header = pd.DataFrame([["Ticker"] + [asset] * 5, ["Date"] + [""] * 5], columns=prices.columns)
+        pd.concat([header, prices]).to_csv(data_dir / f"{asset.lower()}_prices.csv", index=False)
+
+        sentiment = pd.DataFrame({
+            "date": dates.strftime("%Y-%m-%d"),
+            "avg_sentiment": rng.uniform(-1, 1, n_days),
+        })
+        sentiment.to_csv(data_dir / f"daily_sentiment_{asset}_full.csv", index=False)
+
+def legacy_read(data_dir, asset, start, end):
+    # Chemin historique : relecture complète + reconversion des dates
+    sentiment_df = pd.read_csv(data_dir / f"daily_sentiment_{asset}_full.csv")
+    price_df = pd.read_csv(data_dir / f"{asset.lower()}_prices.csv", skiprows=[1, 2])
+    price_df = price_df.rename(columns={"Price": "Date"})
+    sentiment_df["date"] = pd.to_datetime(sentiment_df["date"]).dt.date
+    price_df["Date"] = pd.to_datetime(price_df["Date"], utc=True).dt.date
+    sentiment_df = sentiment_df[(sentiment_df["date"] >= start) & (sentiment_df["date"] <= end)]
+    price_df = price_df[(price_df["Date"] >= start) & (price_df["Date"] <= end)]
+    return sentiment_df, price_df
+
+def store_read(data_dir, asset, start, end):
+    sentiment_df = read_frame(data_dir / f"daily_sentiment_{asset}_full.csv", start, end)
+    price_df = read_frame(data_dir / f"{asset.lower()}_prices.csv", start, end)
+    return sentiment_df, price_df
+
+# --------------- BENCHMARK --------------- #
+
+def time_reads(fn, data_dir, start, end, repeat):
+    timings = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        for asset in ASSETS:
+            fn(data_dir, asset, start, end)
+        timings.append(time.perf_counter() - t0)
+    return min(timings) / len(ASSETS)
+
+def run_benchmark(n_days, repeat):
+    with tempfile.TemporaryDirectory() as tmp:
+        data_dir = Path(tmp)
+        write_synthetic_csvs(data_dir, n_days)
+        start, end = date(2010, 1, 1), date(2010, 3, 31)
+
+        t_csv = time_reads(legacy_read, data_dir, start, end, repeat)
+        migrate_csvs(data_dir)
+        t_store = time_reads(store_read, data_dir, start, end, repeat)
+
+        s_csv, p_csv = legacy_read(data_dir, "SPY", start, end)
+        s_store, p_store = store_read(data_dir, "SPY", start, end)
+        assert s_csv["date"].tolist() == s_store["date"].tolist()
+        assert np.allclose(p_csv["Close"].astype(float), p_store["Close"])
+
+        print(f"📅 {n_days} jours par actif, lecture de {start} → {end}")
+        print(f"  CSV + reconversion dates : {t_csv * 1000:8.2f} ms / actif")
+        print(f"  Parquet (pushdown, mmap) : {t_store * 1000:8.2f} ms / actif  (x{t_csv / t_store:.1f})")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Latence de lecture CSV vs store Parquet")
+    parser.add_argument("--days", type=int, default=9000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    run_benchmark(args.days, args.repeat)
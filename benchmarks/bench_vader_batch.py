@@ -0,0 +1,58 @@
+import argparse
+import os
+import random
+import time
+
+import numpy as np
+import pandas as pd
+
+from src.nlp.sentiment_analysis import apply_vader
+from src.nlp.batch_scoring import BatchVaderScorer
+
+# --------------- CORPUS SYNTHÉTIQUE --------------- #
+
+SENTIMENT_WORDS = ["good", "bad", "great", "crash", "love", "hate", "win", "loss", "bullish", "fear", "happy", "panic"]
+NEUTRAL_WORDS = ["spy", "calls", "puts", "market", "today", "earnings", "fed", "rate", "index", "tesla", "the", "is", "not", "but", "very"]
+
+def make_corpus(n_posts, duplicate_ratio=0.2, seed=42):
+    rng = random.Random(seed)
+    posts = []
+    for _ in range(n_posts):
+        if posts and rng.random() < duplicate_ratio:
+            posts.append(rng.choice(posts))
+            continue
+        n_words = rng.randint(0, 60)
+        words = [rng.choice(SENTIMENT_WORDS if rng.random() < 0.1 else NEUTRAL_WORDS) for _ in range(n_words)]
+        posts.append(" ".join(words))
+    return pd.Series(posts)
+
+# --------------- BENCHMARK --------------- #
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - start
+
+def run_benchmark(n_posts, n_jobs):
+    texts = make_corpus(n_posts)
+    print(f"📝 Corpus : {len(texts)} posts ({texts.nunique()} uniques)")
+
+    baseline, t_base = timed(lambda: texts.apply(apply_vader).to_numpy())
+    print(f"  apply_vader (boucle)   : {n_posts / t_base:>10.0f} posts/s")
+
+    batch, t_batch = timed(lambda: BatchVaderScorer().score(texts)["compound"])
+    print(f"  batch (1 process)      : {n_posts / t_batch:>10.0f} posts/s  (x{t_base / t_batch:.1f})")
+
+    pooled, t_pool = timed(lambda: BatchVaderScorer().score(texts, n_jobs=n_jobs)["compound"])
+    print(f"  batch ({n_jobs} process)      : {n_posts / t_pool:>10.0f} posts/s  (x{t_base / t_pool:.1f})")
+
+    assert np.array_equal(baseline, batch), "❌ Scores batch différents de apply_vader"
+    assert np.array_equal(baseline, pooled), "❌ Scores pool différents de apply_vader"
+    print("✅ Scores identiques à apply_vader")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark du scoring VADER par lots")
+    parser.add_argument("--posts", type=int, default=50000)
+    parser.add_argument("--jobs", type=int, default=os.cpu_count())
+    args = parser.parse_args()
+    run_benchmark(args.posts, args.jobs)
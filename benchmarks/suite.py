@@ -0,0 +1,331 @@
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+
+from benchmarks.synthetic import (
+    add_sentiment, make_daily_sentiment, make_price_series, make_reddit_posts, parse_size, write_market_data
+)
+
+# --------------- CONFIG --------------- #
+
+RESULTS_DIR = Path("data/cache/benchmarks")
+
+# Seuil par défaut de compare : +10 % sur la médiane = régression
+DEFAULT_THRESHOLD = 0.10
+
+# Étapes coûteuses par ligne plafonnées (10M posts dans spaCy = des heures)
+BENCHMARKS = {}
+
+def benchmark(name, max_rows=None):
+    # setup(ctx, n) → (fonction à chronométrer, nombre de lignes traitées)
+    def decorator(setup):
+        BENCHMARKS[name] = {"setup": setup, "max_rows": max_rows}
+        return setup
+    return decorator
+
+class Context:
+    # Données synthétiques partagées, générées à la demande
+
+    def __init__(self, n_posts, n_days, workdir):
+        self.n_posts = n_posts
+        self.n_days = n_days
+        self.workdir = Path(workdir)
+        self.data_dir = self.workdir / "data"
+        self.data_dir.mkdir(parents=True, exist_ok=True)
+        self._posts = None
+        self._market = False
+
+    def posts(self, n=None):
+        if self._posts is None:
+            self._posts = add_sentiment(make_reddit_posts(self.n_posts))
+        return self._posts if n is None else self._posts.iloc[:n]
+
+    def texts(self, n=None):
+        posts = self.posts(n)
+        return posts["title"] + " " + posts["selftext"]
+
+    def market(self):
+        if not self._market:
+            write_market_data(self.data_dir, self.n_days)
+            self._market = True
+        return self.data_dir
+
+# --------------- NLP --------------- #
+
+@benchmark("clean_text")
+def bench_clean_text(ctx, n):
+    from src.preprocessing.text_cleaning import clean_text
+    texts = ctx.texts(n)
+    return lambda: texts.map(clean_text), len(texts)
+
+@benchmark("preprocess_pipeline", max_rows=2_000)
+def bench_preprocess_pipeline(ctx, n):
+    from src.preprocessing.text_cleaning import preprocess_pipeline
+    texts = ctx.texts(n)
+    return lambda: [preprocess_pipeline(t) for t in texts], len(texts)
+
+@benchmark("preprocess_batch", max_rows=20_000)
+def bench_preprocess_batch(ctx, n):
+    from src.preprocessing.text_cleaning import preprocess_batch
+    texts = ctx.texts(n)
+    return lambda: preprocess_batch(texts), len(texts)
+
+@benchmark("apply_vader", max_rows=100_000)
+def bench_apply_vader(ctx, n):
+    from src.nlp.sentiment_analysis import apply_vader
+    texts = ctx.texts(n)
+    return lambda: texts.map(apply_vader), len(texts)
+
+@benchmark("vader_batch", max_rows=1_000_000)
+def bench_vader_batch(ctx, n):
+    from src.nlp.batch_scoring import score_texts
+    texts = ctx.texts(n)
+    return lambda: score_texts(texts), len(texts)
+
+# --------------- AGRÉGATION --------------- #
+
+@benchmark("aggregate_sentiment_by_day")
+def bench_aggregate_by_day(ctx, n):
+    from src.nlp.sentiment_aggregation import aggregate_sentiment_by_day
+    input_path = ctx.data_dir / "bench_reddit_sentiment.csv"
+    output_path = ctx.data_dir / "bench_daily_sentiment.csv"
+    ctx.posts(n)[["created_utc", "sentiment"]].to_csv(input_path, index=False)
+    return lambda: aggregate_sentiment_by_day(input_path, output_path), n
+
+@benchmark("resample_sentiment")
+def bench_resample_sentiment(ctx, n):
+    from src.nlp.sentiment_aggregation import resample_sentiment
+    posts = ctx.posts(n)
+    return lambda: resample_sentiment(posts, freq="1d"), len(posts)
+
+@benchmark("merge_sentiment_periods")
+def bench_merge_periods(ctx, n):
+    # merge_sentiment_periods lit data/daily_sentiment_<période>.csv (répertoire de travail)
+    from src.data_collection.merge_sentiment_periods import PERIODS_TO_INCLUDE, merge_sentiment_periods
+    prices = make_price_series(ctx.n_days)
+    for i, period in enumerate(PERIODS_TO_INCLUDE):
+        make_daily_sentiment(prices["Date"], seed=i).to_csv(ctx.data_dir / f"daily_sentiment_{period}.csv", index=False)
+    return merge_sentiment_periods, ctx.n_days * len(PERIODS_TO_INCLUDE)
+
+# --------------- MODÉLISATION --------------- #
+
+@benchmark("load_data")
+def bench_load_data(ctx, n):
+    # À froid : cache mémoire du loader vidé à chaque appel
+    from src.modeling.compute_performance import load_data
+    from src.storage.market_data import clear_cache
+    ctx.market()
+
+    def run():
+        clear_cache()
+        return load_data("SPY", "full")
+    return run, ctx.n_days
+
+def strategy_frame(ctx):
+    from src.modeling.compute_performance import compute_alerts, load_data
+    ctx.market()
+    df = load_data("SPY", "full")
+    df["alert"] = compute_alerts(df, -0.3)
+    return df
+
+@benchmark("simulate_strategy")
+def bench_simulate_strategy(ctx, n):
+    from src.modeling.compute_performance import simulate_strategy
+    df = strategy_frame(ctx)
+    return lambda: simulate_strategy(df.copy(), 0.6, True, False, -0.7), len(df)
+
+@benchmark("compute_metrics")
+def bench_compute_metrics(ctx, n):
+    from src.modeling.compute_performance import compute_metrics, simulate_strategy
+    df, _ = simulate_strategy(strategy_frame(ctx), 0.6, True, False, -0.7)
+    return lambda: compute_metrics(df), len(df)
+
+@benchmark("build_features")
+def bench_build_features(ctx, n):
+    # Fichiers écrits par write_asset_period_dataset (daily_sentiment avec n_posts +
+    # sentiment_features) → feature store ; vérifie n_posts au passage
+    import pandas as pd
+
+    from benchmarks.synthetic import write_price_csv
+    from src.data_collection.build_asset_datasets import write_asset_period_dataset
+    from src.storage.feature_store import build_features, load_source_frame
+    from src.storage.market_data import price_path
+
+    posts = ctx.posts(n)
+    write_price_csv(price_path("BENCH", ctx.data_dir), make_price_series(ctx.n_days, start="2024-08-01"), "BENCH")
+    with contextlib.redirect_stdout(io.StringIO()):
+        write_asset_period_dataset("BENCH", "bench", posts.assign(date=posts["created_utc"].dt.date))
+
+    source = load_source_frame("BENCH", "bench", ctx.data_dir)
+    daily = pd.read_csv(ctx.data_dir / "daily_sentiment_BENCH_bench.csv", parse_dates=["date"])
+    expected = source["date"].map(dict(zip(daily["date"].dt.date, daily["n_posts"]))).fillna(0)
+    assert (source["n_posts"] == expected).all(), "n_posts du feature store ≠ fichier journalier"
+    return lambda: build_features(source), len(source)
+
+@benchmark("backtest_core")
+def bench_backtest_core(ctx, n):
+    # Une barre par post (données horaires multi-actifs) : tampons réutilisés entre les runs
+    from benchmarks.bench_backtest_core import make_bars
+    from src.modeling.backtest_core import Backtest, BarSeries
+    df = make_bars(n)
+    backtest = Backtest(BarSeries(df["date"], df["return"], df["avg_sentiment"], df["anomaly"], df["proba"]))
+    backtest.bars.set_alerts(-0.3)
+    return lambda: backtest.run(0.6, True, True, -0.7).metrics(), n
+
+# --------------- EXÉCUTION --------------- #
+
+def time_call(fn, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        # Les messages des étapes (✅ ... sauvegardé) ne polluent pas le rapport
+        with contextlib.redirect_stdout(io.StringIO()):
+            fn()
+        timings.append(time.perf_counter() - start)
+    return timings
+
+def git_revision():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def run_suite(n_posts, n_days, only=None, repeat=3):
+    names = [name for name in BENCHMARKS if not only or any(name.startswith(p) for p in only)]
+    results = {}
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp:
+        ctx = Context(n_posts, n_days, tmp)
+        os.chdir(tmp)  # les étapes qui lisent data/... trouvent les données synthétiques
+        try:
+            for name in names:
+                spec = BENCHMARKS[name]
+                n = min(n_posts, spec["max_rows"]) if spec["max_rows"] else n_posts
+                try:
+                    fn, rows = spec["setup"](ctx, n)
+                    timings = time_call(fn, repeat)
+                except KeyError:
+                    # Colonne absente = bug, pas une dépendance manquante (KeyError ⊂ LookupError)
+                    raise
+                except (ImportError, LookupError, OSError) as e:
+                    # Dépendance ou modèle absent (spaCy, lexique VADER hors ligne, ...)
+                    print(f"⏭️ {name} ignoré : {e}")
+                    results[name] = {"skipped": str(e)}
+                    continue
+                median = statistics.median(timings)
+                results[name] = {
+                    "rows": rows,
+                    "repeat": repeat,
+                    "min_s": min(timings),
+                    "median_s": median,
+                    "mean_s": statistics.fmean(timings),
+                    "rows_per_s": rows / median if median > 0 else None,
+                }
+                print(f"  {name:<28} {rows:>10,} lignes  {median * 1000:>10.1f} ms  "
+                      f"{results[name]['rows_per_s'] or 0:>14,.0f} lignes/s")
+        finally:
+            os.chdir(cwd)
+
+    return {
+        "meta": {
+            "created": datetime.now().isoformat(timespec="seconds"),
+            "git": git_revision(),
+            "python": sys.version.split()[0],
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+            "numpy": np.__version__,
+            "n_posts": n_posts,
+            "n_days": n_days,
+        },
+        "results": results,
+    }
+
+def save_results(report, output=None):
+    if output is None:
+        output = RESULTS_DIR / f"{datetime.now():%Y%m%d-%H%M%S}.json"
+    output = Path(output)
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2))
+    print(f"✅ Résultats enregistrés → {output}")
+    return output
+
+# --------------- COMPARAISON --------------- #
+
+def compare_reports(base, new, threshold=DEFAULT_THRESHOLD):
+    # Ratio des médianes par benchmark ; au-delà de 1 + threshold = régression
+    rows = []
+    for name in new["results"]:
+        before, after = base["results"].get(name, {}), new["results"][name]
+        if "median_s" not in before or "median_s" not in after:
+            continue
+        ratio = after["median_s"] / before["median_s"]
+        if before.get("rows") != after.get("rows"):
+            status = "taille différente"
+        elif ratio > 1 + threshold:
+            status = "régression"
+        elif ratio < 1 - threshold:
+            status = "amélioration"
+        else:
+            status = "stable"
+        rows.append({"name": name, "before": before["median_s"], "after": after["median_s"],
+                     "ratio": ratio, "status": status})
+    return rows
+
+def print_comparison(rows):
+    icons = {"régression": "❌", "amélioration": "✅", "stable": "  ", "taille différente": "⚠️"}
+    print(f"\n{'':2} {'benchmark':<28} {'avant':>10} {'après':>10} {'ratio':>7}")
+    for row in rows:
+        print(f"{icons[row['status']]} {row['name']:<28} {row['before'] * 1000:>8.1f}ms "
+              f"{row['after'] * 1000:>8.1f}ms {row['ratio']:>6.2f}x  {row['status']}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Suite de benchmarks du pipeline sur données synthétiques")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="exécute les benchmarks et enregistre un JSON")
+    run_parser.add_argument("--posts", default="100k", help="1k, 10k, 100k, 1M, 10M ou un entier")
+    run_parser.add_argument("--days", type=int, default=2500)
+    run_parser.add_argument("--only", nargs="+", default=None, help="préfixes de noms de benchmarks")
+    run_parser.add_argument("--repeat", type=int, default=3)
+    run_parser.add_argument("--output", default=None)
+
+    compare_parser = commands.add_parser("compare", help="compare deux JSON, code retour 1 si régression")
+    compare_parser.add_argument("base")
+    compare_parser.add_argument("new")
+    compare_parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD)
+
+    commands.add_parser("list", help="liste les benchmarks")
+    args = parser.parse_args()
+
+    if args.command == "list":
+        for name, spec in BENCHMARKS.items():
+            print(f"{name:<28} {'max ' + format(spec['max_rows'], ',') + ' lignes' if spec['max_rows'] else ''}")
+    elif args.command == "run":
+        n_posts = parse_size(args.posts)
+        print(f"⏱️ {n_posts:,} posts, {args.days} jours, {args.repeat} répétitions")
+        report = run_suite(n_posts, args.days, args.only, args.repeat)
+        save_results(report, args.output)
+    else:
+        base = json.loads(Path(args.base).read_text())
+        new = json.loads(Path(args.new).read_text())
+        rows = compare_reports(base, new, args.threshold)
+        print_comparison(rows)
+        regressions = [row["name"] for row in rows if row["status"] == "régression"]
+        if regressions:
+            print(f"\n❌ {len(regressions)} régression(s) au-delà de +{args.threshold:.0%} : {', '.join(regressions)}")
+            sys.exit(1)
+        print(f"\n✅ Aucune régression au-delà de +{args.threshold:.0%}")
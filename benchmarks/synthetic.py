@@ -0,0 +1,111 @@
+import numpy as np
+import pandas as pd
+
+from src.config import PRICE_TICKERS
+from src.storage.market_data import price_path, sentiment_path
+
+# Générateurs déterministes (même seed → mêmes données) pour mesurer le pipeline
+# sans accès Reddit / Yahoo. Vectorisés : 10M posts en moins d'une minute.
+
+SIZES = {"1k": 1_000, "10k": 10_000, "100k": 100_000, "1M": 1_000_000, "10M": 10_000_000}
+
+SENTIMENT_WORDS = ["good", "bad", "great", "crash", "love", "hate", "win", "loss", "bullish", "bearish",
+                   "fear", "happy", "panic", "moon", "dump", "amazing", "terrible", "not", "very"]
+NEUTRAL_WORDS = ["spy", "calls", "puts", "market", "today", "earnings", "fed", "rate", "index", "tesla",
+                 "the", "is", "and", "for", "this", "week", "bitcoin", "nasdaq", "qqq", "btc", "elon", "yolo"]
+# Bruit retiré par clean_text (URLs, tickers, chiffres, ponctuation, emojis)
+NOISE_TOKENS = ["https://www.reddit.com/r/wallstreetbets", "$SPY", "100%", "3.5", "!!!", "🚀", "DD:", "(edit)"]
+
+SUBREDDITS = ["wallstreetbets", "investing", "stocks", "cryptocurrency", "Bitcoin", "TeslaMotors"]
+
+def parse_size(value):
+    # "10k", "1M" ou un entier
+    if value in SIZES:
+        return SIZES[value]
+    return int(float(value.lower().replace("k", "e3").replace("m", "e6")))
+
+# --------------- POSTS REDDIT --------------- #
+
+def make_text_pool(n_texts, max_words=60, seed=42):
+    # Textes uniques, mots tirés en bloc puis découpés à une longueur aléatoire
+    rng = np.random.default_rng(seed)
+    vocabulary = np.array(SENTIMENT_WORDS + NEUTRAL_WORDS + NOISE_TOKENS, dtype=object)
+    weights = np.concatenate([
+        np.full(len(SENTIMENT_WORDS), 1.0), np.full(len(NEUTRAL_WORDS), 6.0), np.full(len(NOISE_TOKENS), 0.5)
+    ])
+    words = rng.choice(vocabulary, size=(n_texts, max_words), p=weights / weights.sum())
+    lengths = rng.integers(0, max_words + 1, n_texts)
+    return np.array([" ".join(row[:n]) for row, n in zip(words, lengths)], dtype=object)
+
+def make_reddit_posts(n_posts, n_days=365, start="2024-08-01", n_unique=50_000, seed=42):
+    # Mêmes colonnes que submission_to_post ; les textes sont tirés d'un pool de
+    # n_unique textes (doublons comme sur Reddit : reposts, titres courts, selftext vide)
+    rng = np.random.default_rng(seed)
+    pool_size = max(min(n_posts, n_unique), 1)
+    titles = make_text_pool(pool_size, max_words=15, seed=seed)
+    bodies = make_text_pool(pool_size, max_words=80, seed=seed + 1)
+    bodies[rng.random(pool_size) < 0.3] = ""
+    # take sur une colonne str déjà construite : pas de conversion objet → str par post
+    titles, bodies = pd.Series(titles, dtype="str"), pd.Series(bodies, dtype="str")
+
+    start_s = pd.Timestamp(start).value // 10**9
+    created = np.sort(start_s + rng.integers(0, n_days * 86400, n_posts))
+    return pd.DataFrame({
+        "id": pd.Index(np.arange(n_posts)).map("p{:07x}".format),
+        "title": titles.take(rng.integers(0, pool_size, n_posts)).reset_index(drop=True),
+        "selftext": bodies.take(rng.integers(0, pool_size, n_posts)).reset_index(drop=True),
+        "score": rng.pareto(1.5, n_posts).astype(np.int64),
+        "num_comments": rng.pareto(2.0, n_posts).astype(np.int64),
+        "created_utc": pd.to_datetime(created, unit="s"),
+        "subreddit": pd.Series(SUBREDDITS, dtype="str").take(rng.integers(0, len(SUBREDDITS), n_posts)).reset_index(drop=True),
+    })
+
+def add_sentiment(posts, seed=42):
+    # Colonne sentiment comme après run_sentiment_analysis (sans passer par VADER)
+    rng = np.random.default_rng(seed)
+    return posts.assign(sentiment=np.clip(rng.normal(0.05, 0.4, len(posts)), -1, 1))
+
+# --------------- PRIX ET SENTIMENT JOURNALIER --------------- #
+
+def make_price_series(n_days, start="2000-01-03", seed=42):
+    # Marche aléatoire géométrique, jours ouvrés, colonnes yfinance
+    rng = np.random.default_rng(seed)
+    dates = pd.bdate_range(start, periods=n_days)
+    close = 100 * np.cumprod(1 + rng.normal(0.0003, 0.012, n_days))
+    spread = np.abs(rng.normal(0, 0.006, n_days))
+    return pd.DataFrame({
+        "Date": dates,
+        "Close": close,
+        "High": close * (1 + spread),
+        "Low": close * (1 - spread),
+        "Open": close * (1 + rng.normal(0, 0.003, n_days)),
+        "Volume": rng.integers(1_000_000, 10_000_000, n_days),
+    })
+
+def make_daily_sentiment(dates, seed=42):
+    # AR(1) borné dans [-1, 1] : le sentiment d'un jour ressemble à celui de la veille
+    rng = np.random.default_rng(seed)
+    noise = rng.normal(0, 0.15, len(dates))
+    values = np.empty(len(dates))
+    level = 0.0
+    for i, eps in enumerate(noise):
+        level = 0.8 * level + eps
+        values[i] = level
+    return pd.DataFrame({"date": pd.DatetimeIndex(dates).strftime("%Y-%m-%d"), "avg_sentiment": np.tanh(values)})
+
+def write_price_csv(path, prices, ticker):
+    # Même forme que les CSV yfinance : ligne "Ticker" puis ligne "Date"
+    flat = prices.rename(columns={"Date": "Price"}).assign(Price=prices["Date"].dt.strftime("%Y-%m-%d"))
+    header = pd.DataFrame([["Ticker"] + [ticker] * 5, ["Date"] + [""] * 5], columns=flat.columns)
+    pd.concat([header, flat]).to_csv(path, index=False)
+
+def write_market_data(data_dir, n_days, assets=None, period_key="full", seed=42):
+    # data/<asset>_prices.csv + data/daily_sentiment_<ASSET>_<période>.csv pour chaque actif
+    assets = list(PRICE_TICKERS) if assets is None else assets
+    for i, asset in enumerate(assets):
+        prices = make_price_series(n_days, seed=seed + i)
+        write_price_csv(price_path(asset, data_dir), prices, PRICE_TICKERS.get(asset, asset))
+        make_daily_sentiment(prices["Date"], seed=seed + 100 + i).to_csv(
+            sentiment_path(asset, period_key, data_dir), index=False
+        )
+    return assets
@@ -0,0 +1,48 @@
+# --------------- ACTIFS À SCRAPER --------------- #
+
+ASSETS = {
+    "SPY": {
+        "subreddits": ["wallstreetbets", "investing", "stocks", "SPY"],
+        "keywords": ["s&p", "sp500", "spy", "index"]
+    },
+    "BTC": {
+        "subreddits": ["cryptocurrency", "Bitcoin", "CryptoMarkets"],
+        "keywords": ["btc", "bitcoin", "satoshi", "crypto"]
+    },
+    "QQQ": {
+        "subreddits": ["wallstreetbets", "investing", "stocks"],
+        "keywords": ["qqq", "nasdaq", "tech index"]
+    },
+    "TSLA": {
+        "subreddits": ["wallstreetbets", "TeslaMotors", "stocks"],
+        "keywords": ["tsla", "tesla", "elon", "model 3"]
+    }
+}
+
+# --------------- PÉRIODES À SCRAPER --------------- #
+
+PERIODS = {
+    "aout_dec2024": ("2024-08-01", "2024-12-31"),
+    "janv_avr2025": ("2025-01-01", "2025-04-11"),
+    "mars2025": ("2025-03-01", "2025-03-31")
+}
+
+# Périodes fusionnées par merge_sentiment_periods (fichiers sans actif)
+MERGE_PERIODS = [
+    "aout_dec2024",
+    "jan_avr2025"
+]
+
+# --------------- TICKERS DE PRIX (yfinance) --------------- #
+
+PRICE_TICKERS = {
+    "SPY": "SPY",
+    "BTC": "BTC-USD",
+    "QQQ": "QQQ",
+    "TSLA": "TSLA"
+}
+
+PRICE_START = "2024-08-01"
+
+# Cotés en continu (24/7) : pas de calendrier de bourse, agrégats par jour calendaire UTC
+CONTINUOUS_ASSETS = {"BTC"}
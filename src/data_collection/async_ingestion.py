@@ -0,0 +1,409 @@
+import argparse
+import asyncio
+import inspect
+import json
+import random
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from src.config import ASSETS, PERIODS
+from src.data_collection.reddit_ingestion import (
+    KeywordMatcher, period_bounds, plan_ingestion, submission_to_post, utc_datetime,
+)
+
+# --------------- CONFIG --------------- #
+
+DEFAULT_CONCURRENCY = 8
+STREAM_PATH = Path("data/cache/raw/reddit_stream.jsonl")
+
+# Erreurs de quota / serveur rejouées avec backoff (asyncprawcore + mock local)
+RETRYABLE_ERRORS = {"TooManyRequests", "ServerError", "RequestException", "TimeoutError"}
+
+# --------------- BACKOFF --------------- #
+
+def is_retryable(error):
+    return type(error).__name__ in RETRYABLE_ERRORS or hasattr(error, "retry_after")
+
+def backoff_delay(attempt, base_delay=1.0, max_delay=60.0):
+    # Exponentiel à gigue complète : les appelants refusés ensemble ne reviennent pas ensemble
+    return random.uniform(0, min(max_delay, base_delay * 2 ** attempt))
+
+# --------------- ENREGISTREMENTS --------------- #
+
+def comment_to_record(comment, submission_id, subreddit_name):
+    # Mêmes colonnes que submission_to_post : le texte du commentaire dans selftext
+    return {
+        "id": comment.id,
+        "title": "",
+        "selftext": comment.body,
+        "score": comment.score,
+        "num_comments": 0,
+        "created_utc": utc_datetime(comment.created_utc),
+        "subreddit": subreddit_name,
+        "kind": "comment",
+        "link_id": submission_id,
+        "parent_id": comment.parent_id,
+    }
+
+class JsonlSink:
+    # Une ligne JSON par enregistrement, écrite dès réception
+
+    def __init__(self, path=STREAM_PATH):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = open(self.path, "a")
+
+    async def write(self, keys, record):
+        line = json.dumps({**record, "routes": [list(k) for k in keys]}, default=str)
+        self._file.write(line + "\n")
+
+    async def close(self):
+        self._file.close()
+
+class RawStoreSink:
+    # Ajout par lots dans data/reddit_<ASSET>_<période>.csv (append_posts : scoring VADER,
+    # agrégats journaliers) hors de la boucle asyncio. Un seul thread dédié : le cache
+    # sentiment SQLite reste sur le thread qui l'a ouvert et deux lots d'un même fichier
+    # ne sont jamais ajoutés en même temps.
+
+    def __init__(self, flush_every=1000):
+        self.flush_every = flush_every
+        self.buffers = defaultdict(list)
+        self.written = defaultdict(int)
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="raw-store")
+
+    async def write(self, keys, record):
+        for key in keys:
+            self.buffers[key].append(dict(record))
+            if len(self.buffers[key]) >= self.flush_every:
+                await self._flush(key)
+
+    async def _flush(self, key):
+        from src.data_collection.incremental_ingestion import append_posts
+
+        posts, self.buffers[key] = self.buffers[key], []
+        if posts:
+            loop = asyncio.get_running_loop()
+            # Features (quantiles, écarts-types) recalculées une seule fois par fichier, à la fermeture
+            self.written[key] += await loop.run_in_executor(
+                self._executor, append_posts, key[0], key[1], posts, False
+            )
+
+    async def close(self):
+        from src.data_collection.incremental_ingestion import rebuild_features
+
+        loop = asyncio.get_running_loop()
+        try:
+            for key in list(self.buffers):
+                await self._flush(key)
+            for key, n in self.written.items():
+                if n:
+                    await loop.run_in_executor(self._executor, rebuild_features, *key)
+        finally:
+            self._executor.shutdown(wait=True)
+        for (asset, period_name), n in sorted(self.written.items()):
+            print(f"➕ {asset} — {period_name} : {n} posts / commentaires ajoutés")
+
+# --------------- COLLECTEUR --------------- #
+
+class AsyncCollector:
+    # Soumissions de tous les subreddits en parallèle, arbres de commentaires des
+    # soumissions retenues par une file de workers. Chaque appel API prend un des
+    # max_concurrency créneaux ; un 429 libère son créneau pendant l'attente.
+
+    def __init__(self, reddit, sink, max_concurrency=DEFAULT_CONCURRENCY, with_comments=True,
+                 max_retries=6, base_delay=1.0):
+        self.reddit = reddit
+        self.sink = sink
+        self.max_concurrency = max_concurrency
+        self.with_comments = with_comments
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.stats = defaultdict(int)
+
+    async def _call(self, make_call):
+        for attempt in range(self.max_retries + 1):
+            # Après un 429, plus aucun appel avant le Retry-After (quota partagé par tous)
+            wait = self._resume_at - time.monotonic()
+            if wait > 0:
+                await asyncio.sleep(wait)
+            try:
+                async with self._slots:
+                    return await make_call()
+            except StopAsyncIteration:
+                raise
+            except Exception as e:
+                if not is_retryable(e) or attempt == self.max_retries:
+                    raise
+                self.stats["retries"] += 1
+                retry_after = getattr(e, "retry_after", None)
+                if retry_after:
+                    self._resume_at = max(self._resume_at, time.monotonic() + retry_after)
+                await asyncio.sleep(backoff_delay(attempt, self.base_delay))
+
+    async def _emit(self, keys, record):
+        self.stats[record.get("kind", "submission") + "s"] += 1
+        await self.sink.write(keys, record)
+
+    async def _scan_subreddit(self, name, routes, matcher, limit, queue):
+        # new() est trié du plus récent au plus ancien : arrêt sous la plus ancienne fenêtre
+        oldest_after = min(after for _, _, after, _ in routes)
+        subreddit = await self._call(lambda: self.reddit.subreddit(name))
+        listing = subreddit.new(limit=limit).__aiter__()
+        while True:
+            try:
+                submission = await self._call(listing.__anext__)
+            except StopAsyncIteration:
+                break
+            created = submission.created_utc
+            if created < oldest_after:
+                break
+            open_routes = [(a, p) for a, p, after, before in routes if after <= created <= before]
+            if not open_routes:
+                continue
+            tags = matcher.match(f"{submission.title} {submission.selftext}")
+            keys = [key for key in open_routes if key[0] in tags]
+            if not keys:
+                continue
+            await self._emit(keys, {**submission_to_post(submission, name), "kind": "submission",
+                                    "link_id": submission.id, "parent_id": None})
+            if self.with_comments:
+                # File bornée : le scan attend si les workers de commentaires sont en retard
+                await queue.put((submission, name, keys))
+
+    async def _comment_worker(self, queue):
+        while True:
+            item = await queue.get()
+            try:
+                if item is None:
+                    return
+                submission, name, keys = item
+                await self._call(submission.load)
+                await self._call(lambda: submission.comments.replace_more(limit=0))
+                comments = submission.comments.list()
+                if inspect.isawaitable(comments):  # coroutine selon la version d'asyncpraw
+                    comments = await comments
+                for comment in comments:
+                    await self._emit(keys, comment_to_record(comment, submission.id, name))
+            except Exception as e:
+                self.stats["errors"] += 1
+                print(f"⚠️ Commentaires de {item[0].id} ignorés : {e}")
+            finally:
+                queue.task_done()
+
+    async def collect(self, assets=ASSETS, periods=PERIODS, limit=1000):
+        self._slots = asyncio.Semaphore(self.max_concurrency)
+        self._resume_at = 0.0
+        matcher = KeywordMatcher({asset: config["keywords"] for asset, config in assets.items()})
+        queue = asyncio.Queue(maxsize=self.max_concurrency * 4)
+        workers = [asyncio.create_task(self._comment_worker(queue)) for _ in range(self.max_concurrency)]
+
+        start = time.perf_counter()
+        plan = plan_ingestion(assets, periods)
+        results = await asyncio.gather(
+            *(self._scan_subreddit(sub, routes, matcher, limit, queue) for sub, routes in plan.items()),
+            return_exceptions=True,
+        )
+        for sub, result in zip(plan, results):
+            if isinstance(result, Exception):
+                self.stats["errors"] += 1
+                print(f"❌ r/{sub} : {result}")
+
+        for _ in workers:
+            await queue.put(None)
+        await asyncio.gather(*workers)
+        await self.sink.close()
+
+        seconds = time.perf_counter() - start
+        records = self.stats["submissions"] + self.stats["comments"]
+        return {"submissions": 0, "comments": 0, "retries": 0, "errors": 0, **self.stats, "records": records, "seconds": seconds,
+                "records_per_s": records / seconds if seconds > 0 else 0.0}
+
+# --------------- SOURCE REDDIT LOCALE (MOCK ASYNCHRONE) --------------- #
+
+class TooManyRequests(Exception):
+    # Même nom que l'erreur 429 d'asyncprawcore
+
+    def __init__(self, retry_after):
+        super().__init__(f"429, réessayer dans {retry_after:.2f}s")
+        self.retry_after = retry_after
+
+class _MockComment:
+    def __init__(self, id, body, score, created_utc, parent_id):
+        self.id, self.body, self.score = id, body, score
+        self.created_utc, self.parent_id = created_utc, parent_id
+
+class _MockCommentForest:
+    def __init__(self, reddit, comments):
+        self._reddit = reddit
+        self._comments = comments
+
+    async def replace_more(self, limit=0):
+        await self._reddit._request()
+        return []
+
+    def list(self):
+        return list(self._comments)
+
+class _MockSubmission:
+    def __init__(self, reddit, data):
+        self._reddit = reddit
+        for field in ("id", "title", "selftext", "score", "num_comments", "created_utc"):
+            setattr(self, field, data[field])
+        self.comments = _MockCommentForest(reddit, [
+            _MockComment(c["id"], c["body"], c["score"], c["created_utc"], c.get("parent_id", f"t3_{data['id']}"))
+            for c in data.get("comments", [])
+        ])
+
+    async def load(self):
+        await self._reddit._request()
+        return self
+
+class _MockListing:
+    # Comme ListingGenerator : une requête par page, __anext__ peut être rejoué après un 429
+
+    def __init__(self, reddit, submissions, limit, page_size):
+        self._reddit = reddit
+        self._submissions = submissions if limit is None else submissions[:limit]
+        self._page_size = page_size
+        self._position = 0
+        self._loaded = 0
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        if self._position >= len(self._submissions):
+            raise StopAsyncIteration
+        if self._position >= self._loaded:
+            await self._reddit._request()
+            self._loaded += self._page_size
+        submission = self._submissions[self._position]
+        self._position += 1
+        return submission
+
+class _MockSubreddit:
+    def __init__(self, reddit, submissions):
+        self._reddit = reddit
+        self._submissions = submissions
+
+    def new(self, limit=100):
+        return _MockListing(self._reddit, self._submissions, limit, self._reddit.page_size)
+
+class MockAsyncReddit:
+    # Interface asyncpraw utilisée par AsyncCollector, servie depuis la mémoire :
+    # latence par requête et quota (requêtes / s) qui renvoie des 429 comme l'API
+
+    def __init__(self, submissions_by_subreddit, latency=0.02, requests_per_second=None, page_size=100):
+        self.latency = latency
+        self.requests_per_second = requests_per_second
+        self.page_size = page_size
+        self.requests = 0
+        self.rejected = 0
+        self._tokens = requests_per_second or 0.0
+        self._last_refill = time.monotonic()
+        self._submissions = {
+            name: sorted((_MockSubmission(self, s) for s in subs), key=lambda s: s.created_utc, reverse=True)
+            for name, subs in submissions_by_subreddit.items()
+        }
+
+    @classmethod
+    def from_json(cls, path, **kwargs):
+        # Format de record_submissions, avec une liste "comments" optionnelle par soumission
+        with open(path) as f:
+            return cls(json.load(f), **kwargs)
+
+    @classmethod
+    def synthetic(cls, assets=ASSETS, periods=PERIODS, posts_per_subreddit=200, comments_per_post=20,
+                  seed=42, **kwargs):
+        # Soumissions datées dans les périodes, avec les mots-clés des actifs du subreddit
+        rng = random.Random(seed)
+        words = ["calls", "puts", "market", "moon", "crash", "buy", "sell", "great", "terrible", "hold"]
+        starts, ends = zip(*(period_bounds(start, end) for start, end in periods.values()))
+        data = {}
+        for sub in sorted({s for config in assets.values() for s in config["subreddits"]}):
+            keywords = [k for config in assets.values() if sub in config["subreddits"] for k in config["keywords"]]
+            subs = []
+            for i in range(posts_per_subreddit):
+                created = rng.randint(min(starts), max(ends))
+                post_id = f"{sub.lower()}{i:05d}"
+                subs.append({
+                    "id": post_id,
+                    "title": " ".join(rng.choice(words + keywords) for _ in range(8)),
+                    "selftext": " ".join(rng.choice(words) for _ in range(rng.randint(0, 30))),
+                    "score": rng.randint(0, 5000), "num_comments": comments_per_post,
+                    "created_utc": created,
+                    "comments": [
+                        {"id": f"{post_id}c{j:03d}", "body": " ".join(rng.choice(words + keywords) for _ in range(12)),
+                         "score": rng.randint(-20, 500), "created_utc": created + rng.randint(60, 86400)}
+                        for j in range(comments_per_post)
+                    ],
+                })
+            data[sub] = subs
+        return cls(data, **kwargs)
+
+    async def _request(self):
+        self.requests += 1
+        if self.requests_per_second:
+            # Seau à jetons : au-delà du quota, 429 avec le délai avant le prochain jeton
+            now = time.monotonic()
+            self._tokens = min(self.requests_per_second,
+                               self._tokens + (now - self._last_refill) * self.requests_per_second)
+            self._last_refill = now
+            if self._tokens < 1:
+                self.rejected += 1
+                raise TooManyRequests((1 - self._tokens) / self.requests_per_second)
+            self._tokens -= 1
+        await asyncio.sleep(self.latency)
+
+    async def subreddit(self, name):
+        await self._request()
+        return _MockSubreddit(self, self._submissions.get(name, []))
+
+# --------------- CLIENT RÉEL --------------- #
+
+def get_async_reddit():
+    import asyncpraw  # dépendance optionnelle, seulement pour l'API réelle
+
+    from src.data_collection.build_asset_datasets import REDDIT_CLIENT_ID, REDDIT_SECRET, REDDIT_USER_AGENT
+
+    return asyncpraw.Reddit(
+        client_id=REDDIT_CLIENT_ID, client_secret=REDDIT_SECRET, user_agent=REDDIT_USER_AGENT
+    )
+
+async def run_collection(reddit, sink, concurrency, limit, with_comments):
+    collector = AsyncCollector(reddit, sink, concurrency, with_comments)
+    try:
+        return await collector.collect(limit=limit)
+    finally:
+        if hasattr(reddit, "close"):
+            await reddit.close()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Collecte asynchrone des soumissions et commentaires Reddit")
+    parser.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY)
+    parser.add_argument("--limit", type=int, default=1000, help="soumissions parcourues par subreddit")
+    parser.add_argument("--no-comments", action="store_true")
+    parser.add_argument("--store", action="store_true", help="ajoute aux CSV reddit_<ASSET>_<période> (scoring VADER)")
+    parser.add_argument("--output", default=str(STREAM_PATH), help="flux JSONL (sans --store)")
+    parser.add_argument("--mock", action="store_true", help="Reddit simulé en mémoire (aucun accès réseau)")
+    parser.add_argument("--fixture", default=None, help="JSON de record_submissions servi par le mock")
+    parser.add_argument("--latency", type=float, default=0.05, help="mock : latence par requête (s)")
+    parser.add_argument("--rps", type=float, default=None, help="mock : quota de requêtes par seconde")
+    args = parser.parse_args()
+
+    if args.fixture:
+        reddit = MockAsyncReddit.from_json(args.fixture, latency=args.latency, requests_per_second=args.rps)
+    elif args.mock:
+        reddit = MockAsyncReddit.synthetic(latency=args.latency, requests_per_second=args.rps)
+    else:
+        reddit = get_async_reddit()
+    sink = RawStoreSink() if args.store else JsonlSink(args.output)
+
+    report = asyncio.run(run_collection(reddit, sink, args.concurrency, args.limit, not args.no_comments))
+    print(f"\n✅ {report['submissions']} soumissions + {report['comments']} commentaires en {report['seconds']:.1f}s "
+          f"→ {report['records_per_s']:.0f} enregistrements/s ({report['retries']} reprises après 429 / erreurs)")
+    if isinstance(reddit, MockAsyncReddit):
+        print(f"🧪 Mock : {reddit.requests} requêtes, {reddit.rejected} refusées (quota)")
@@ -1,12 +1,14 @@
-import os
-import praw
 import pandas as pd
 import re
-from datetime import datetime
-from nltk.sentiment.vader import SentimentIntensityAnalyzer
-import nltk
 
-nltk.download("vader_lexicon")
+from src.config import ASSETS, PERIODS
+from src.nlp.batch_scoring import get_scorer, score_texts
+from src.nlp.sentiment_aggregation import daily_sentiment_features, session_freq
+from src.nlp.sentiment_cache import open_cache
+from src.data_collection.reddit_ingestion import KeywordMatcher, ingest_subreddit, ingest_all
+from src.instrumentation import instrument, measure
+from src.resources import get_vader
+from src.storage.post_store import PostStore, route_keys
 
 # --------------- CONFIG PRAW --------------- #
 
@@ -16,39 +18,8 @@ REDDIT_USER_AGENT = "market-detector by /u/Diego-Bibal-Mazoyer"
 
 POST_LIMIT = 1000
 
-# --------------- ACTIFS À SCRAPER --------------- #
-
-ASSETS = {
-    "SPY": {
-        "subreddits": ["wallstreetbets", "investing", "stocks", "SPY"],
-        "keywords": ["s&p", "sp500", "spy", "index"]
-    },
-    "BTC": {
-        "subreddits": ["cryptocurrency", "Bitcoin", "CryptoMarkets"],
-        "keywords": ["btc", "bitcoin", "satoshi", "crypto"]
-    },
-    "QQQ": {
-        "subreddits": ["wallstreetbets", "investing", "stocks"],
-        "keywords": ["qqq", "nasdaq", "tech index"]
-    },
-    "TSLA": {
-        "subreddits": ["wallstreetbets", "TeslaMotors", "stocks"],
-        "keywords": ["tsla", "tesla", "elon", "model 3"]
-    }
-}
-
-# --------------- PÉRIODES À SCRAPER --------------- #
-
-PERIODS = {
-    "aout_dec2024": ("2024-08-01", "2024-12-31"),
-    "janv_avr2025": ("2025-01-01", "2025-04-11"),
-    "mars2025": ("2025-03-01", "2025-03-31")
-}
-
 # --------------- NLP & UTILS --------------- #
 
-sia = SentimentIntensityAnalyzer()
-
 def clean_text(text):
     text = str(text).lower()
     text = re.sub(r"http\S+", "", text)
@@ -59,69 +30,100 @@ def clean_text(text):
 def sentiment_score(text):
     if not text:
         return 0.0
-    return sia.polarity_scores(text)["compound"]
+    return get_vader().polarity_scores(text)["compound"]
 
 # --------------- SCRAPING --------------- #
 
-def fetch_posts(subreddit_name, keywords, after, before, limit=1000):
-    reddit = praw.Reddit(
-        client_id=REDDIT_CLIENT_ID,
-        client_secret=REDDIT_SECRET,
-        user_agent=REDDIT_USER_AGENT
-    )
+_reddit_client = None
+
+def get_reddit():
+    # Client praw unique, partagé par tous les appels
+    global _reddit_client
+    if _reddit_client is None:
+        import praw  # import coûteux, seulement si on scrape vraiment
+
+        _reddit_client = praw.Reddit(
+            client_id=REDDIT_CLIENT_ID,
+            client_secret=REDDIT_SECRET,
+            user_agent=REDDIT_USER_AGENT
+        )
+    return _reddit_client
+
+@instrument("fetch_posts", rows=len)
+def fetch_posts(subreddit_name, keywords, after, before, limit=1000, reddit=None):
+    reddit = reddit or get_reddit()
+    matcher = KeywordMatcher({"match": keywords})
+    routes = [("match", None, after, before)]
+    return ingest_subreddit(reddit, subreddit_name, routes, matcher, limit)[("match", None)]
+
+def score_posts(all_posts):
+    df = pd.DataFrame(all_posts)
+    if df.empty:
+        return df
 
-    subreddit = reddit.subreddit(subreddit_name)
-    posts = []
-    for submission in subreddit.new(limit=limit * 5):
-        created = submission.created_utc
-        if after <= created <= before:
-            full_text = f"{submission.title} {submission.selftext}"
-            if any(k in full_text.lower() for k in keywords):
-                posts.append({
-                    "id": submission.id,
-                    "title": submission.title,
-                    "selftext": submission.selftext,
-                    "score": submission.score,
-                    "num_comments": submission.num_comments,
-                    "created_utc": datetime.fromtimestamp(submission.created_utc),
-                    "subreddit": subreddit_name
-                })
-        if len(posts) >= limit:
-            break
-    return posts
+    df["full_text"] = df["title"].fillna("") + " " + df["selftext"].fillna("")
+    # Mesure sur la colonne entière : un décorateur par texte coûterait un verrou par ligne
+    with measure("clean_text", rows=len(df)):
+        df["clean_text"] = df["full_text"].apply(clean_text)
+    cache = open_cache(get_scorer().analyzer)
+    df["sentiment"] = score_texts(df["clean_text"], cache=cache)["compound"]
+    df["date"] = pd.to_datetime(df["created_utc"]).dt.date
 
-def build_asset_period_dataset(asset, config, period_name, after_ts, before_ts):
-    all_posts = []
-    print(f"\n🔍 Scraping {asset} pour {period_name}...")
+    stats = cache.stats()
+    print(f"🗄️ Cache sentiment : {stats['hits']} hits / {stats['misses']} misses ({stats['hit_rate']:.0%})")
+    return df
 
-    for sub in config["subreddits"]:
-        posts = fetch_posts(sub, config["keywords"], after_ts, before_ts, POST_LIMIT)
-        all_posts.extend(posts)
+def aggregate_daily(df):
+    # n_posts permet de mettre à jour la moyenne de façon incrémentale
+    return (
+        df.groupby("date")["sentiment"]
+        .agg(avg_sentiment="mean", n_posts="size")
+        .reset_index()
+    )
 
-    df = pd.DataFrame(all_posts)
+def save_asset_period_dataset(asset, period_name, all_posts):
+    write_asset_period_dataset(asset, period_name, score_posts(all_posts))
+
+def write_asset_period_dataset(asset, period_name, df):
     if df.empty:
         print(f"⚠️ Aucun post trouvé pour {asset} — {period_name}")
         return
 
-    df["full_text"] = df["title"].fillna("") + " " + df["selftext"].fillna("")
-    df["clean_text"] = df["full_text"].apply(clean_text)
-    df["sentiment"] = df["clean_text"].apply(sentiment_score)
-    df["date"] = pd.to_datetime(df["created_utc"]).dt.date
-
     df.to_csv(f"data/reddit_{asset}_{period_name}.csv", index=False)
 
-    agg = df.groupby("date")["sentiment"].mean().reset_index()
-    agg.columns = ["date", "avg_sentiment"]
+    agg = aggregate_daily(df)
     agg.to_csv(f"data/daily_sentiment_{asset}_{period_name}.csv", index=False)
 
+    # Statistiques complémentaires (par séance, ou par jour pour les actifs 24/7) pour la modélisation
+    features = daily_sentiment_features(df, freq=session_freq(asset))
+    features.to_csv(f"data/sentiment_features_{asset}_{period_name}.csv", index=False)
+
     print(f"✅ Fichier enregistré : data/daily_sentiment_{asset}_{period_name}.csv ({len(agg)} jours)")
 
+def build_asset_period_dataset(asset, config, period_name, after_ts, before_ts):
+    all_posts = []
+    print(f"\n🔍 Scraping {asset} pour {period_name}...")
+
+    for sub in config["subreddits"]:
+        posts = fetch_posts(sub, config["keywords"], after_ts, before_ts, POST_LIMIT)
+        all_posts.extend(posts)
+
+    save_asset_period_dataset(asset, period_name, all_posts)
+
+def build_all_datasets(reddit=None, assets=ASSETS, periods=PERIODS):
+    # Un parcours par subreddit pour tous les actifs et toutes les périodes
+    posts_by_key = ingest_all(reddit or get_reddit(), assets, periods, POST_LIMIT)
+
+    # Un post suivi par plusieurs (actif, période) n'est scoré et stocké qu'une fois
+    store = PostStore(route_keys(assets, periods))
+    store.add(posts_by_key)
+    if len(store):
+        print(f"🗄️ {len(store)} posts uniques → {store.save()}")
+    for asset in assets:
+        for period_name in periods:
+            write_asset_period_dataset(asset, period_name, store.frame(asset, period_name))
+
 # --------------- MAIN --------------- #
 
 if __name__ == "__main__":
-    for asset, config in ASSETS.items():
-        for period_name, (start, end) in PERIODS.items():
-            after_ts = int(datetime.strptime(start, "%Y-%m-%d").timestamp())
-            before_ts = int(datetime.strptime(end, "%Y-%m-%d").timestamp())
-            build_asset_period_dataset(asset, config, period_name, after_ts, before_ts)
-
+    build_all_datasets()
@@ -1,29 +1,175 @@
-import yfinance as yf
+import argparse
+import os
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+from pathlib import Path
+
+import numpy as np
 import pandas as pd
 
-ASSETS = {
-    "SPY": "SPY",
-    "BTC": "BTC-USD",
-    "QQQ": "QQQ",
-    "TSLA": "TSLA"
-}
+from src.config import PRICE_START, PRICE_TICKERS
+from src.storage.market_data import DATA_DIR, price_path
+from src.storage.parquet_store import normalize_price_frame
+
+# --------------- CONFIG --------------- #
+
+PRICE_COLUMNS = ["Date", "Close", "High", "Low", "Open", "Volume"]
+
+# Écart relatif toléré sur une barre déjà en cache (un dividende SPY ≈ 0.3 %)
+ADJUSTMENT_RTOL = 1e-4
+
+# --------------- SOURCES DE DONNÉES --------------- #
+
+class YahooSource:
+    # Source par défaut : yfinance (importé seulement au premier téléchargement)
+
+    def fetch(self, ticker, start, end):
+        import yfinance as yf
+
+        # Ticker.history plutôt que yf.download : yf.download passe par un état global
+        # du module (shared._DFS / _ERRORS) et n'est pas sûr depuis plusieurs threads
+        data = yf.Ticker(ticker).history(
+            start=start.isoformat(), end=end.isoformat(), auto_adjust=True, actions=False
+        )
+        if data.empty:
+            return pd.DataFrame(columns=PRICE_COLUMNS)
+        # Dates de séance dans le fuseau de la place (sans conversion UTC), l'index devient une colonne normale
+        data.index = data.index.tz_localize(None)
+        data.index.name = "Date"
+        return data.reset_index()
+
+class LocalSource:
+    # Substitut hors ligne : <dossier>/<TICKER>.csv au même format que yfinance
+
+    def __init__(self, directory):
+        self.directory = Path(directory)
+
+    def fetch(self, ticker, start, end):
+        path = self.directory / f"{ticker}.csv"
+        if not path.exists():
+            return pd.DataFrame(columns=PRICE_COLUMNS)
+        df = normalize_price_frame(pd.read_csv(path))
+        return df[(df["Date"] >= start) & (df["Date"] < end)]
+
+# --------------- CACHE LOCAL ET DELTAS --------------- #
+
+def load_cached_prices(asset, data_dir=DATA_DIR):
+    path = price_path(asset, data_dir)
+    if not path.exists():
+        return pd.DataFrame(columns=PRICE_COLUMNS)
+    return normalize_price_frame(pd.read_csv(path))
+
+def missing_ranges(cached_dates, start, end):
+    # Plages [début, fin) absentes du cache. Les trous internes (week-ends, jours
+    # fériés) sont normaux : seules les extrémités sont redemandées. La dernière
+    # barre est redemandée avec la fin (elle pouvait être incomplète en séance).
+    # Chaque plage recouvre une barre complète du cache (la première, l'avant-dernière) :
+    # adjustment_changed la compare pour détecter un réajustement des prix.
+    if len(cached_dates) == 0:
+        return [(start, end)] if start < end else []
+    dates = sorted(cached_dates)
+    first, last = dates[0], dates[-1]
+    ranges = []
+    if start < first:
+        ranges.append((start, min(first + timedelta(days=1), end)))
+    if last < end:
+        seam = dates[-2] if len(dates) > 1 else last
+        ranges.append((max(seam, start), end))
+    return [(a, b) for a, b in ranges if a < b]
+
+def adjustment_changed(cached, new, rtol=ADJUSTMENT_RTOL):
+    # Prix ajustés (auto_adjust) : après un dividende ou un split, Yahoo réajuste tout
+    # l'historique. Une barre complète du cache redemandée qui a changé signale que
+    # le cache et les nouvelles barres ne sont plus raccordables.
+    if cached.empty or new.empty:
+        return False
+    complete = cached.iloc[:-1]  # dernière barre : peut-être incomplète (en séance)
+    overlap = pd.merge(
+        complete[["Date", "Close"]], normalize_price_frame(new)[["Date", "Close"]], on="Date", suffixes=("_cached", "_new")
+    )
+    return not np.allclose(overlap["Close_new"], overlap["Close_cached"], rtol=rtol, equal_nan=True)
+
+def merge_prices(cached, new):
+    # Les nouvelles barres remplacent les anciennes à date égale
+    if new.empty:
+        return cached
+    new = normalize_price_frame(new)
+    merged = pd.concat([cached, new[[c for c in PRICE_COLUMNS if c in new.columns]]], ignore_index=True)
+    merged = merged.drop_duplicates(subset="Date", keep="last")
+    return merged.sort_values("Date").reset_index(drop=True)
+
+def save_prices(asset, prices, data_dir=DATA_DIR):
+    # Écriture atomique (format plat Date, Close, ... relu par normalize_price_frame)
+    path = price_path(asset, data_dir)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix(".tmp")
+    prices.assign(Date=prices["Date"].astype(str)).to_csv(tmp_path, index=False)
+    os.replace(tmp_path, path)
+
+# --------------- MISE À JOUR --------------- #
+
+def update_asset(asset, ticker, start, end, source, data_dir=DATA_DIR):
+    cached = load_cached_prices(asset, data_dir)
+    ranges = missing_ranges(list(cached["Date"]), start, end)
+    frames = [source.fetch(ticker, a, b) for a, b in ranges]
+    new = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns=PRICE_COLUMNS)
+
+    row = {"asset": asset, "requests": len(ranges), "new_rows": 0, "rows": len(cached), "readjusted": False}
+    base = cached
+    if adjustment_changed(cached, new):
+        # Historique réajusté par Yahoo : tout est redemandé plutôt que raccordé (faux
+        # rendement le jour de la jonction sinon)
+        new = source.fetch(ticker, min(start, min(cached["Date"])), end)
+        base = cached.iloc[:0]
+        row["requests"] += 1
+        row["readjusted"] = True
+    if not new.empty:
+        merged = merge_prices(base, new)
+        row["new_rows"] = len(merged) - len(cached)
+        row["rows"] = len(merged)
+        save_prices(asset, merged, data_dir)
+    return row
 
-START = "2024-08-01"
-END = "2025-04-11"
+def update_prices(assets=None, start=PRICE_START, end=None, source=None, data_dir=DATA_DIR, n_workers=4):
+    # Un thread par actif (téléchargements limités par le réseau), seules les dates
+    # absentes de data/<asset>_prices.csv sont demandées
+    assets = list(PRICE_TICKERS) if assets is None else assets
+    source = YahooSource() if source is None else source
+    start = date.fromisoformat(start) if isinstance(start, str) else start
+    if end is None:
+        end = date.today() + timedelta(days=1)
+    end = date.fromisoformat(end) if isinstance(end, str) else end
 
-for symbol, ticker in ASSETS.items():
-    print(f"📥 Téléchargement : {symbol}")
-    data = yf.download(ticker, start=START, end=END)
+    def run(asset):
+        try:
+            return update_asset(asset, PRICE_TICKERS.get(asset, asset), start, end, source, data_dir)
+        except Exception as e:
+            return {"asset": asset, "error": f"❌ {asset} : {e}"}
 
-    # Vérifie que ce n'est pas vide
-    if data.empty:
-        print(f"⚠️ Pas de données pour {symbol}")
-        continue
+    with ThreadPoolExecutor(max_workers=n_workers) as pool:
+        rows = list(pool.map(run, assets))
 
-    # Assure-toi que l'index est une colonne normale
-    data.reset_index(inplace=True)
+    for row in rows:
+        if "error" in row:
+            print(row["error"])
+        elif row["rows"] == 0:
+            print(f"⚠️ Pas de données pour {row['asset']}")
+        elif row["requests"] == 0:
+            print(f"✅ {row['asset']} déjà à jour ({row['rows']} lignes)")
+        else:
+            readjusted = " (prix réajustés : historique retéléchargé)" if row["readjusted"] else ""
+            print(f"📥 {row['asset']} : +{row['new_rows']} lignes en {row['requests']} requête(s){readjusted} "
+                  f"→ {price_path(row['asset'], data_dir)} ({row['rows']} lignes)")
+    return rows
 
-    # Sauvegarde sans multi-index, sans colonne 'Ticker'
-    data.to_csv(f"data/{symbol.lower()}_prices.csv", index=False)
-    print(f"✅ Sauvegardé : data/{symbol.lower()}_prices.csv")
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Mise à jour incrémentale des prix (téléchargements concurrents)")
+    parser.add_argument("--assets", nargs="+", default=list(PRICE_TICKERS))
+    parser.add_argument("--start", default=PRICE_START)
+    parser.add_argument("--end", default=None, help="exclu, par défaut demain")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--source-dir", default=None, help="source locale <TICKER>.csv au lieu de Yahoo")
+    args = parser.parse_args()
 
+    source = LocalSource(args.source_dir) if args.source_dir else YahooSource()
+    update_prices(args.assets, args.start, args.end, source, n_workers=args.workers)
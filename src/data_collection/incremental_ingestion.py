@@ -0,0 +1,157 @@
+import argparse
+import json
+import os
+from pathlib import Path
+
+import pandas as pd
+
+from src.config import ASSETS, PERIODS
+from src.data_collection.build_asset_datasets import POST_LIMIT, aggregate_daily, get_reddit, score_posts
+from src.data_collection.reddit_ingestion import KeywordMatcher, plan_ingestion, route_submissions
+from src.nlp.sentiment_aggregation import daily_sentiment_features, session_freq
+
+# --------------- CONFIG --------------- #
+
+DATA_DIR = Path("data")
+CHECKPOINT_PATH = DATA_DIR / "checkpoints" / "reddit_watermarks.json"
+
+# --------------- WATERMARKS --------------- #
+
+def load_watermarks(path=CHECKPOINT_PATH):
+    path = Path(path)
+    if not path.exists():
+        return {}
+    with open(path) as f:
+        return json.load(f)
+
+def save_watermarks(watermarks, path=CHECKPOINT_PATH):
+    # Écriture atomique : un crash ne laisse jamais un checkpoint à moitié écrit
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix(".tmp")
+    with open(tmp_path, "w") as f:
+        json.dump(watermarks, f, indent=2)
+    os.replace(tmp_path, path)
+
+def fetch_new_submissions(reddit, subreddit_name, watermark, scan_limit):
+    # new() est trié du plus récent au plus ancien : on s'arrête au dernier post déjà vu
+    since = watermark["created_utc"] if watermark else None
+    submissions = []
+    for submission in reddit.subreddit(subreddit_name).new(limit=None if since else scan_limit):
+        if since is not None and submission.created_utc < since:
+            break
+        if watermark and submission.id == watermark["id"]:
+            break
+        submissions.append(submission)
+    return submissions
+
+# --------------- STOCKAGE INCRÉMENTAL --------------- #
+
+def raw_path(asset, period_name):
+    return DATA_DIR / f"reddit_{asset}_{period_name}.csv"
+
+def daily_path(asset, period_name):
+    return DATA_DIR / f"daily_sentiment_{asset}_{period_name}.csv"
+
+def features_path(asset, period_name):
+    return DATA_DIR / f"sentiment_features_{asset}_{period_name}.csv"
+
+def rebuild_features(asset, period_name):
+    # Quantiles et écarts-types ne se fusionnent pas : recalcul depuis le fichier brut
+    columns = ["created_utc", "sentiment", "score", "num_comments"]
+    df = pd.read_csv(raw_path(asset, period_name), usecols=lambda c: c in columns)
+    daily_sentiment_features(df, freq=session_freq(asset)).to_csv(features_path(asset, period_name), index=False)
+
+def features_stale(asset, period_name):
+    # Fichier brut modifié après les features (crash avant la reconstruction de fin de passe)
+    raw, features = raw_path(asset, period_name), features_path(asset, period_name)
+    return raw.exists() and (not features.exists() or features.stat().st_mtime < raw.stat().st_mtime)
+
+def rebuild_daily(asset, period_name):
+    # Reprise après crash : les agrégats sont recalculés depuis le fichier brut
+    df = pd.read_csv(raw_path(asset, period_name), usecols=["date", "sentiment"])
+    aggregate_daily(df).to_csv(daily_path(asset, period_name), index=False)
+    print(f"🔧 Agrégats reconstruits : {daily_path(asset, period_name)}")
+
+def append_posts(asset, period_name, posts, refresh_features=True):
+    # refresh_features=False : l'appelant reconstruit les features une fois après plusieurs lots
+    path = raw_path(asset, period_name)
+    existing_ids = set()
+    if path.exists():
+        ids = pd.read_csv(path, usecols=["id"], dtype={"id": str})["id"]
+        existing_ids = set(ids)
+        daily = daily_path(asset, period_name)
+        # Fichier brut et agrégats désynchronisés (crash entre les deux écritures)
+        if (not daily.exists()
+                or "n_posts" not in pd.read_csv(daily, nrows=0).columns
+                or pd.read_csv(daily)["n_posts"].sum() != len(ids)):
+            rebuild_daily(asset, period_name)
+
+    posts = [p for p in posts if p["id"] not in existing_ids]
+    df = score_posts(posts)
+    if df.empty:
+        return 0
+
+    if path.exists():
+        columns = pd.read_csv(path, nrows=0).columns
+        df.reindex(columns=columns).to_csv(path, mode="a", header=False, index=False)
+        update_daily(asset, period_name, aggregate_daily(df))
+    else:
+        df.to_csv(path, index=False)
+        aggregate_daily(df).to_csv(daily_path(asset, period_name), index=False)
+    if refresh_features:
+        rebuild_features(asset, period_name)
+    return len(df)
+
+def update_daily(asset, period_name, new_agg):
+    # Fusion moyenne pondérée par n_posts : seuls les jours touchés changent
+    path = daily_path(asset, period_name)
+    new_agg = new_agg.assign(date=new_agg["date"].astype(str))
+    if path.exists():
+        old = pd.read_csv(path, dtype={"date": str})
+        merged = pd.concat([old, new_agg])
+        merged["weighted"] = merged["avg_sentiment"] * merged["n_posts"]
+        merged = merged.groupby("date", as_index=False)[["weighted", "n_posts"]].sum()
+        merged["avg_sentiment"] = merged["weighted"] / merged["n_posts"]
+        new_agg = merged[["date", "avg_sentiment", "n_posts"]]
+    new_agg.sort_values("date").to_csv(path, index=False)
+
+# --------------- INGESTION INCRÉMENTALE --------------- #
+
+def incremental_ingest(reddit=None, assets=ASSETS, periods=PERIODS, checkpoint_path=CHECKPOINT_PATH):
+    reddit = reddit or get_reddit()
+    matcher = KeywordMatcher({asset: config["keywords"] for asset, config in assets.items()})
+    watermarks = load_watermarks(checkpoint_path)
+    touched = set()
+
+    for sub, routes in plan_ingestion(assets, periods).items():
+        submissions = fetch_new_submissions(reddit, sub, watermarks.get(sub), POST_LIMIT * 5)
+        if not submissions:
+            print(f"⏭️ r/{sub} : rien de nouveau")
+            continue
+
+        routed = route_submissions(submissions, sub, routes, matcher, limit=None)
+        for (asset, period_name), posts in routed.items():
+            if posts:
+                # Features (quantiles, écarts-types) reconstruites une fois par fichier en fin de passe
+                n_added = append_posts(asset, period_name, posts, refresh_features=False)
+                if n_added:
+                    touched.add((asset, period_name))
+                print(f"➕ {asset} — {period_name} : {n_added} posts ajoutés depuis r/{sub}")
+
+        # Le watermark n'avance qu'une fois le subreddit entièrement écrit
+        newest = submissions[0]
+        watermarks[sub] = {"created_utc": newest.created_utc, "id": newest.id}
+        save_watermarks(watermarks, checkpoint_path)
+        print(f"📌 Checkpoint r/{sub} : {newest.id} ({newest.created_utc})")
+
+    touched |= {(a, p) for a in assets for p in periods if features_stale(a, p)}
+    for asset, period_name in sorted(touched):
+        rebuild_features(asset, period_name)
+        print(f"📊 Features reconstruites : {features_path(asset, period_name)}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Scraping Reddit incrémental avec checkpoints par subreddit")
+    parser.add_argument("--checkpoint", default=str(CHECKPOINT_PATH))
+    args = parser.parse_args()
+    incremental_ingest(checkpoint_path=args.checkpoint)
@@ -1,13 +1,12 @@
 import pandas as pd
 from pathlib import Path
 
+from src.config import MERGE_PERIODS
+
 # ---------------------- CONFIG ----------------------
 
 # Périodes à inclure
-PERIODS_TO_INCLUDE = [
-    "aout_dec2024",
-    "jan_avr2025"
-]
+PERIODS_TO_INCLUDE = MERGE_PERIODS
 
 # Dossier des fichiers sentiment par période
 DATA_DIR = Path("data")
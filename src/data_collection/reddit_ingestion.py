@@ -0,0 +1,147 @@
+import json
+import re
+from collections import defaultdict
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+# --------------- MATCHING MULTI-MOTS-CLÉS --------------- #
+
+class KeywordMatcher:
+    # Une seule regex pour tous les mots-clés de tous les actifs.
+    # Équivalent exact de any(k in text.lower() for k in keywords) par actif :
+    # le lookahead teste chaque position (les mots-clés qui se chevauchent,
+    # ex : "index" dans "tech index", sont tous trouvés).
+
+    def __init__(self, keywords_by_tag):
+        self.tags_by_keyword = defaultdict(set)
+        for tag, keywords in keywords_by_tag.items():
+            for k in keywords:
+                self.tags_by_keyword[k.lower()].add(tag)
+
+        # Plus long d'abord : à une position donnée, l'alternative la plus longue gagne,
+        # les mots-clés qui en sont des préfixes sont ajoutés via _tags_by_match
+        ordered = sorted(self.tags_by_keyword, key=len, reverse=True)
+        self.pattern = re.compile("(?=(" + "|".join(re.escape(k) for k in ordered) + "))")
+        self._tags_by_match = {
+            k: set().union(*(tags for p, tags in self.tags_by_keyword.items() if k.startswith(p)))
+            for k in ordered
+        }
+
+    def match(self, text):
+        tags = set()
+        for m in self.pattern.finditer(text.lower()):
+            tags |= self._tags_by_match[m.group(1)]
+        return tags
+
+# --------------- PLAN D'INGESTION --------------- #
+
+def utc_datetime(epoch_seconds):
+    # created_utc de Reddit → datetime naïf en UTC (fuseau de la machine ignoré),
+    # comme le suppose sentiment_aggregation.to_epoch_ns
+    return datetime.fromtimestamp(epoch_seconds, tz=timezone.utc).replace(tzinfo=None)
+
+def period_bounds(start, end):
+    # Bornes des périodes en UTC, cohérentes avec created_utc
+    after_ts = int(datetime.strptime(start, "%Y-%m-%d").replace(tzinfo=timezone.utc).timestamp())
+    before_ts = int(datetime.strptime(end, "%Y-%m-%d").replace(tzinfo=timezone.utc).timestamp())
+    return after_ts, before_ts
+
+def plan_ingestion(assets, periods):
+    # subreddit → liste de routes (asset, période, fenêtre) à servir en un seul parcours
+    plan = defaultdict(list)
+    for asset, config in assets.items():
+        for period_name, (start, end) in periods.items():
+            after_ts, before_ts = period_bounds(start, end)
+            for sub in config["subreddits"]:
+                plan[sub].append((asset, period_name, after_ts, before_ts))
+    return dict(plan)
+
+def submission_to_post(submission, subreddit_name):
+    return {
+        "id": submission.id,
+        "title": submission.title,
+        "selftext": submission.selftext,
+        "score": submission.score,
+        "num_comments": submission.num_comments,
+        "created_utc": utc_datetime(submission.created_utc),
+        "subreddit": subreddit_name
+    }
+
+def route_submissions(submissions, subreddit_name, routes, matcher, limit=1000):
+    # Répartit des soumissions (triées du plus récent au plus ancien) entre les routes.
+    # limit=None : pas de plafond par (asset, période)
+    posts = {(asset, period): [] for asset, period, _, _ in routes}
+    oldest_after = min(after for _, _, after, _ in routes)
+    cap = float("inf") if limit is None else limit
+
+    for submission in submissions:
+        created = submission.created_utc
+        if created < oldest_after:
+            break  # new() est trié du plus récent au plus ancien
+
+        open_routes = [
+            (asset, period) for asset, period, after, before in routes
+            if after <= created <= before and len(posts[(asset, period)]) < cap
+        ]
+        if not open_routes:
+            continue
+
+        tags = matcher.match(f"{submission.title} {submission.selftext}")
+        routed = [key for key in open_routes if key[0] in tags]
+        if routed:
+            post = submission_to_post(submission, subreddit_name)
+            for key in routed:
+                posts[key].append(dict(post))
+
+        if all(len(p) >= cap for p in posts.values()):
+            break
+    return posts
+
+def ingest_subreddit(reddit, subreddit_name, routes, matcher, limit=1000):
+    # Un seul parcours de subreddit.new() pour toutes les (asset, période) qui le suivent
+    submissions = reddit.subreddit(subreddit_name).new(limit=limit * 5)
+    return route_submissions(submissions, subreddit_name, routes, matcher, limit)
+
+def ingest_all(reddit, assets, periods, limit=1000):
+    matcher = KeywordMatcher({asset: config["keywords"] for asset, config in assets.items()})
+    results = defaultdict(list)
+    for sub, routes in plan_ingestion(assets, periods).items():
+        print(f"🔍 r/{sub} → {len(routes)} (actif, période)")
+        for key, posts in ingest_subreddit(reddit, sub, routes, matcher, limit).items():
+            results[key].extend(posts)
+    return results
+
+# --------------- SOURCE REDDIT LOCALE (REJEU) --------------- #
+
+class FakeReddit:
+    # Rejoue des soumissions enregistrées avec l'interface praw utilisée ici :
+    # reddit.subreddit(name).new(limit=...)
+
+    def __init__(self, submissions_by_subreddit):
+        self.submissions = {
+            name: sorted(
+                (SimpleNamespace(**s) for s in subs),
+                key=lambda s: s.created_utc, reverse=True
+            )
+            for name, subs in submissions_by_subreddit.items()
+        }
+        self.calls = defaultdict(int)
+
+    @classmethod
+    def from_json(cls, path):
+        with open(path) as f:
+            return cls(json.load(f))
+
+    def subreddit(self, name):
+        self.calls[name] += 1
+        return SimpleNamespace(new=lambda limit=None: iter(self.submissions.get(name, [])[:limit]))
+
+def record_submissions(reddit, subreddit_names, path, limit=5000):
+    # Enregistre les soumissions brutes pour les rejouer avec FakeReddit
+    fields = ["id", "title", "selftext", "score", "num_comments", "created_utc"]
+    recorded = {
+        name: [{f: getattr(s, f) for f in fields} for s in reddit.subreddit(name).new(limit=limit)]
+        for name in subreddit_names
+    }
+    with open(path, "w") as f:
+        json.dump(recorded, f)
@@ -0,0 +1,229 @@
+import atexit
+import contextvars
+import cProfile
+import functools
+import json
+import os
+import pstats
+import threading
+import time
+import tracemalloc
+from pathlib import Path
+
+# --------------- CONFIG --------------- #
+
+# MARKET_NLP_PROFILE=1 : mesures actives, exportées à la sortie dans EXPORT_DIR
+# MARKET_NLP_PROFILE_MEMORY=1 : pic mémoire par étape (tracemalloc, ralentit les allocations)
+# MARKET_NLP_PROFILE_STAGE=<nom> : cProfile sur cette étape (ex. load_data)
+EXPORT_DIR = Path("data/cache/metrics")
+PROFILE_DIR = Path("data/cache/profiles")
+
+METRIC_PREFIX = "market_nlp_stage"
+
+# --------------- ENREGISTREMENT --------------- #
+
+class Recorder:
+    # Agrégats par étape : appels, temps total / max, lignes traitées, pic mémoire
+
+    def __init__(self):
+        self.stats = {}
+        self._lock = threading.Lock()
+
+    def add(self, name, seconds, rows=None, peak_bytes=None):
+        with self._lock:
+            entry = self.stats.setdefault(name, {
+                "calls": 0, "seconds": 0.0, "max_seconds": 0.0, "rows": 0, "peak_bytes": None,
+            })
+            entry["calls"] += 1
+            entry["seconds"] += seconds
+            entry["max_seconds"] = max(entry["max_seconds"], seconds)
+            if rows is not None:
+                entry["rows"] += rows
+            if peak_bytes is not None:
+                entry["peak_bytes"] = max(entry["peak_bytes"] or 0, peak_bytes)
+
+    def summary(self):
+        with self._lock:
+            rows = []
+            for name, entry in self.stats.items():
+                throughput = entry["rows"] / entry["seconds"] if entry["rows"] and entry["seconds"] > 0 else None
+                rows.append({"stage": name, **entry, "rows_per_s": throughput})
+        return sorted(rows, key=lambda r: r["seconds"], reverse=True)
+
+    def to_json(self, path=None):
+        text = json.dumps(self.summary(), indent=2)
+        if path is not None:
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+            Path(path).write_text(text)
+        return text
+
+    def to_prometheus(self, path=None):
+        # Format texte d'exposition Prometheus
+        metrics = [
+            ("seconds_total", "counter", "Temps total passé dans l'étape", "seconds"),
+            ("calls_total", "counter", "Nombre d'appels", "calls"),
+            ("rows_total", "counter", "Lignes / textes traités", "rows"),
+            ("peak_bytes", "gauge", "Pic mémoire Python (tracemalloc)", "peak_bytes"),
+        ]
+        lines = []
+        summary = self.summary()
+        for suffix, kind, help_text, key in metrics:
+            name = f"{METRIC_PREFIX}_{suffix}"
+            lines += [f"# HELP {name} {help_text}", f"# TYPE {name} {kind}"]
+            for row in summary:
+                if row[key] is not None:
+                    lines.append(f'{name}{{stage="{row["stage"]}"}} {row[key]}')
+        text = "\n".join(lines) + "\n"
+        if path is not None:
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+            Path(path).write_text(text)
+        return text
+
+    def reset(self):
+        with self._lock:
+            self.stats.clear()
+
+_default_recorder = Recorder()
+_active_recorder = contextvars.ContextVar("active_recorder", default=None)
+
+def get_recorder():
+    return _active_recorder.get() or _default_recorder
+
+# --------------- ACTIVATION --------------- #
+
+_enabled = os.environ.get("MARKET_NLP_PROFILE", "0") == "1"
+_trace_memory = os.environ.get("MARKET_NLP_PROFILE_MEMORY", "0") == "1"
+_profile_stage = os.environ.get("MARKET_NLP_PROFILE_STAGE") or None
+
+def enable(memory=None, profile_stage=None):
+    global _enabled, _trace_memory, _profile_stage
+    _enabled = True
+    if memory is not None:
+        _trace_memory = memory
+    if profile_stage is not None:
+        _profile_stage = profile_stage
+
+def disable():
+    global _enabled
+    _enabled = False
+
+def is_enabled():
+    return _enabled
+
+def use_recorder(recorder):
+    # Les mesures du contexte courant (thread, rerun Streamlit) vont dans recorder
+    return _active_recorder.set(recorder)
+
+class recording:
+    # Recorder isolé le temps d'un bloc : with recording() as rec: ...
+
+    def __enter__(self):
+        self.recorder = Recorder()
+        self._token = use_recorder(self.recorder)
+        return self.recorder
+
+    def __exit__(self, *exc):
+        _active_recorder.reset(self._token)
+        return False
+
+# --------------- MESURES --------------- #
+
+_local = threading.local()
+
+class measure:
+    # Context manager : with measure("fit_model") as m: ...; m.rows = len(df)
+    # Inactif (aucune mesure) tant que l'instrumentation n'est pas activée
+
+    def __init__(self, name, rows=None):
+        self.name = name
+        self.rows = rows
+        self.seconds = None
+
+    def __enter__(self):
+        self.active = _enabled
+        if not self.active:
+            return self
+        self._profiler = None
+        if _profile_stage == self.name and getattr(_local, "profiler", None) is None:
+            self._profiler = _local.profiler = cProfile.Profile()
+            self._profiler.enable()
+        self._memory = _trace_memory
+        if self._memory:
+            # Pic imbriqué : un enfant remet le pic à zéro, il le remonte à son parent
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+            stack = _local.__dict__.setdefault("memory_stack", [])
+            current, peak = tracemalloc.get_traced_memory()
+            # Pic du parent atteint avant cet enfant : perdu par reset_peak sinon
+            if stack:
+                stack[-1]._child_peak = max(stack[-1]._child_peak, peak)
+            self._base = current
+            self._child_peak = 0
+            tracemalloc.reset_peak()
+            stack.append(self)
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        if not self.active:
+            return False
+        self.seconds = time.perf_counter() - self._start
+        peak_bytes = None
+        if self._memory:
+            peak = max(tracemalloc.get_traced_memory()[1], self._child_peak)
+            peak_bytes = max(peak - self._base, 0)
+            stack = _local.memory_stack
+            stack.pop()
+            if stack:
+                stack[-1]._child_peak = max(stack[-1]._child_peak, peak)
+        if self._profiler is not None:
+            self._profiler.disable()
+            _local.profiler = None
+            _dump_profile(self.name, self._profiler)
+        get_recorder().add(self.name, self.seconds, self.rows, peak_bytes)
+        return False
+
+def instrument(name=None, rows=None):
+    # Décorateur : rows(résultat) → nombre de lignes traitées (débit)
+    def decorator(func):
+        stage = name or func.__name__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return func(*args, **kwargs)
+            with measure(stage) as m:
+                result = func(*args, **kwargs)
+                if rows is not None:
+                    m.rows = rows(result)
+            return result
+        return wrapper
+    return decorator
+
+def _dump_profile(name, profiler):
+    PROFILE_DIR.mkdir(parents=True, exist_ok=True)
+    path = PROFILE_DIR / f"{name}.prof"
+    profiler.dump_stats(str(path))
+    print(f"🔬 Profil cProfile de {name} → {path}")
+    pstats.Stats(profiler).sort_stats("cumulative").print_stats(15)
+
+# --------------- EXPORT --------------- #
+
+def export(directory=EXPORT_DIR, recorder=None):
+    recorder = recorder or get_recorder()
+    if not recorder.stats:
+        return
+    directory = Path(directory)
+    recorder.to_json(directory / "metrics.json")
+    recorder.to_prometheus(directory / "metrics.prom")
+    print(f"📊 Mesures exportées → {directory}/metrics.json, metrics.prom")
+
+def print_summary(recorder=None):
+    print("\n⏱️ Temps par étape :")
+    for row in (recorder or get_recorder()).summary():
+        throughput = f"{row['rows_per_s']:>12,.0f} lignes/s" if row["rows_per_s"] else ""
+        memory = f"{row['peak_bytes'] / 1e6:>8.1f} Mo" if row["peak_bytes"] is not None else ""
+        print(f"  {row['stage']:<24} {row['calls']:>8} appels {row['seconds']:>9.3f}s {throughput} {memory}")
+
+if _enabled:
+    atexit.register(lambda: (print_summary(_default_recorder), export(recorder=_default_recorder)))
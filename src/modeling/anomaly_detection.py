@@ -4,24 +4,22 @@ import matplotlib.pyplot as plt
 
 from datetime import date
 
-def load_data(sentiment_path, spy_path):
-    sentiment_df = pd.read_csv(sentiment_path)
-    spy_df = pd.read_csv(spy_path)
-
-    sentiment_df["date"] = pd.to_datetime(sentiment_df["date"]).dt.date
-    spy_df["Date"] = pd.to_datetime(spy_df["Date"], utc=True).dt.date
+from src.instrumentation import instrument
+from src.storage.market_data import load_market_frame
 
-    df = pd.merge(sentiment_df, spy_df, left_on="date", right_on="Date", how="inner")
-    df["return"] = df["Close"].pct_change()
-    df = df.dropna()
+LOOKBACK_DAYS = 7
 
+@instrument("load_data", rows=len)
+def load_data(sentiment_path, spy_path):
     # ⏳ Filtrage entre août et décembre 2024
     start_date = date(2024, 8, 1)
     end_date = date(2024, 12, 31)
-    df = df[(df["date"] >= start_date) & (df["date"] <= end_date)]
 
-    return df
+    # Seules les lignes utiles sont lues (quelques jours avant pour le premier rendement)
+    df = load_market_frame(sentiment_path, spy_path, start_date, end_date, lookback_days=LOOKBACK_DAYS)
+    return df.dropna()
 
+@instrument("detect_anomalies", rows=len)
 def detect_anomalies(df):
     model = IsolationForest(contamination=0.1, random_state=42)
 
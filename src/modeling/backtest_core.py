@@ -0,0 +1,132 @@
+import numpy as np
+import pandas as pd
+
+from src.instrumentation import instrument
+from src.storage.market_data import to_day_index
+
+# Backtest sur tableaux NumPy alignés : entrées float32 / int8, jours en int64,
+# tampons alloués une fois puis réutilisés à chaque run (aucun DataFrame intermédiaire).
+# Même logique que apply_positions + compute_metrics ; le DataFrame n'est construit
+# que pour l'affichage (to_frame).
+
+ANNUALIZATION = np.sqrt(252)
+
+# --------------- SÉRIE DE BARRES --------------- #
+
+class BarSeries:
+    # Colonnes d'entrée d'un actif, une entrée par barre
+
+    __slots__ = ("days", "returns", "sentiment", "anomaly", "proba", "alert")
+
+    def __init__(self, days, returns, sentiment, anomaly=None, proba=None):
+        n = len(days)
+        self.days = np.asarray(days, dtype=np.int64)
+        self.returns = np.asarray(returns, dtype=np.float32)
+        self.sentiment = np.asarray(sentiment, dtype=np.float32)
+        # True = anomalie (-1 de l'IsolationForest)
+        self.anomaly = np.zeros(n, dtype=bool) if anomaly is None else np.asarray(anomaly) == -1
+        self.proba = np.zeros(n, dtype=np.float32) if proba is None else np.asarray(proba, dtype=np.float32)
+        self.alert = np.zeros(n, dtype=bool)
+
+    @classmethod
+    def from_frame(cls, df, proba=None):
+        # df de load_data (date, return, avg_sentiment, anomaly, [proba])
+        if proba is None and "proba" in df.columns:
+            proba = df["proba"].to_numpy()
+        anomaly = df["anomaly"].to_numpy() if "anomaly" in df.columns else None
+        return cls(
+            to_day_index(df["date"]), df["return"].to_numpy(dtype=np.float32),
+            df["avg_sentiment"].to_numpy(dtype=np.float32), anomaly, proba,
+        )
+
+    def __len__(self):
+        return len(self.days)
+
+    def set_alerts(self, sentiment_threshold):
+        # Même règle que compute_alerts : sentiment sous le seuil ou anomalie
+        np.less(self.sentiment, np.float32(sentiment_threshold), out=self.alert)
+        np.logical_or(self.alert, self.anomaly, out=self.alert)
+        return self.alert
+
+# --------------- BACKTEST --------------- #
+
+class Backtest:
+    # Tampons de sortie réutilisés : plusieurs jeux de seuils sans réallocation
+
+    __slots__ = ("bars", "position", "strategy_return", "equity", "buy_hold", "drawdown", "_long", "_mask", "_squares")
+
+    def __init__(self, bars):
+        n = len(bars)
+        self.bars = bars
+        self.position = np.zeros(n, dtype=np.int8)
+        self.strategy_return = np.zeros(n, dtype=np.float32)
+        # Produits cumulés en float64 : en float32, 1 + r perd ~5 chiffres de r
+        self.equity = np.ones(n, dtype=np.float64)
+        self.drawdown = np.zeros(n, dtype=np.float64)
+        self.buy_hold = np.add(bars.returns, 1.0, dtype=np.float64)
+        np.multiply.accumulate(self.buy_hold, out=self.buy_hold)
+        self._long = np.zeros(n, dtype=bool)
+        self._mask = np.zeros(n, dtype=bool)
+        self._squares = np.zeros(n, dtype=np.float32)
+
+    def __len__(self):
+        return len(self.bars)
+
+    @instrument("backtest_run", rows=len)
+    def run(self, proba_threshold, use_alerts, enable_short, short_threshold):
+        bars, long, mask = self.bars, self._long, self._mask
+        np.greater(bars.proba, np.float32(proba_threshold), out=long)
+
+        if enable_short:
+            # Long hors alerte si use_alerts, puis short sous le seuil de sentiment
+            if use_alerts:
+                np.logical_and(long, np.logical_not(bars.alert, out=mask), out=long)
+            np.copyto(self.position, long, casting="unsafe")
+            np.less(bars.sentiment, np.float32(short_threshold), out=mask)
+            np.copyto(self.position, -1, where=mask)
+        else:
+            if use_alerts:
+                np.logical_and(long, bars.alert, out=long)
+            np.copyto(self.position, long, casting="unsafe")
+
+        np.multiply(bars.returns, self.position, out=self.strategy_return)
+        np.add(self.strategy_return, 1.0, out=self.equity, dtype=np.float64)
+        np.multiply.accumulate(self.equity, out=self.equity)
+        np.maximum.accumulate(self.equity, out=self.drawdown)
+        np.subtract(self.drawdown, self.equity, out=self.drawdown)
+        return self
+
+    def metrics(self):
+        # (cum_return, sharpe, drawdown, invested_pct) comme compute_metrics
+        n = len(self)
+        strat = self.strategy_return
+        total = np.add.reduce(strat, dtype=np.float64)
+        mean = total / n
+        # Variance en une passe (ddof=1), sommes accumulées en float64
+        sum_sq = np.add.reduce(np.square(strat, out=self._squares), dtype=np.float64)
+        variance = (sum_sq - total * mean) / (n - 1) if n > 1 else 0.0
+        std = np.sqrt(max(variance, 0.0))
+        sharpe = mean / std * ANNUALIZATION if std > 0 else 0
+        cum_return = self.equity[-1] - 1
+        drawdown = self.drawdown.max()
+        invested_pct = np.add.reduce(self.position, dtype=np.int64) / n
+        return cum_return, sharpe, drawdown, invested_pct
+
+    def exposure(self):
+        # Part du temps en position (long ou short)
+        return np.count_nonzero(self.position) / len(self)
+
+    def to_frame(self):
+        # Seule matérialisation en DataFrame, pour l'affichage
+        bars = self.bars
+        return pd.DataFrame({
+            "date": bars.days.astype("datetime64[D]").astype(object),
+            "return": bars.returns,
+            "avg_sentiment": bars.sentiment,
+            "proba": bars.proba,
+            "alert": bars.alert,
+            "position": self.position,
+            "strategy_return": self.strategy_return,
+            "cum_strategy": self.equity,
+            "cum_buy_hold": self.buy_hold,
+        })
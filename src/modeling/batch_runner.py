@@ -0,0 +1,110 @@
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+from src.config import ASSETS, PERIODS
+from src.modeling.backtest_core import Backtest, BarSeries
+from src.modeling.compute_performance import FEATURES, SENTIMENT_MODEL_FEATURES, fit_model, load_price_data
+from src.storage.feature_store import load_features
+
+# --------------- CONFIG --------------- #
+
+DEFAULT_OUTPUT = "data/batch_results.csv"
+
+DEFAULT_STRATEGY = {
+    "sentiment_threshold": -0.3,
+    "proba_threshold": 0.6,
+    "use_alerts": True,
+    "enable_short": False,
+    "short_threshold": -0.7,
+}
+
+# --------------- JOB (ACTIF, PÉRIODE) --------------- #
+
+def run_job(asset, period_key, price_df, strategy, sentiment_features=False):
+    # load → anomalies → stratégie → métriques pour une combinaison
+    # sentiment_features : modèle entraîné aussi sur std / moyennes pondérées / quantiles
+    start = time.perf_counter()
+    row = {"asset": asset, "period": period_key}
+    try:
+        df = load_features(asset, period_key, price_df=price_df, with_sentiment_features=sentiment_features)
+        _, proba = fit_model(df, SENTIMENT_MODEL_FEATURES if sentiment_features else FEATURES)
+        # Backtest sur tableaux (backtest_core) : pas de colonnes ajoutées au DataFrame
+        bars = BarSeries.from_frame(df, proba)
+        bars.set_alerts(strategy["sentiment_threshold"])
+        backtest = Backtest(bars).run(
+            strategy["proba_threshold"], strategy["use_alerts"],
+            strategy["enable_short"], strategy["short_threshold"]
+        )
+        cum_return, sharpe, drawdown, invested_pct = backtest.metrics()
+        row.update({
+            "n_days": len(df),
+            "n_anomalies": int(bars.anomaly.sum()),
+            "cum_return": cum_return,
+            "buy_hold_return": backtest.buy_hold[-1] - 1,
+            "sharpe": sharpe,
+            "drawdown": drawdown,
+            "invested_pct": invested_pct,
+        })
+    except (FileNotFoundError, ValueError, KeyError) as e:
+        row["error"] = str(e)
+    row["seconds"] = time.perf_counter() - start
+    return row
+
+def _run_job(args):
+    return run_job(*args)
+
+# --------------- BATCH MULTI-ACTIFS --------------- #
+
+def run_batch(assets, periods, strategy=DEFAULT_STRATEGY, n_workers=None, sentiment_features=False):
+    # Les prix sont lus une seule fois par actif et partagés entre ses périodes
+    jobs = []
+    for asset in assets:
+        try:
+            price_df = load_price_data(asset)
+        except FileNotFoundError as e:
+            print(str(e))
+            price_df = None
+        for period_key in periods:
+            if price_df is not None:
+                jobs.append((asset, period_key, price_df, strategy, sentiment_features))
+
+    if n_workers == 1:
+        rows = [_run_job(job) for job in jobs]
+    else:
+        with ProcessPoolExecutor(max_workers=n_workers) as pool:
+            rows = list(pool.map(_run_job, jobs))
+
+    for row in rows:
+        status = row["error"] if "error" in row else f"✅ return {row['cum_return']:.2%}"
+        print(f"{row['asset']} — {row['period']} : {status} ({row['seconds']:.2f}s)")
+    return pd.DataFrame(rows)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Stratégie et métriques pour chaque (actif, période) en parallèle")
+    parser.add_argument("--assets", nargs="+", default=list(ASSETS))
+    parser.add_argument("--periods", nargs="+", default=list(PERIODS))
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--output", default=DEFAULT_OUTPUT)
+    parser.add_argument("--sentiment-threshold", type=float, default=DEFAULT_STRATEGY["sentiment_threshold"])
+    parser.add_argument("--proba-threshold", type=float, default=DEFAULT_STRATEGY["proba_threshold"])
+    parser.add_argument("--no-alerts", action="store_true")
+    parser.add_argument("--enable-short", action="store_true")
+    parser.add_argument("--short-threshold", type=float, default=DEFAULT_STRATEGY["short_threshold"])
+    parser.add_argument("--sentiment-features", action="store_true",
+                        help="ajoute au modèle les statistiques de data/sentiment_features_<ASSET>_<période>.csv")
+    args = parser.parse_args()
+
+    strategy = {
+        "sentiment_threshold": args.sentiment_threshold,
+        "proba_threshold": args.proba_threshold,
+        "use_alerts": not args.no_alerts,
+        "enable_short": args.enable_short,
+        "short_threshold": args.short_threshold,
+    }
+    results = run_batch(args.assets, args.periods, strategy, args.workers, args.sentiment_features)
+    results.to_csv(args.output, index=False)
+    print(f"✅ Résultats consolidés : {args.output} ({len(results)} lignes)")
@@ -1,64 +1,71 @@
 import pandas as pd
 import numpy as np
 from sklearn.ensemble import RandomForestClassifier, IsolationForest
-import os
-
-def load_data(asset, period_key):
-    sentiment_path = f"data/daily_sentiment_{asset}_{period_key}.csv"
-    price_path = f"data/{asset.lower()}_prices.csv"
-
-    # Chargement des fichiers
-    if not os.path.exists(sentiment_path):
-        raise FileNotFoundError(f"❌ Fichier sentiment introuvable : {sentiment_path}")
-    if not os.path.exists(price_path):
-        raise FileNotFoundError(f"❌ Fichier prix introuvable : {price_path}")
-
-    sentiment_df = pd.read_csv(sentiment_path)
-    price_df = pd.read_csv(price_path)
-
-    # Correction et normalisation de la colonne Date
-    if "Date" not in price_df.columns:
-        if "Unnamed: 0" in price_df.columns:
-            price_df.rename(columns={"Unnamed: 0": "Date"}, inplace=True)
-        elif "index" in price_df.columns:
-            price_df.rename(columns={"index": "Date"}, inplace=True)
-        else:
-            price_df.reset_index(inplace=True)
-            if "index" in price_df.columns:
-                price_df.rename(columns={"index": "Date"}, inplace=True)
 
-    # Formatage des dates
-    sentiment_df["date"] = pd.to_datetime(sentiment_df["date"]).dt.date
-    price_df["Date"] = pd.to_datetime(price_df["Date"], utc=True).dt.date
+from src.instrumentation import instrument, measure
+from src.storage.market_data import load_asset_frame, price_path
+from src.storage.feature_store import SENTIMENT_FEATURES, add_sentiment_features
+from src.storage.parquet_store import read_frame
 
-    # Fusion
-    df = pd.merge(sentiment_df, price_df, left_on="date", right_on="Date", how="inner")
+def load_price_data(asset, start=None, end=None):
+    path = price_path(asset)
+    if not path.exists():
+        raise FileNotFoundError(f"❌ Fichier prix introuvable : {path}")
+    return read_frame(path, start, end)
 
-    # Check de sécurité
-    if df.empty or df[["avg_sentiment", "return"]].dropna().empty:
-        raise ValueError(f"⚠️ Données vides ou inexploitables pour {asset} - {period_key}")
+@instrument("load_data", rows=len)
+def load_data(asset, period_key, price_df=None, anomaly_service=None, with_features=False):
+    # price_df : prix déjà chargés (partagés entre plusieurs périodes d'un même actif)
+    # anomaly_service : AnomalyService (online_anomaly) → seuls les nouveaux jours sont scorés
+    # with_features : ajoute SENTIMENT_FEATURES (à passer ensuite à fit_model via SENTIMENT_MODEL_FEATURES)
+
+    # Sentiment et prix normalisés puis alignés par jour (cache mémoire partagé)
+    df = load_asset_frame(asset, period_key, price_df=price_df)
 
     # Calculs
-    df["return"] = df["Close"].pct_change()
     df["target"] = (df["return"].shift(-1) > 0).astype(int)
     df["sentiment_change"] = df["avg_sentiment"].diff()
 
-    model = IsolationForest(contamination=0.1, random_state=42)
-    df["anomaly"] = model.fit_predict(df[["avg_sentiment", "return"]].fillna(0))
+    # Check de sécurité
+    if df.empty or df[["avg_sentiment", "return"]].dropna().empty:
+        raise ValueError(f"⚠️ Données vides ou inexploitables pour {asset} - {period_key}")
+
+    if with_features:
+        df = add_sentiment_features(df, asset, period_key)
+
+    if anomaly_service is not None:
+        df["anomaly"] = anomaly_service.annotate(asset, df)
+    else:
+        with measure("isolation_forest", rows=len(df)):
+            model = IsolationForest(contamination=0.1, random_state=42)
+            df["anomaly"] = model.fit_predict(df[["avg_sentiment", "return"]].fillna(0))
 
     return df.dropna().reset_index(drop=True)
 
 def compute_alerts(df, sentiment_threshold):
     return (df["avg_sentiment"] < sentiment_threshold) | (df["anomaly"] == -1)
 
-def simulate_strategy(df, proba_threshold, use_alerts, enable_short, short_threshold):
-    X = df[["avg_sentiment", "sentiment_change", "return", "anomaly"]]
+FEATURES = ["avg_sentiment", "sentiment_change", "return", "anomaly"]
+# Modèle enrichi : statistiques journalières de sentiment_aggregation en plus
+SENTIMENT_MODEL_FEATURES = FEATURES + SENTIMENT_FEATURES
+
+@instrument("random_forest", rows=lambda result: len(result[1]))
+def fit_model(df, features=FEATURES):
+    X = df[features]
     y = df["target"]
     model = RandomForestClassifier(n_estimators=100, random_state=42)
     model.fit(X, y)
-    proba = model.predict_proba(X)[:, 1]
+    return model, model.predict_proba(X)[:, 1]
+
+@instrument("simulate_strategy", rows=lambda result: len(result[0]))
+def simulate_strategy(df, proba_threshold, use_alerts, enable_short, short_threshold):
+    model, proba = fit_model(df)
     df["proba"] = proba
+    df = apply_positions(df, proba_threshold, use_alerts, enable_short, short_threshold)
+    return df, model
 
+def apply_positions(df, proba_threshold, use_alerts, enable_short, short_threshold):
+    # Positions et rendements à partir de df["proba"] (in-sample ou walk-forward)
     df["position"] = 0  # baseline
 
     if enable_short:
@@ -80,10 +87,11 @@ def simulate_strategy(df, proba_threshold, use_alerts, enable_short, short_thres
     df["strategy_return"] = df["return"] * df["position"]
     df["cum_strategy"] = (1 + df["strategy_return"]).cumprod()
     df["cum_buy_hold"] = (1 + df["return"]).cumprod()
-    return df, model
+    return df
 
 
 
+@instrument("compute_metrics")
 def compute_metrics(df):
     strat = df["strategy_return"]
     cum_return = df["cum_strategy"].iloc[-1] - 1
@@ -0,0 +1,238 @@
+import argparse
+
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+from scipy.stats import rankdata
+
+from src.config import ASSETS
+from src.storage.market_data import load_asset_frame
+
+# --------------- CONFIG --------------- #
+
+DEFAULT_WINDOW = 60
+DEFAULT_LAGS = range(-10, 11)
+
+# Nombre de fenêtres classées par bloc (borne la mémoire : bloc × window)
+BLOCK_ROWS = 4096
+
+# --------------- NOYAUX PAR SÉRIE --------------- #
+
+def shift_series(values, lag):
+    # lag > 0 : valeur de t + lag ramenée en t (le sentiment précède la cible)
+    out = np.full(len(values), np.nan)
+    if lag >= 0:
+        out[:len(values) - lag] = values[lag:]
+    else:
+        out[-lag:] = values[:lag]
+    return out
+
+def _window_sums(values, window):
+    # Somme glissante en O(n) par différence de sommes cumulées
+    cum = np.concatenate([[0.0], np.cumsum(values)])
+    return cum[window:] - cum[:-window]
+
+def _pearson_from_sums(n, sx, sy, sxx, syy, sxy, min_periods):
+    with np.errstate(divide="ignore", invalid="ignore"):
+        cov = sxy - sx * sy / n
+        vx = sxx - sx * sx / n
+        vy = syy - sy * sy / n
+        r = cov / np.sqrt(vx * vy)
+    r = np.clip(r, -1.0, 1.0)
+    r[(n < min_periods) | ~(vx > 1e-12 * sxx) | ~(vy > 1e-12 * syy)] = np.nan
+    return r
+
+def _pad(values, window):
+    # window - 1 NaN en tête : une fenêtre par observation, les premières
+    # incomplètes (scorées si min_periods le permet, comme pandas)
+    return np.concatenate([np.full(window - 1, np.nan), values])
+
+def rolling_pearson(x, y, window, min_periods=None):
+    # Corrélation de Pearson sur les paires valides de chaque fenêtre, alignée sur
+    # la fin de fenêtre (mêmes conventions que pandas rolling().corr())
+    min_periods = window if min_periods is None else min_periods
+    x, y = _pad(x, window), _pad(y, window)
+
+    valid = ~np.isnan(x) & ~np.isnan(y)
+    # Centrage global : limite les annulations dans les sommes cumulées
+    x0 = np.where(valid, x - x[valid].mean() if valid.any() else 0.0, 0.0)
+    y0 = np.where(valid, y - y[valid].mean() if valid.any() else 0.0, 0.0)
+
+    n = _window_sums(valid.astype(float), window)
+    r = _pearson_from_sums(
+        n, _window_sums(x0, window), _window_sums(y0, window),
+        _window_sums(x0 * x0, window), _window_sums(y0 * y0, window), _window_sums(x0 * y0, window),
+        min_periods,
+    )
+    return r, np.rint(n).astype(int)
+
+def _dense_codes(values, valid):
+    # Rangs globaux entiers (ex æquo conservés) ; valeurs invalides → code maximal,
+    # supérieur à tout code valide, donc jamais compté devant une valeur valide
+    codes = np.full(len(values), len(values), dtype=np.int64)
+    codes[valid] = np.unique(values[valid], return_inverse=True)[1]
+    return codes
+
+def _window_ranks(codes, window, start, stop):
+    # Rangs moyens (1..w) de chaque élément dans sa fenêtre, pour les fenêtres [start, stop).
+    # Chaque fenêtre triée est décalée de row × (n + 1) : un seul searchsorted
+    # sur le tableau aplati classe toutes les fenêtres du bloc à la fois.
+    windows = sliding_window_view(codes, window)[start:stop]
+    offsets = (np.arange(stop - start, dtype=np.int64) * (len(codes) + 1))[:, None]
+    flat = (np.sort(windows, axis=1) + offsets).ravel()
+    queries = (windows + offsets).ravel()
+    row_start = np.repeat(np.arange(stop - start, dtype=np.int64) * window, window)
+    left = np.searchsorted(flat, queries, side="left") - row_start
+    right = np.searchsorted(flat, queries, side="right") - row_start
+    return ((left + right + 1) / 2).reshape(windows.shape)
+
+def rolling_spearman(x, y, window, min_periods=None):
+    # Spearman = Pearson des rangs moyens calculés dans chaque fenêtre (paires valides
+    # uniquement, comme scipy.stats.spearmanr sur la fenêtre sans NaN)
+    min_periods = window if min_periods is None else min_periods
+    out = np.full(len(x), np.nan)
+    x, y = _pad(x, window), _pad(y, window)
+
+    valid = ~np.isnan(x) & ~np.isnan(y)
+    x_codes = _dense_codes(x, valid)
+    y_codes = _dense_codes(y, valid)
+    valid_windows = sliding_window_view(valid, window)
+
+    for start in range(0, len(out), BLOCK_ROWS):
+        stop = min(start + BLOCK_ROWS, len(out))
+        mask = valid_windows[start:stop]
+        rx = np.where(mask, _window_ranks(x_codes, window, start, stop), 0.0)
+        ry = np.where(mask, _window_ranks(y_codes, window, start, stop), 0.0)
+        out[start:stop] = _pearson_from_sums(
+            mask.sum(axis=1).astype(float), rx.sum(axis=1), ry.sum(axis=1),
+            (rx * rx).sum(axis=1), (ry * ry).sum(axis=1), (rx * ry).sum(axis=1),
+            min_periods,
+        )
+    return out
+
+# --------------- RÉSULTAT TABULAIRE --------------- #
+
+class CorrelationResult:
+    # Tableaux (lags × actifs × dates) ; NaN quand la fenêtre est incomplète
+    # ou que l'actif n'a pas de donnée ce jour-là
+
+    def __init__(self, dates, assets, lags, window, pearson, spearman, n_obs):
+        self.dates = dates
+        self.assets = list(assets)
+        self.lags = list(lags)
+        self.window = window
+        self.pearson = pearson
+        self.spearman = spearman
+        self.n_obs = n_obs
+
+    def at_lag(self, lag, method="pearson"):
+        values = getattr(self, method)[self.lags.index(lag)]
+        return pd.DataFrame(values.T, index=self.dates, columns=self.assets)
+
+    def to_frame(self, dropna=True):
+        # Format long : date, asset, lag, pearson, spearman, n_obs
+        n_lags, n_assets, n_dates = self.pearson.shape
+        frame = pd.DataFrame({
+            "date": np.tile(np.asarray(self.dates), n_lags * n_assets),
+            "asset": np.repeat(np.tile(self.assets, n_lags), n_dates),
+            "lag": np.repeat(self.lags, n_assets * n_dates),
+            "pearson": self.pearson.ravel(),
+            "spearman": self.spearman.ravel(),
+            "n_obs": self.n_obs.ravel(),
+        })
+        if dropna:
+            frame = frame.dropna(subset=["pearson", "spearman"], how="all").reset_index(drop=True)
+        return frame
+
+# --------------- MOTEUR MULTI-ACTIFS --------------- #
+
+def rolling_lag_correlations(panel, window=DEFAULT_WINDOW, lags=DEFAULT_LAGS,
+                             min_periods=None, target="return"):
+    # panel : {actif: DataFrame(date, avg_sentiment, target)}. Les décalages et les
+    # fenêtres se comptent en observations de chaque actif (calendrier propre à l'actif),
+    # les résultats sont ensuite placés sur l'union des dates.
+    lags = list(lags)
+    assets = list(panel)
+    dates = np.array(sorted(set().union(*(panel[a]["date"] for a in assets))), dtype=object)
+
+    shape = (len(lags), len(assets), len(dates))
+    pearson = np.full(shape, np.nan)
+    spearman = np.full(shape, np.nan)
+    n_obs = np.zeros(shape, dtype=int)
+
+    for j, asset in enumerate(assets):
+        df = panel[asset].sort_values("date")
+        positions = np.searchsorted(dates, df["date"].to_numpy(dtype=object))
+        x = df["avg_sentiment"].to_numpy(dtype=float)
+        y = df[target].to_numpy(dtype=float)
+        for i, lag in enumerate(lags):
+            y_lag = shift_series(y, lag)
+            pearson[i, j, positions], n_obs[i, j, positions] = rolling_pearson(x, y_lag, window, min_periods)
+            spearman[i, j, positions] = rolling_spearman(x, y_lag, window, min_periods)
+
+    return CorrelationResult(dates, assets, lags, window, pearson, spearman, n_obs)
+
+def _full_sample_pearson(x, y, min_periods):
+    n = np.array([len(x)], dtype=float)
+    if len(x):
+        x, y = x - x.mean(), y - y.mean()
+    return _pearson_from_sums(
+        n, np.array([x.sum()]), np.array([y.sum()]),
+        np.array([(x * x).sum()]), np.array([(y * y).sum()]), np.array([(x * y).sum()]), min_periods,
+    )[0]
+
+def full_sample_correlations(x, y, min_periods=3):
+    # (pearson, spearman, n_obs) sur les paires valides de toute la série, en O(n log n) :
+    # Spearman = Pearson des rangs moyens (ex æquo) comme scipy.stats.spearmanr
+    valid = ~np.isnan(x) & ~np.isnan(y)
+    x, y = x[valid], y[valid]
+    pearson = _full_sample_pearson(x, y, min_periods)
+    spearman = _full_sample_pearson(rankdata(x), rankdata(y), min_periods)
+    return pearson, spearman, int(valid.sum())
+
+def lag_profile(panel, lags=DEFAULT_LAGS, target="return", min_periods=3):
+    # Corrélations sur tout l'échantillon pour chaque décalage
+    rows = []
+    for asset, df in panel.items():
+        df = df.sort_values("date")
+        x = df["avg_sentiment"].to_numpy(dtype=float)
+        y = df[target].to_numpy(dtype=float)
+        for lag in lags:
+            p, s, n = full_sample_correlations(x, shift_series(y, lag), min_periods)
+            rows.append({"asset": asset, "lag": lag, "pearson": p, "spearman": s, "n_obs": n})
+    return pd.DataFrame(rows)
+
+# --------------- CHARGEMENT --------------- #
+
+def load_panel(assets, period_key):
+    panel = {}
+    for asset in assets:
+        try:
+            df = load_asset_frame(asset, period_key)
+        except (FileNotFoundError, ValueError, KeyError) as e:
+            print(f"⚠️ {asset} ignoré : {e}")
+            continue
+        panel[asset] = df[["date", "avg_sentiment", "Close", "return"]]
+    return panel
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Corrélations glissantes et décalées sentiment / marché, tous actifs")
+    parser.add_argument("--period", default="full")
+    parser.add_argument("--assets", nargs="+", default=list(ASSETS))
+    parser.add_argument("--window", type=int, default=DEFAULT_WINDOW)
+    parser.add_argument("--max-lag", type=int, default=10)
+    parser.add_argument("--target", default="return", choices=["return", "Close"])
+    parser.add_argument("--output", default="data/rolling_correlations.csv")
+    args = parser.parse_args()
+
+    panel = load_panel(args.assets, args.period)
+    lags = range(-args.max_lag, args.max_lag + 1)
+
+    profile = lag_profile(panel, lags, args.target)
+    best = profile.loc[profile.groupby("asset")["pearson"].apply(lambda s: s.abs().idxmax())]
+    print("\n📈 Décalage le plus corrélé par actif (lag > 0 : le sentiment précède) :")
+    print(best.to_string(index=False))
+
+    result = rolling_lag_correlations(panel, args.window, lags, target=args.target)
+    result.to_frame().to_csv(args.output, index=False)
+    print(f"✅ Corrélations glissantes ({args.window} j) : {args.output}")
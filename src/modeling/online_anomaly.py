@@ -0,0 +1,254 @@
+import argparse
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import IsolationForest
+
+# --------------- CONFIG --------------- #
+
+STATE_DIR = Path("data/checkpoints/anomaly")
+FEATURE_COLUMNS = ["avg_sentiment", "return"]
+
+DEFAULT_PARAMS = {
+    "window": 250,          # fenêtre glissante utilisée pour les réentraînements
+    "refit_every": 20,      # nouveaux points avant un réentraînement en arrière-plan
+    "contamination": 0.1,
+    "random_state": 42,
+}
+
+def _features(avg_sentiment, ret):
+    # Mêmes conventions que detect_anomalies : NaN → 0
+    return [0.0 if pd.isna(avg_sentiment) else float(avg_sentiment),
+            0.0 if pd.isna(ret) else float(ret)]
+
+# --------------- DÉTECTEUR PAR ACTIF --------------- #
+
+class OnlineAnomalyDetector:
+    # IsolationForest maintenu sur une fenêtre glissante. Le score d'un nouveau
+    # point ne dépend pas de la taille de l'historique ; le modèle est réentraîné
+    # tous les refit_every points (dans un thread si un executor est fourni).
+
+    def __init__(self, asset, window=250, refit_every=20, contamination=0.1, random_state=42):
+        self.asset = asset
+        self.params = {
+            "window": window, "refit_every": refit_every,
+            "contamination": contamination, "random_state": random_state,
+        }
+        self.model = None
+        self.window = deque(maxlen=window)   # (date, [avg_sentiment, return])
+        self.labels = {}                      # date → 1 / -1
+        self.since_refit = 0
+        self.n_refits = 0
+        self._lock = threading.Lock()
+        self._pending = None
+
+    @property
+    def last_date(self):
+        return self.window[-1][0] if self.window else None
+
+    def _fit(self, points):
+        model = IsolationForest(
+            contamination=self.params["contamination"], random_state=self.params["random_state"]
+        )
+        return model.fit(np.asarray(points, dtype=float))
+
+    def bootstrap(self, df):
+        # Premier entraînement sur les window derniers jours, puis tout l'historique
+        # est labellisé (historique ≤ window : identique à detect_anomalies)
+        df = df.sort_values("date")
+        points = [_features(s, r) for s, r in zip(df["avg_sentiment"], df["return"])]
+        recent = points[-self.params["window"]:]
+        model = self._fit(recent)
+        labels = model.predict(np.asarray(points, dtype=float))
+        with self._lock:
+            self.model = model
+            self.window.clear()
+            self.window.extend(zip(df["date"].iloc[-len(recent):], recent))
+            self.labels.update(zip(df["date"], labels.tolist()))
+            self.since_refit = 0
+            self.n_refits += 1
+        return labels
+
+    def update(self, day, avg_sentiment, ret, executor=None):
+        # Score d'un nouveau point (jour déjà vu → label existant, pas de double comptage)
+        if self.model is None:
+            raise ValueError(f"❌ Détecteur {self.asset} non initialisé (appeler bootstrap)")
+        with self._lock:
+            if day in self.labels:
+                return self.labels[day]
+            point = _features(avg_sentiment, ret)
+            label = int(self.model.predict(np.asarray([point]))[0])
+            self.labels[day] = label
+            if self.window and day < self.last_date:
+                # Jour manquant antérieur à la fenêtre : scoré mais pas réinjecté
+                return label
+            self.window.append((day, point))
+            self.since_refit += 1
+            due = self.since_refit >= self.params["refit_every"]
+
+        if due:
+            self.refit(executor)
+        return label
+
+    def refit(self, executor=None):
+        # Réentraînement sur une copie de la fenêtre ; le modèle courant continue
+        # de scorer pendant ce temps et est remplacé d'un bloc à la fin
+        def job():
+            model = self._fit(points)
+            with self._lock:
+                self.model = model
+                self.n_refits += 1
+            return model
+
+        with self._lock:
+            if self._pending is not None and not self._pending.done():
+                return self._pending
+            points = [p for _, p in self.window]
+            self.since_refit = 0
+            # Soumis sous le verrou : deux appels concurrents ne lancent qu'un seul job
+            if executor is not None:
+                self._pending = executor.submit(job)
+                return self._pending
+
+        job()
+        return None
+
+    def wait(self):
+        if self._pending is not None:
+            self._pending.result()
+
+    def annotate(self, df, executor=None):
+        # Colonne anomaly (1 / -1) pour df : jours déjà scorés relus, nouveaux jours
+        # scorés en flux (ordre chronologique)
+        for day, s, r in df.sort_values("date")[["date", *FEATURE_COLUMNS]].itertuples(index=False):
+            if day not in self.labels:
+                self.update(day, s, r, executor)
+        return df["date"].map(self.labels).astype(int)
+
+    # --------------- PERSISTANCE --------------- #
+
+    def save(self, state_dir=STATE_DIR):
+        path = Path(state_dir) / f"{self.asset}.joblib"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with self._lock:
+            state = {
+                "asset": self.asset,
+                "params": self.params,
+                "model": self.model,
+                "window": list(self.window),
+                "labels": dict(self.labels),
+                "since_refit": self.since_refit,
+                "n_refits": self.n_refits,
+            }
+        tmp_path = path.with_suffix(".tmp")
+        joblib.dump(state, tmp_path)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, asset, state_dir=STATE_DIR):
+        path = Path(state_dir) / f"{asset}.joblib"
+        if not path.exists():
+            return None
+        state = joblib.load(path)
+        detector = cls(asset, **state["params"])
+        detector.model = state["model"]
+        detector.window.extend(state["window"])
+        detector.labels = state["labels"]
+        detector.since_refit = state["since_refit"]
+        detector.n_refits = state["n_refits"]
+        return detector
+
+# --------------- SERVICE MULTI-ACTIFS --------------- #
+
+class AnomalyService:
+    # Un détecteur par actif, rechargé depuis le disque au redémarrage ;
+    # les réentraînements tournent dans un thread unique en arrière-plan
+
+    def __init__(self, state_dir=STATE_DIR, params=DEFAULT_PARAMS, background=True):
+        self.state_dir = Path(state_dir)
+        self.params = dict(params)
+        self.detectors = {}
+        self.executor = ThreadPoolExecutor(max_workers=1) if background else None
+
+    def get(self, asset, history=None):
+        if asset not in self.detectors:
+            detector = OnlineAnomalyDetector.load(asset, self.state_dir)
+            if detector is None:
+                if history is None:
+                    raise ValueError(f"❌ Aucun état sauvegardé pour {asset} : historique requis")
+                detector = OnlineAnomalyDetector(asset, **self.params)
+                detector.bootstrap(history)
+                detector.save(self.state_dir)
+            self.detectors[asset] = detector
+        return self.detectors[asset]
+
+    def update(self, asset, day, avg_sentiment, ret):
+        return self.get(asset).update(day, avg_sentiment, ret, self.executor)
+
+    def annotate(self, asset, df):
+        # Premier appel pour un actif sans état : l'historique df sert au bootstrap
+        detector = self.get(asset, history=df)
+        n_labels = len(detector.labels)
+        anomaly = detector.annotate(df, self.executor)
+        if len(detector.labels) > n_labels:
+            # Nouveaux jours scorés : état sauvegardé (réentraînement en cours compris)
+            detector.wait()
+            detector.save(self.state_dir)
+        return anomaly
+
+    def flush(self):
+        # Attend les réentraînements en cours puis sauvegarde tous les états
+        for detector in self.detectors.values():
+            detector.wait()
+            detector.save(self.state_dir)
+
+    def close(self):
+        self.flush()
+        if self.executor is not None:
+            self.executor.shutdown(wait=True)
+
+# --------------- REJEU D'UN FICHIER JOURNALIER --------------- #
+
+def replay(asset, period_key, service):
+    # Simule l'arrivée des points jour par jour sur un dataset existant
+    from src.modeling.compute_performance import load_data
+
+    df = load_data(asset, period_key)
+    warmup = min(len(df) // 2, service.params["window"])
+    detector = service.get(asset, history=df.iloc[:warmup])
+
+    start = time.perf_counter()
+    n_new = 0
+    for day, s, r in df[["date", *FEATURE_COLUMNS]].itertuples(index=False):
+        if day not in detector.labels:
+            service.update(asset, day, s, r)
+            n_new += 1
+    elapsed = time.perf_counter() - start
+    service.flush()
+
+    labels = df["date"].map(detector.labels)
+    n_anomalies = int((labels == -1).sum())
+    per_point = elapsed / n_new * 1000 if n_new else 0.0
+    print(f"✅ {asset} — {period_key} : {n_new} nouveaux points ({per_point:.2f} ms/point), "
+          f"{n_anomalies} anomalies, {detector.n_refits} entraînements")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Détection d'anomalies en ligne (état persistant par actif)")
+    parser.add_argument("--asset", required=True)
+    parser.add_argument("--period", default="full")
+    parser.add_argument("--state-dir", default=str(STATE_DIR))
+    parser.add_argument("--window", type=int, default=DEFAULT_PARAMS["window"])
+    parser.add_argument("--refit-every", type=int, default=DEFAULT_PARAMS["refit_every"])
+    args = parser.parse_args()
+
+    params = {**DEFAULT_PARAMS, "window": args.window, "refit_every": args.refit_every}
+    service = AnomalyService(args.state_dir, params)
+    replay(args.asset, args.period, service)
+    service.close()
@@ -0,0 +1,134 @@
+import argparse
+import itertools
+
+import numpy as np
+import pandas as pd
+
+from src.config import ASSETS
+from src.modeling.compute_performance import fit_model
+from src.storage.feature_store import load_features
+
+# --------------- CONFIG --------------- #
+
+DEFAULT_GRID = {
+    "proba_thresholds": np.round(np.arange(0.40, 0.901, 0.05), 2),
+    "sentiment_thresholds": np.round(np.arange(-1.0, 1.001, 0.05), 2),
+    "short_thresholds": np.round(np.arange(-1.0, 0.001, 0.05), 2),
+}
+
+def scenario_grid(use_alerts, enable_short, grid=DEFAULT_GRID):
+    # Seulement les seuils qui changent le résultat du scénario : sans alerte le seuil de
+    # sentiment est ignoré, sans short le seuil de short aussi (première valeur gardée)
+    return {
+        "proba_thresholds": grid["proba_thresholds"],
+        "sentiment_thresholds": grid["sentiment_thresholds"] if use_alerts else grid["sentiment_thresholds"][:1],
+        "short_thresholds": grid["short_thresholds"] if enable_short else grid["short_thresholds"][:1],
+    }
+
+# Nombre de combinaisons évaluées par bloc (borne la mémoire : bloc × nb de jours)
+BLOCK_SIZE = 4096
+
+# --------------- BACKTEST VECTORISÉ --------------- #
+
+def grid_metrics(positions, returns):
+    # positions : (combinaisons × jours), returns : (jours,) → mêmes métriques que compute_metrics
+    strat = positions * returns[None, :]
+    cum = np.cumprod(1 + strat, axis=1)
+    cum_return = cum[:, -1] - 1
+
+    std = strat.std(axis=1, ddof=1)
+    mean = strat.mean(axis=1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        sharpe = np.where(std > 0, mean / std * np.sqrt(252), 0.0)
+
+    drawdown = (np.maximum.accumulate(cum, axis=1) - cum).max(axis=1)
+    invested_pct = positions.sum(axis=1) / positions.shape[1]
+    return cum_return, sharpe, drawdown, invested_pct
+
+def iter_sweep(df, proba, proba_thresholds, sentiment_thresholds, short_thresholds,
+               use_alerts_options=(False, True), enable_short_options=(False, True), block_size=BLOCK_SIZE):
+    # Toutes les combinaisons de seuils utiles en broadcast NumPy, avec une seule série de probabilités,
+    # un DataFrame de résultats par bloc. Même logique de position que simulate_strategy.
+    proba_thresholds = np.asarray(proba_thresholds, dtype=float)
+    sentiment_thresholds = np.asarray(sentiment_thresholds, dtype=float)
+    short_thresholds = np.asarray(short_thresholds, dtype=float)
+
+    sentiment = df["avg_sentiment"].to_numpy(dtype=float)
+    returns = df["return"].to_numpy(dtype=float)
+    anomaly = df["anomaly"].to_numpy() == -1
+
+    # Signaux pré-calculés une fois par seuil : (nb seuils × jours)
+    long_signal = np.asarray(proba)[None, :] > proba_thresholds[:, None]
+    alert = (sentiment[None, :] < sentiment_thresholds[:, None]) | anomaly[None, :]
+    short_signal = sentiment[None, :] < short_thresholds[:, None]
+
+    # Indices des seuils par scénario (use_alerts, enable_short), combinaisons redondantes retirées
+    indices = {
+        "proba_thresholds": range(len(proba_thresholds)),
+        "sentiment_thresholds": range(len(sentiment_thresholds)),
+        "short_thresholds": range(len(short_thresholds)),
+    }
+    grid = np.array([
+        combo
+        for use_alerts, enable_short in itertools.product(use_alerts_options, enable_short_options)
+        for combo in itertools.product(*scenario_grid(use_alerts, enable_short, indices).values(), [use_alerts], [enable_short])
+    ], dtype=int).reshape(-1, 5)
+
+    for start in range(0, len(grid), block_size):
+        block = grid[start:start + block_size]
+        pi, si, hi = block[:, 0], block[:, 1], block[:, 2]
+        use_alerts = block[:, 3].astype(bool)[:, None]
+        enable_short = block[:, 4].astype(bool)[:, None]
+
+        longs, alerts = long_signal[pi], alert[si]
+        long_no_short = longs & (alerts | ~use_alerts)
+        long_with_short = longs & (~alerts | ~use_alerts)
+        positions = np.where(
+            enable_short,
+            np.where(short_signal[hi], -1, long_with_short.astype(np.int8)),
+            long_no_short.astype(np.int8)
+        ).astype(np.int8)
+
+        cum_return, sharpe, drawdown, invested_pct = grid_metrics(positions, returns)
+        yield pd.DataFrame({
+            "proba_threshold": proba_thresholds[pi],
+            "sentiment_threshold": sentiment_thresholds[si],
+            "short_threshold": short_thresholds[hi],
+            "use_alerts": use_alerts[:, 0],
+            "enable_short": enable_short[:, 0],
+            "cum_return": cum_return,
+            "sharpe": sharpe,
+            "drawdown": drawdown,
+            "invested_pct": invested_pct,
+            # Part du temps en position, long ou short (Backtest.exposure)
+            "exposure": np.count_nonzero(positions, axis=1) / positions.shape[1],
+        })
+
+def sweep_thresholds(df, proba, proba_thresholds, sentiment_thresholds, short_thresholds,
+                     use_alerts_options=(False, True), enable_short_options=(False, True)):
+    return pd.concat(list(iter_sweep(
+        df, proba, proba_thresholds, sentiment_thresholds, short_thresholds, use_alerts_options, enable_short_options
+    )), ignore_index=True)
+
+def sweep_assets(assets, period_key, grid=DEFAULT_GRID):
+    all_results = []
+    for asset in assets:
+        df = load_features(asset, period_key)
+        _, proba = fit_model(df)
+        result = sweep_thresholds(df, proba, **grid)
+        result.insert(0, "asset", asset)
+        all_results.append(result)
+        print(f"✅ {asset} : {len(result)} combinaisons évaluées")
+    return pd.concat(all_results, ignore_index=True)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Balayage vectorisé des seuils de la stratégie")
+    parser.add_argument("--period", default="aout_dec2024")
+    parser.add_argument("--assets", nargs="+", default=list(ASSETS))
+    parser.add_argument("--output", default="data/threshold_sweep.csv")
+    args = parser.parse_args()
+
+    results = sweep_assets(args.assets, args.period)
+    results.to_csv(args.output, index=False)
+    best = results.sort_values("sharpe", ascending=False).groupby("asset").head(1)
+    print(best.to_string(index=False))
@@ -0,0 +1,189 @@
+import argparse
+import hashlib
+import json
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import IsolationForest, RandomForestClassifier
+
+from src.modeling.compute_performance import (
+    FEATURES, apply_positions, compute_alerts, compute_metrics
+)
+from src.storage.feature_store import ANOMALY_PARAMS, load_features
+
+# --------------- CONFIG --------------- #
+
+DEFAULT_PARAMS = {"n_estimators": 100, "random_state": 42}
+MODEL_CACHE_DIR = Path("data/cache/models")
+
+ANOMALY_INPUTS = [FEATURES.index("avg_sentiment"), FEATURES.index("return")]
+ANOMALY_COLUMN = FEATURES.index("anomaly")
+
+# --------------- FOLDS --------------- #
+
+def make_folds(n_rows, min_train=60, test_size=20):
+    # Fenêtre d'entraînement croissante [0, train_end), test sur les test_size jours suivants
+    folds = []
+    train_end = min_train
+    while train_end < n_rows:
+        test_end = min(train_end + test_size, n_rows)
+        folds.append((train_end, test_end))
+        train_end = test_end
+    return folds
+
+def fold_cache_key(X_train, y_train, params, parent_key=""):
+    h = hashlib.sha1(parent_key.encode())
+    h.update(np.ascontiguousarray(X_train).tobytes())
+    h.update(np.ascontiguousarray(y_train).tobytes())
+    h.update(json.dumps(params, sort_keys=True).encode())
+    return h.hexdigest()
+
+def positive_proba(model, X):
+    # Fenêtre d'entraînement avec une seule classe : predict_proba n'a qu'une colonne
+    classes = list(model.classes_)
+    if 1 not in classes:
+        return np.zeros(len(X))
+    return model.predict_proba(X)[:, classes.index(1)]
+
+def fold_anomalies(X_train, X_test):
+    # IsolationForest ajusté sur la fenêtre d'entraînement du fold seulement (celui du
+    # feature store voit tout l'historique, tests compris) : colonne anomaly remplacée
+    model = IsolationForest(**ANOMALY_PARAMS).fit(X_train[:, ANOMALY_INPUTS])
+    X_train, X_test = X_train.copy(), X_test.copy()
+    X_train[:, ANOMALY_COLUMN] = model.predict(X_train[:, ANOMALY_INPUTS])
+    X_test[:, ANOMALY_COLUMN] = model.predict(X_test[:, ANOMALY_INPUTS])
+    return X_train, X_test
+
+def _load_or_fit(key, cache_dir, fit):
+    path = Path(cache_dir) / f"{key}.joblib"
+    if path.exists():
+        return joblib.load(path), True
+    model = fit()
+    path.parent.mkdir(parents=True, exist_ok=True)
+    joblib.dump(model, path)
+    return model, False
+
+# --------------- EXÉCUTION DES FOLDS --------------- #
+
+def _run_fold(args):
+    # Fold indépendant (exécuté dans un worker du pool)
+    fold, X_train, y_train, X_test, params, cache_dir = args
+    start = time.perf_counter()
+    X_train, X_test = fold_anomalies(X_train, X_test)
+    key = fold_cache_key(X_train, y_train, params)
+    model, cached = _load_or_fit(
+        key, cache_dir, lambda: RandomForestClassifier(**params).fit(X_train, y_train)
+    )
+    return fold, positive_proba(model, X_test), X_test[:, ANOMALY_COLUMN], time.perf_counter() - start, cached
+
+def _run_warm_chain(fold_data, params, trees_per_fold, cache_dir):
+    # Forêt réutilisée d'un fold à l'autre : on ajoute trees_per_fold arbres entraînés
+    # sur la fenêtre agrandie au lieu de tout réentraîner (séquentiel par nature)
+    chain_params = {**params, "warm_start": True, "trees_per_fold": trees_per_fold}
+    model, parent_key = None, ""
+    for fold, X_train, y_train, X_test in fold_data:
+        start = time.perf_counter()
+        X_train, X_test = fold_anomalies(X_train, X_test)
+        key = fold_cache_key(X_train, y_train, chain_params, parent_key)
+
+        def fit():
+            if model is None:
+                return RandomForestClassifier(**params, warm_start=True).fit(X_train, y_train)
+            model.n_estimators += trees_per_fold
+            return model.fit(X_train, y_train)
+
+        model, cached = _load_or_fit(key, cache_dir, fit)
+        parent_key = key
+        yield fold, positive_proba(model, X_test), X_test[:, ANOMALY_COLUMN], time.perf_counter() - start, cached
+
+def walk_forward_backtest(df, proba_threshold=0.6, use_alerts=False, enable_short=False,
+                          short_threshold=-0.7, sentiment_threshold=-0.3, min_train=60, test_size=20,
+                          params=None, warm_start=False, trees_per_fold=20, n_jobs=1,
+                          cache_dir=MODEL_CACHE_DIR):
+    params = {**DEFAULT_PARAMS, **(params or {})}
+    X = df[FEATURES].to_numpy(dtype=float)
+    y = df["target"].to_numpy()
+    folds = make_folds(len(df), min_train, test_size)
+    if not folds:
+        raise ValueError(f"⚠️ Historique trop court pour le walk-forward ({len(df)} jours, min_train={min_train})")
+
+    # La cible du dernier jour d'entraînement dépend du rendement du lendemain (premier
+    # jour de test) : ce jour est exclu de l'entraînement pour éviter toute fuite
+    fold_data = [
+        (i, X[:train_end - 1], y[:train_end - 1], X[train_end:test_end])
+        for i, (train_end, test_end) in enumerate(folds)
+    ]
+
+    if warm_start:
+        outputs = list(_run_warm_chain(fold_data, params, trees_per_fold, cache_dir))
+    elif n_jobs == 1:
+        outputs = [_run_fold((*data, params, cache_dir)) for data in fold_data]
+    else:
+        with ProcessPoolExecutor(max_workers=None if n_jobs == -1 else n_jobs) as pool:
+            outputs = list(pool.map(_run_fold, [(*data, params, cache_dir) for data in fold_data]))
+
+    outputs = sorted(outputs, key=lambda o: o[0])
+    oos = df.iloc[folds[0][0]:].copy().reset_index(drop=True)
+    oos["proba"] = np.concatenate([p for _, p, _, _, _ in outputs])
+    # Anomalies hors échantillon (alertes) : prédites par l'IsolationForest de chaque fold
+    oos["anomaly"] = np.concatenate([a for _, _, a, _, _ in outputs]).astype(oos["anomaly"].dtype)
+    oos["alert"] = compute_alerts(oos, sentiment_threshold)
+    oos = apply_positions(oos, proba_threshold, use_alerts, enable_short, short_threshold)
+
+    cum_return, sharpe, drawdown, invested_pct = compute_metrics(oos)
+    metrics = {
+        "cum_return": cum_return,
+        "sharpe": sharpe,
+        "drawdown": drawdown,
+        "invested_pct": invested_pct,
+        "accuracy": ((oos["proba"] > 0.5).astype(int) == oos["target"]).mean(),
+    }
+
+    report = pd.DataFrame([
+        {
+            "fold": fold,
+            "train_start": df["date"].iloc[0],
+            "train_end": df["date"].iloc[folds[fold][0] - 2],
+            "test_start": df["date"].iloc[folds[fold][0]],
+            "test_end": df["date"].iloc[folds[fold][1] - 1],
+            "n_train": folds[fold][0] - 1,
+            "n_test": folds[fold][1] - folds[fold][0],
+            "seconds": seconds,
+            "cached": cached,
+        }
+        for fold, _, _, seconds, cached in outputs
+    ])
+    return oos, metrics, report
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Backtest walk-forward (fenêtre croissante) hors échantillon")
+    parser.add_argument("asset")
+    parser.add_argument("--period", default="aout_dec2024")
+    parser.add_argument("--min-train", type=int, default=60)
+    parser.add_argument("--test-size", type=int, default=20)
+    parser.add_argument("--warm-start", action="store_true")
+    parser.add_argument("--trees-per-fold", type=int, default=20)
+    parser.add_argument("--jobs", type=int, default=1)
+    parser.add_argument("--proba-threshold", type=float, default=0.6)
+    parser.add_argument("--use-alerts", action="store_true")
+    parser.add_argument("--enable-short", action="store_true")
+    parser.add_argument("--short-threshold", type=float, default=-0.7)
+    parser.add_argument("--sentiment-threshold", type=float, default=-0.3)
+    args = parser.parse_args()
+
+    df = load_features(args.asset, args.period)
+    _, metrics, report = walk_forward_backtest(
+        df, args.proba_threshold, args.use_alerts, args.enable_short, args.short_threshold,
+        args.sentiment_threshold, args.min_train, args.test_size, warm_start=args.warm_start,
+        trees_per_fold=args.trees_per_fold, n_jobs=args.jobs
+    )
+    print(report.to_string(index=False))
+    print(f"\n📈 Return hors échantillon : {metrics['cum_return']:.2%}")
+    print(f"📏 Sharpe : {metrics['sharpe']:.2f}")
+    print(f"📉 Max Drawdown : {metrics['drawdown']:.2%}")
+    print(f"⏱️ % Temps Investi : {metrics['invested_pct']:.2%}")
+    print(f"🎯 Accuracy : {metrics['accuracy']:.2%}")
@@ -0,0 +1,107 @@
+import threading
+
+import numpy as np
+import pandas as pd
+
+from src.modeling.parameter_sweep import DEFAULT_GRID, iter_sweep, scenario_grid
+
+# --------------- CONFIG --------------- #
+
+METRICS = ["cum_return", "sharpe", "drawdown", "exposure"]
+
+# (use_alerts, enable_short) : configuration par défaut des sliders calculée en premier
+SCENARIOS = [(True, False), (False, False), (True, True), (False, True)]
+
+# Petits blocs : l'annulation est prise en compte rapidement
+WHAT_IF_BLOCK_SIZE = 256
+
+def scenario_key(proba_threshold, sentiment_threshold, short_threshold, use_alerts, enable_short, grid=DEFAULT_GRID):
+    # Seuils sans effet (alerte ou short désactivés) ramenés à la première valeur de la grille ;
+    # arrondi à 2 décimales comme les pas des sliders
+    if not use_alerts:
+        sentiment_threshold = grid["sentiment_thresholds"][0]
+    if not enable_short:
+        short_threshold = grid["short_thresholds"][0]
+    return (round(float(proba_threshold), 2), round(float(sentiment_threshold), 2),
+            round(float(short_threshold), 2), bool(use_alerts), bool(enable_short))
+
+# --------------- CACHE WHAT-IF --------------- #
+
+class WhatIfCache:
+    # Métriques (return, sharpe, drawdown, exposition) de toutes les positions des sliders
+    # pour un actif, calculées dans un thread (balayage vectorisé de parameter_sweep).
+    # Lisible pendant le calcul ; cancel() l'arrête au bloc suivant (changement d'actif).
+
+    def __init__(self, df, proba, grid=DEFAULT_GRID):
+        self.df = df[["avg_sentiment", "return", "anomaly"]].copy()
+        self.proba = np.asarray(proba).copy()
+        self.grid = grid
+        self.results = {}
+        self.total = sum(
+            int(np.prod([len(v) for v in scenario_grid(a, s, grid).values()])) for a, s in SCENARIOS
+        )
+        self.error = None
+        self._cancel = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def cancel(self):
+        self._cancel.set()
+
+    def wait(self, timeout=None):
+        self._thread.join(timeout)
+        return self.finished
+
+    @property
+    def cancelled(self):
+        return self._cancel.is_set()
+
+    @property
+    def finished(self):
+        return len(self.results) == self.total
+
+    @property
+    def running(self):
+        return self._thread.is_alive()
+
+    @property
+    def progress(self):
+        return len(self.results) / self.total if self.total else 1.0
+
+    def _run(self):
+        try:
+            for use_alerts, enable_short in SCENARIOS:
+                blocks = iter_sweep(
+                    self.df, self.proba, **scenario_grid(use_alerts, enable_short, self.grid),
+                    use_alerts_options=(use_alerts,), enable_short_options=(enable_short,),
+                    block_size=WHAT_IF_BLOCK_SIZE,
+                )
+                for block in blocks:
+                    if self._cancel.is_set():
+                        return
+                    keys = zip(*(block[c].round(2).tolist() for c in ["proba_threshold", "sentiment_threshold", "short_threshold"]),
+                               block["use_alerts"].tolist(), block["enable_short"].tolist())
+                    # dict.update : les lectures du thread Streamlit voient des entrées complètes
+                    self.results.update(zip(keys, block[METRICS].itertuples(index=False, name=None)))
+        except Exception as e:
+            self.error = e
+
+    def get(self, proba_threshold, sentiment_threshold, short_threshold, use_alerts, enable_short):
+        # (cum_return, sharpe, drawdown, exposure) ou None si pas encore calculé
+        return self.results.get(scenario_key(
+            proba_threshold, sentiment_threshold, short_threshold, use_alerts, enable_short, self.grid
+        ))
+
+    def sharpe_matrix(self, use_alerts, enable_short, short_threshold):
+        # Sharpe par (seuil de sentiment × seuil de proba) ; NaN = pas encore calculé
+        sentiments, probas = self.grid["sentiment_thresholds"], self.grid["proba_thresholds"]
+        values = np.full((len(sentiments), len(probas)), np.nan)
+        for i, s in enumerate(sentiments):
+            for j, p in enumerate(probas):
+                metrics = self.get(p, s, short_threshold, use_alerts, enable_short)
+                if metrics is not None:
+                    values[i, j] = metrics[1]
+        return pd.DataFrame(values, index=np.round(sentiments, 2), columns=np.round(probas, 2))
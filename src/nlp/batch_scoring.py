@@ -0,0 +1,120 @@
+import os
+import string
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from src.instrumentation import instrument
+from src.resources import get_vader
+
+# --------------- CONFIG --------------- #
+
+SCORE_FIELDS = ["compound", "pos", "neg", "neu"]
+
+# Taille des lots envoyés à chaque worker du pool
+DEFAULT_CHUNK_SIZE = 5000
+
+# Sous ce nombre de textes uniques, le pool coûte plus cher qu'il ne rapporte
+MIN_TEXTS_FOR_POOL = 20000
+
+# --------------- MOTEUR DE SCORING --------------- #
+
+class BatchVaderScorer:
+    # Scoring VADER par lots, résultats identiques à sia.polarity_scores :
+    # - chaque texte unique n'est scoré qu'une fois par lot
+    # - les textes sans aucun token du lexique court-circuitent VADER
+    #   (toutes les valences valent 0 → compound 0, neu 1)
+    # - la pertinence de chaque token est mise en cache entre les lots
+
+    def __init__(self, analyzer=None):
+        self.analyzer = analyzer or get_vader()
+        # Table de lookup pré-compilée : VADER compare toujours item.lower()
+        self.lexicon = frozenset(self.analyzer.lexicon)
+        self._token_cache = {}
+
+    def _is_sentiment_token(self, token):
+        hit = self._token_cache.get(token)
+        if hit is None:
+            # VADER retire au plus la ponctuation en bordure d'un token
+            lowered = token.lower()
+            hit = lowered in self.lexicon or lowered.strip(string.punctuation) in self.lexicon
+            self._token_cache[token] = hit
+        return hit
+
+    def score_one(self, text):
+        if not isinstance(text, str) or text.strip() == "":
+            return (0.0, 0.0, 0.0, 0.0)
+
+        tokens = text.split()
+        if not any(self._is_sentiment_token(t) for t in tokens):
+            # Aucune valence non nulle : neu = 1 dès qu'un token de 2+ caractères existe
+            has_words = any(len(t) > 1 for t in tokens)
+            return (0.0, 0.0, 0.0, 1.0 if has_words else 0.0)
+
+        scores = self.analyzer.polarity_scores(text)
+        return (scores["compound"], scores["pos"], scores["neg"], scores["neu"])
+
+    def _score_uniques(self, texts, n_jobs, chunk_size):
+        if n_jobs != 1 and len(texts) >= MIN_TEXTS_FOR_POOL:
+            return _score_in_pool(texts, n_jobs, chunk_size)
+        return np.array([self.score_one(t) for t in texts], dtype=float)
+
+    def score(self, texts, n_jobs=1, chunk_size=DEFAULT_CHUNK_SIZE, cache=None):
+        texts = pd.Series(texts, dtype=object).reset_index(drop=True)
+        codes, uniques = pd.factorize(texts, use_na_sentinel=False)
+        uniques = list(uniques)
+
+        if cache is None:
+            unique_scores = self._score_uniques(uniques, n_jobs, chunk_size)
+        else:
+            # Seuls les textes absents du cache passent par VADER
+            cached = cache.get_many(uniques)
+            missing = [t for t in uniques if not isinstance(t, str) or t not in cached]
+            computed = self._score_uniques(missing, n_jobs, chunk_size).reshape(-1, len(SCORE_FIELDS))
+            cache.put_many(zip(missing, map(tuple, computed)))
+            cached.update((t, row) for t, row in zip(missing, computed) if isinstance(t, str))
+            unique_scores = np.array(
+                [cached[t] if isinstance(t, str) else self.score_one(t) for t in uniques], dtype=float
+            )
+
+        unique_scores = unique_scores.reshape(-1, len(SCORE_FIELDS))
+        scores = unique_scores[codes]
+        return {field: scores[:, i] for i, field in enumerate(SCORE_FIELDS)}
+
+    def score_chunks(self, chunks, n_jobs=1, chunk_size=DEFAULT_CHUNK_SIZE, cache=None):
+        # Accepte un itérable de colonnes (ex : pd.read_csv(..., chunksize=...))
+        for chunk in chunks:
+            yield self.score(chunk, n_jobs=n_jobs, chunk_size=chunk_size, cache=cache)
+
+# --------------- POOL DE PROCESSUS --------------- #
+
+_worker_scorer = None
+
+def _init_worker():
+    global _worker_scorer
+    _worker_scorer = BatchVaderScorer()
+
+def _score_chunk(texts):
+    return [_worker_scorer.score_one(t) for t in texts]
+
+def _score_in_pool(texts, n_jobs, chunk_size):
+    n_jobs = os.cpu_count() if n_jobs in (None, -1) else n_jobs
+    chunks = [texts[i:i + chunk_size] for i in range(0, len(texts), chunk_size)]
+    with ProcessPoolExecutor(max_workers=n_jobs, initializer=_init_worker) as pool:
+        results = pool.map(_score_chunk, chunks)
+        return np.array([row for chunk in results for row in chunk], dtype=float)
+
+# --------------- API MODULE --------------- #
+
+_default_scorer = None
+
+def get_scorer():
+    global _default_scorer
+    if _default_scorer is None:
+        _default_scorer = BatchVaderScorer()
+    return _default_scorer
+
+@instrument("score_texts", rows=lambda scores: len(scores["compound"]))
+def score_texts(texts, n_jobs=1, chunk_size=DEFAULT_CHUNK_SIZE, cache=None):
+    return get_scorer().score(texts, n_jobs=n_jobs, chunk_size=chunk_size, cache=cache)
@@ -1,8 +1,26 @@
+import argparse
+
+import numpy as np
 import pandas as pd
 
+from src.config import CONTINUOUS_ASSETS
+
+# --------------- CONFIG --------------- #
+
+HOUR_NS = 3600 * 10**9
+DAY_NS = 24 * HOUR_NS
+
+BUCKET_SIZES = {"1h": HOUR_NS, "4h": 4 * HOUR_NS, "1d": DAY_NS}
+
+# "close" : bucket journalier de clôture à clôture, étiqueté par la séance qu'il précède
+MARKET_TZ = "America/New_York"
+MARKET_CLOSE_HOUR = 16
+
+DEFAULT_QUANTILES = (0.1, 0.5, 0.9)
+
 def aggregate_sentiment_by_day(input_path, output_path):
     df = pd.read_csv(input_path)
-    
+
     # Convertir les dates en datetime
     df["created_utc"] = pd.to_datetime(df["created_utc"])
 
@@ -14,6 +32,129 @@ def aggregate_sentiment_by_day(input_path, output_path):
     daily_sentiment.to_csv(output_path, index=False)
     print(f"{len(daily_sentiment)} jours de sentiment sauvegardés → {output_path}")
 
+# --------------- HORODATAGES INT64 --------------- #
+
+def to_epoch_ns(values):
+    # Epoch secondes (numérique) ou dates texte / datetime ; sans fuseau = UTC
+    values = pd.Series(values)
+    if pd.api.types.is_numeric_dtype(values):
+        return (values.to_numpy(dtype=float) * 1e9).astype(np.int64)
+    ts = pd.to_datetime(values, utc=True)
+    return ts.dt.tz_convert(None).dt.as_unit("ns").to_numpy().view(np.int64)
+
+def _wall_clock_ns(ts_ns, tz):
+    # Heure locale du marché (gère l'heure d'été), toujours en int64
+    if tz is None:
+        return ts_ns
+    index = pd.DatetimeIndex(ts_ns.view("datetime64[ns]"), tz="UTC")
+    return index.tz_convert(tz).tz_localize(None).asi8
+
+def bucket_labels(ts_ns, freq="1h", tz=None):
+    # Début du bucket (int64 ns). "close" : un post après la clôture compte pour la
+    # séance suivante, le week-end est reporté au lundi.
+    if freq == "close":
+        local = _wall_clock_ns(ts_ns, tz or MARKET_TZ)
+        days = (local - MARKET_CLOSE_HOUR * HOUR_NS) // DAY_NS + 1
+        sessions = np.busday_offset(days.astype("datetime64[D]"), 0, roll="forward")
+        return sessions.astype("datetime64[ns]").view(np.int64)
+    if freq not in BUCKET_SIZES:
+        raise ValueError(f"❌ Taille de bucket inconnue : {freq} (attendu : {', '.join([*BUCKET_SIZES, 'close'])})")
+    size = BUCKET_SIZES[freq]
+    return _wall_clock_ns(ts_ns, tz) // size * size
+
+# --------------- AGRÉGATION EN UNE PASSE --------------- #
+
+def _bucket_sentiment_order(labels, sentiment, step):
+    # Ordre (bucket, sentiment) : tri des sentiments puis tri stable des numéros de
+    # bucket. Sur 16 bits, le tri stable de NumPy est un radix sort (≈ 4x lexsort).
+    codes = (labels - labels.min()) // step
+    if codes.max() >= 2**16:
+        return np.lexsort((sentiment, labels))
+    by_sentiment = np.argsort(sentiment)
+    return by_sentiment[np.argsort(codes[by_sentiment].astype(np.uint16), kind="stable")]
+
+def _column(df, name, default):
+    if name not in df.columns:
+        return np.full(len(df), default, dtype=float)
+    return pd.to_numeric(df[name], errors="coerce").fillna(default).to_numpy(dtype=float)
+
+def resample_sentiment(df, freq="1h", tz=None, quantiles=DEFAULT_QUANTILES, time_col="created_utc"):
+    # Un seul tri (bucket, sentiment) puis des réductions par segment : moyenne, nombre,
+    # écart-type, moyennes pondérées upvotes / commentaires, quantiles et volumes.
+    sentiment = pd.to_numeric(df["sentiment"], errors="coerce").to_numpy(dtype=float)
+    keep = ~np.isnan(sentiment)
+    labels = bucket_labels(to_epoch_ns(df[time_col])[keep], freq, tz)
+    sentiment = sentiment[keep]
+    score = _column(df, "score", 0.0)[keep]
+    comments = _column(df, "num_comments", 0.0)[keep]
+
+    if len(labels) == 0:
+        return pd.DataFrame(columns=["timestamp", "n_posts", "sentiment_mean"])
+    order = _bucket_sentiment_order(labels, sentiment, DAY_NS if freq == "close" else BUCKET_SIZES[freq])
+    labels, sentiment, score, comments = labels[order], sentiment[order], score[order], comments[order]
+
+    starts = np.flatnonzero(np.r_[True, labels[1:] != labels[:-1]])
+    count = np.diff(np.r_[starts, len(labels)])
+    mean = np.add.reduceat(sentiment, starts) / count
+    deviation = sentiment - np.repeat(mean, count)
+    m2 = np.add.reduceat(deviation * deviation, starts)
+
+    # Poids ≥ 1 : un post à 0 upvote / 0 commentaire compte quand même
+    score_weight = np.clip(score, 0, None) + 1
+    comment_weight = np.clip(comments, 0, None) + 1
+
+    out = {
+        "timestamp": labels[starts].view("datetime64[ns]"),
+        "n_posts": count,
+        "sentiment_mean": mean,
+        "sentiment_std": np.where(count > 1, np.sqrt(m2 / np.maximum(count - 1, 1)), np.nan),
+        "sentiment_score_weighted": (
+            np.add.reduceat(sentiment * score_weight, starts) / np.add.reduceat(score_weight, starts)
+        ),
+        "sentiment_comment_weighted": (
+            np.add.reduceat(sentiment * comment_weight, starts) / np.add.reduceat(comment_weight, starts)
+        ),
+    }
+
+    # Quantiles à interpolation linéaire (comme pandas) : les segments sont déjà triés
+    last = starts + count - 1
+    for q in quantiles:
+        position = starts + q * (count - 1)
+        low = np.floor(position).astype(np.int64)
+        high = np.minimum(low + 1, last)
+        out[f"sentiment_q{round(q * 100):02d}"] = (
+            sentiment[low] + (sentiment[high] - sentiment[low]) * (position - low)
+        )
+
+    out["total_score"] = np.add.reduceat(score, starts)
+    out["total_comments"] = np.add.reduceat(comments, starts)
+    return pd.DataFrame(out)
+
+def session_freq(asset):
+    # Clôture à clôture pour les actifs cotés en bourse ; jour calendaire UTC (comme
+    # avg_sentiment) pour les actifs 24/7, sinon le week-end serait reporté au lundi
+    return "1d" if asset in CONTINUOUS_ASSETS else "close"
+
+def daily_sentiment_features(df, quantiles=DEFAULT_QUANTILES, freq="close"):
+    # Un bucket par séance (freq="close") ou par jour ("1d"), avec une colonne date
+    # comparable à Date (prix)
+    features = resample_sentiment(df, freq=freq, quantiles=quantiles)
+    features.insert(0, "date", features.pop("timestamp").dt.date)
+    return features
+
 if __name__ == "__main__":
-    aggregate_sentiment_by_day("data/reddit_sp500_sentiment.csv", "data/daily_sentiment.csv")
+    parser = argparse.ArgumentParser(description="Agrégation du sentiment par bucket (moyenne, std, pondérations, quantiles)")
+    parser.add_argument("input", nargs="?", default="data/reddit_sp500_sentiment.csv")
+    parser.add_argument("output", nargs="?", default="data/daily_sentiment.csv")
+    parser.add_argument("--freq", choices=[*BUCKET_SIZES, "close"], default=None,
+                        help="sans option : moyenne journalière simple (date, avg_sentiment)")
+    parser.add_argument("--tz", default=None)
+    args = parser.parse_args()
 
+    if args.freq is None:
+        aggregate_sentiment_by_day(args.input, args.output)
+    else:
+        posts = pd.read_csv(args.input)
+        buckets = resample_sentiment(posts, args.freq, args.tz)
+        buckets.to_csv(args.output, index=False)
+        print(f"{len(buckets)} buckets ({args.freq}) sauvegardés → {args.output}")
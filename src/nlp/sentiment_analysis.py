@@ -1,20 +1,22 @@
 import pandas as pd
-from nltk.sentiment.vader import SentimentIntensityAnalyzer
-import nltk
-
-nltk.download("vader_lexicon")
-sia = SentimentIntensityAnalyzer()
+from src.nlp.batch_scoring import get_scorer, score_texts
+from src.nlp.sentiment_cache import open_cache
+from src.resources import get_vader
 
 def apply_vader(text):
     if not isinstance(text, str) or text.strip() == "":
         return 0.0
-    return sia.polarity_scores(text)["compound"]
+    return get_vader().polarity_scores(text)["compound"]
 
-def run_sentiment_analysis(input_path, output_path):
+def run_sentiment_analysis(input_path, output_path, n_jobs=1, use_cache=True):
     df = pd.read_csv(input_path)
-    df["sentiment"] = df["clean_text"].apply(apply_vader)
+    cache = open_cache(get_scorer().analyzer) if use_cache else None
+    df["sentiment"] = score_texts(df["clean_text"], n_jobs=n_jobs, cache=cache)["compound"]
     df.to_csv(output_path, index=False)
     print(f"Sentiment ajouté à {len(df)} lignes → sauvegardé dans {output_path}")
+    if cache is not None:
+        stats = cache.stats()
+        print(f"🗄️ Cache sentiment : {stats['hits']} hits / {stats['misses']} misses ({stats['hit_rate']:.0%})")
 
 if __name__ == "__main__":
     run_sentiment_analysis("data/reddit_sp500_clean.csv", "data/reddit_sp500_sentiment.csv")
@@ -0,0 +1,146 @@
+import hashlib
+import sqlite3
+import time
+from importlib.metadata import version as package_version
+from pathlib import Path
+
+# --------------- CONFIG --------------- #
+
+DEFAULT_CACHE_PATH = Path("data/cache/sentiment_cache.sqlite")
+DEFAULT_MAX_ENTRIES = 5_000_000
+
+# Limite de paramètres par requête SQLite
+SQL_BATCH = 900
+
+# --------------- VERSION DU SCORER --------------- #
+
+def scorer_fingerprint(analyzer):
+    # Toute modif du lexique ou des constantes VADER change l'empreinte → le cache
+    # est vidé à l'ouverture. Le nettoyage n'en fait pas partie : la clé est déjà le
+    # texte nettoyé, partagé par tous les appelants (build_asset_datasets, streaming_pipeline,
+    # sentiment_analysis) quel que soit leur nettoyeur.
+    h = hashlib.sha1()
+    h.update(package_version("nltk").encode())
+    for word, valence in sorted(analyzer.lexicon.items()):
+        h.update(f"{word}\t{valence}\n".encode())
+    for word, scalar in sorted(analyzer.constants.BOOSTER_DICT.items()):
+        h.update(f"{word}\t{scalar}\n".encode())
+    return h.hexdigest()
+
+def text_key(text):
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=16).digest()
+
+# --------------- CACHE SQLITE --------------- #
+
+class SentimentCache:
+    # Cache persistant texte nettoyé → (compound, pos, neg, neu), éviction LRU
+
+    def __init__(self, path=DEFAULT_CACHE_PATH, version="", max_entries=DEFAULT_MAX_ENTRIES):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+
+        self.conn = sqlite3.connect(str(self.path), timeout=30)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS scores ("
+            "key BLOB PRIMARY KEY, compound REAL, pos REAL, neg REAL, neu REAL, last_used REAL)"
+        )
+        self.conn.execute("CREATE INDEX IF NOT EXISTS scores_lru ON scores(last_used)")
+        self.conn.execute("CREATE TABLE IF NOT EXISTS meta (name TEXT PRIMARY KEY, value TEXT)")
+        self._check_version(version)
+        # Nombre d'entrées tenu à jour par put_many : pas de COUNT(*) à chaque écriture
+        self._count = self.conn.execute("SELECT COUNT(*) FROM scores").fetchone()[0]
+
+    def _check_version(self, version):
+        row = self.conn.execute("SELECT value FROM meta WHERE name = 'version'").fetchone()
+        if row is not None and row[0] == version:
+            return
+        if row is not None:
+            print(f"♻️ Cache sentiment invalidé (lexique VADER modifié) : {self.path}")
+        with self.conn:
+            self.conn.execute("DELETE FROM scores")
+            self.conn.execute("INSERT OR REPLACE INTO meta VALUES ('version', ?)", (version,))
+
+    def get_many(self, texts):
+        keys = {text_key(t): t for t in texts if isinstance(t, str)}
+        found = {}
+        key_list = list(keys)
+        for i in range(0, len(key_list), SQL_BATCH):
+            batch = key_list[i:i + SQL_BATCH]
+            placeholders = ",".join("?" * len(batch))
+            rows = self.conn.execute(
+                f"SELECT key, compound, pos, neg, neu FROM scores WHERE key IN ({placeholders})", batch
+            ).fetchall()
+            for key, *scores in rows:
+                found[keys[key]] = tuple(scores)
+
+        if found:
+            now = time.time()
+            with self.conn:
+                self.conn.executemany(
+                    "UPDATE scores SET last_used = ? WHERE key = ?",
+                    ((now, text_key(t)) for t in found)
+                )
+
+        self.hits += len(found)
+        self.misses += len(keys) - len(found)
+        return found
+
+    def put_many(self, items):
+        now = time.time()
+        rows = [(text_key(t), *scores, now) for t, scores in items if isinstance(t, str)]
+        if not rows:
+            return
+        rows = list({row[0]: row for row in rows}.values())
+        existing = 0
+        for i in range(0, len(rows), SQL_BATCH):
+            batch = [row[0] for row in rows[i:i + SQL_BATCH]]
+            placeholders = ",".join("?" * len(batch))
+            existing += self.conn.execute(
+                f"SELECT COUNT(*) FROM scores WHERE key IN ({placeholders})", batch
+            ).fetchone()[0]
+        with self.conn:
+            self.conn.executemany("INSERT OR REPLACE INTO scores VALUES (?, ?, ?, ?, ?, ?)", rows)
+        self._count += len(rows) - existing
+        self._evict()
+
+    def _evict(self):
+        excess = self._count - self.max_entries
+        if excess <= 0:
+            return
+        with self.conn:
+            deleted = self.conn.execute(
+                "DELETE FROM scores WHERE key IN "
+                "(SELECT key FROM scores ORDER BY last_used LIMIT ?)", (excess,)
+            ).rowcount
+        self._count -= deleted
+
+    def __len__(self):
+        return self.conn.execute("SELECT COUNT(*) FROM scores").fetchone()[0]
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "entries": len(self),
+        }
+
+    def close(self):
+        self.conn.close()
+
+# --------------- OUVERTURE PARTAGÉE --------------- #
+
+_open_caches = {}
+
+def open_cache(analyzer, path=DEFAULT_CACHE_PATH, max_entries=DEFAULT_MAX_ENTRIES):
+    version = scorer_fingerprint(analyzer)
+    key = (str(path), version)
+    if key not in _open_caches:
+        _open_caches[key] = SentimentCache(path, version=version, max_entries=max_entries)
+    return _open_caches[key]
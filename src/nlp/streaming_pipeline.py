@@ -0,0 +1,100 @@
+import argparse
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from src.instrumentation import measure
+from src.nlp.batch_scoring import get_scorer, score_texts
+from src.nlp.sentiment_cache import open_cache
+from src.preprocessing.text_cleaning import clean_text
+
+# --------------- CONFIG --------------- #
+
+DEFAULT_CHUNK_SIZE = 50_000
+
+# --------------- AGRÉGATS GLISSANTS --------------- #
+
+class DailyAccumulator:
+    # Somme, nombre et M2 (variance) par jour, fusionnés lot par lot (Chan et al.).
+    # La mémoire dépend du nombre de jours, pas du nombre de posts.
+
+    def __init__(self):
+        self.stats = pd.DataFrame(columns=["sum", "count", "m2"], dtype=float)
+
+    def add(self, dates, sentiments):
+        chunk = pd.DataFrame({"date": dates, "sentiment": sentiments})
+        grouped = chunk.groupby("date")["sentiment"]
+        new = pd.DataFrame({"sum": grouped.sum(), "count": grouped.size().astype(float)})
+        new["m2"] = grouped.var(ddof=0).fillna(0) * new["count"]
+
+        index = self.stats.index.union(new.index)
+        old = self.stats.reindex(index, fill_value=0.0)
+        new = new.reindex(index, fill_value=0.0)
+
+        n = old["count"] + new["count"]
+        mean_old = (old["sum"] / old["count"]).fillna(0)
+        mean_new = (new["sum"] / new["count"]).fillna(0)
+        delta = mean_new - mean_old
+        m2 = old["m2"] + new["m2"] + delta ** 2 * old["count"] * new["count"] / n
+
+        self.stats = pd.DataFrame({"sum": old["sum"] + new["sum"], "count": n, "m2": m2})
+
+    def result(self, with_variance=False):
+        stats = self.stats.sort_index()
+        daily = pd.DataFrame({
+            "date": stats.index,
+            "avg_sentiment": stats["sum"] / stats["count"],
+            "n_posts": stats["count"].astype(int),
+        })
+        if with_variance:
+            # Écart-type échantillon (ddof=1), comme pandas
+            daily["sentiment_std"] = np.sqrt(stats["m2"] / (stats["count"] - 1)).where(stats["count"] > 1)
+        return daily.reset_index(drop=True)
+
+# --------------- PIPELINE EN STREAMING --------------- #
+
+def _chunk_clean_text(chunk):
+    if "clean_text" in chunk.columns:
+        return chunk["clean_text"]
+    full_text = chunk["title"].fillna("") + " " + chunk["selftext"].fillna("")
+    with measure("clean_text", rows=len(full_text)):
+        return full_text.apply(clean_text)
+
+def stream_sentiment_pipeline(input_path, output_path, chunk_size=DEFAULT_CHUNK_SIZE,
+                              scored_output_path=None, with_variance=False, n_jobs=1, use_cache=True):
+    # Lecture → nettoyage → scoring → agrégation journalière en un seul passage
+    cache = open_cache(get_scorer().analyzer) if use_cache else None
+    accumulator = DailyAccumulator()
+    n_rows = 0
+
+    for i, chunk in enumerate(pd.read_csv(input_path, chunksize=chunk_size)):
+        chunk["clean_text"] = _chunk_clean_text(chunk)
+        chunk["sentiment"] = score_texts(chunk["clean_text"], n_jobs=n_jobs, cache=cache)["compound"]
+        dates = pd.to_datetime(chunk["created_utc"]).dt.date
+        accumulator.add(dates, chunk["sentiment"])
+
+        if scored_output_path is not None:
+            chunk.to_csv(scored_output_path, mode="w" if i == 0 else "a", header=i == 0, index=False)
+        n_rows += len(chunk)
+        print(f"⏳ {n_rows} posts traités")
+
+    daily = accumulator.result(with_variance)
+    daily.to_csv(output_path, index=False)
+    print(f"{len(daily)} jours de sentiment sauvegardés → {output_path} ({n_rows} posts)")
+    return daily
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Scoring et agrégation journalière du sentiment en streaming")
+    parser.add_argument("input", type=Path, help="CSV de posts bruts (clean_text ou title/selftext, created_utc)")
+    parser.add_argument("output", type=Path, help="CSV journalier (date, avg_sentiment, n_posts)")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+    parser.add_argument("--scored-output", type=Path, default=None, help="CSV des posts scorés (optionnel)")
+    parser.add_argument("--variance", action="store_true", help="Ajoute l'écart-type journalier")
+    parser.add_argument("--jobs", type=int, default=1)
+    parser.add_argument("--no-cache", action="store_true")
+    args = parser.parse_args()
+    stream_sentiment_pipeline(
+        args.input, args.output, args.chunk_size, args.scored_output,
+        args.variance, args.jobs, not args.no_cache
+    )
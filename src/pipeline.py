@@ -0,0 +1,344 @@
+import argparse
+import hashlib
+import json
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from pathlib import Path
+
+from src.config import ASSETS, MERGE_PERIODS, PERIODS, PRICE_TICKERS
+
+# --------------- CONFIG --------------- #
+
+DATA_DIR = Path("data")
+STATE_PATH = DATA_DIR / "checkpoints" / "pipeline_state.json"
+SRC_DIR = Path(__file__).resolve().parent
+
+ONE_DAY = 24 * 3600
+
+# --------------- ÉTAPES --------------- #
+
+class Stage:
+    # inputs / outputs : fichiers (le graphe est déduit des chemins partagés)
+    # code : fichiers source dont une modification relance l'étape
+    # ttl : durée de validité en secondes pour les étapes sans entrée locale (réseau)
+    # after : dépendances explicites sans fichier commun
+
+    def __init__(self, name, func, kwargs=None, inputs=(), outputs=(), code=(), ttl=None, after=()):
+        self.name = name
+        self.func = func
+        self.kwargs = kwargs or {}
+        self.inputs = [str(p) for p in inputs]
+        self.outputs = [str(p) for p in outputs]
+        self.code = [str(p) for p in code]
+        self.ttl = ttl
+        self.after = list(after)
+
+def build_graph(stages):
+    # Dépendances de chaque étape + ordre topologique (erreur si cycle)
+    producers = {}
+    for stage in stages:
+        for output in stage.outputs:
+            producers[output] = stage.name
+    deps = {
+        stage.name: {producers[p] for p in stage.inputs if p in producers and producers[p] != stage.name}
+        | set(stage.after)
+        for stage in stages
+    }
+
+    order, done = [], set()
+    remaining = dict(deps)
+    while remaining:
+        ready = sorted(name for name, d in remaining.items() if d <= done)
+        if not ready:
+            raise ValueError(f"❌ Cycle dans le pipeline : {', '.join(sorted(remaining))}")
+        order.extend(ready)
+        done.update(ready)
+        for name in ready:
+            del remaining[name]
+    return deps, order, producers
+
+def select_stages(stages, only, deps):
+    # Étapes demandées (préfixes de nom) + toutes leurs dépendances amont
+    if not only:
+        return stages
+    wanted = {s.name for s in stages if any(s.name == o or s.name.startswith(o + ":") for o in only)}
+    stack = list(wanted)
+    while stack:
+        for dep in deps[stack.pop()]:
+            if dep not in wanted:
+                wanted.add(dep)
+                stack.append(dep)
+    return [s for s in stages if s.name in wanted]
+
+# --------------- EMPREINTES --------------- #
+
+def load_state(path=STATE_PATH):
+    path = Path(path)
+    if not path.exists():
+        return {"files": {}, "stages": {}}
+    with open(path) as f:
+        return json.load(f)
+
+def save_state(state, path=STATE_PATH):
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix(".tmp")
+    with open(tmp_path, "w") as f:
+        json.dump(state, f, indent=2)
+    os.replace(tmp_path, path)
+
+def file_digest(path, known):
+    # Hash du contenu, relu seulement si taille ou mtime ont changé :
+    # un rerun sans modification ne coûte qu'un stat() par fichier
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return "missing"
+    entry = known.get(path)
+    if entry is not None and entry["size"] == st.st_size and entry["mtime_ns"] == st.st_mtime_ns:
+        return entry["digest"]
+    h = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    known[path] = {"size": st.st_size, "mtime_ns": st.st_mtime_ns, "digest": h.hexdigest()}
+    return known[path]["digest"]
+
+def stage_fingerprint(stage, known):
+    h = hashlib.blake2b(digest_size=16)
+    h.update(stage.name.encode())
+    h.update(json.dumps(stage.kwargs, sort_keys=True, default=str).encode())
+    for path in sorted(stage.inputs) + sorted(stage.code):
+        h.update(f"{path}={file_digest(path, known)}\n".encode())
+    return h.hexdigest()
+
+def is_fresh(stage, fingerprint, record, now):
+    if record is None or record.get("status") != "ran" or record.get("fingerprint") != fingerprint:
+        return False
+    if stage.ttl is not None and now - record["finished_at"] > stage.ttl:
+        return False
+    # Sorties produites au dernier passage toujours présentes
+    return all(os.path.exists(p) for p in record.get("outputs", []))
+
+# --------------- EXÉCUTION --------------- #
+
+def _run_stage(func, kwargs):
+    start = time.perf_counter()
+    func(**kwargs)
+    return time.perf_counter() - start
+
+def run_pipeline(stages, only=None, force=False, n_workers=4, use_processes=False,
+                 state_path=STATE_PATH, dry_run=False):
+    # Ordonnancement dynamique : une étape part dès que ses dépendances sont terminées
+    start = time.perf_counter()
+    deps, order, producers = build_graph(stages)
+    stages = {s.name: s for s in select_stages(stages, only, deps)}
+    state = load_state(state_path)
+    report = {}
+
+    def finish(name, status, seconds=0.0, detail=""):
+        report[name] = {"stage": name, "status": status, "seconds": seconds, "detail": detail}
+
+    pool_cls = ProcessPoolExecutor if use_processes else ThreadPoolExecutor
+    with pool_cls(max_workers=n_workers) as pool:
+        running = {}
+        while len(report) < len(stages):
+            for name in order:
+                if name not in stages or name in report or name in running.values():
+                    continue
+                stage_deps = deps[name] & stages.keys()
+                if any(report.get(d, {}).get("status") in ("failed", "blocked", "missing") for d in stage_deps):
+                    finish(name, "blocked", detail="dépendance en échec")
+                    continue
+                if not all(d in report for d in stage_deps):
+                    continue
+
+                stage = stages[name]
+                absent = [p for p in stage.inputs if p not in producers and not os.path.exists(p)]
+                if absent:
+                    finish(name, "missing", detail=f"entrée absente : {absent[0]}")
+                    continue
+                if dry_run and any(report[d]["status"] == "stale" for d in stage_deps):
+                    # Une dépendance sera relancée : ses sorties (nos entrées) vont changer
+                    finish(name, "stale", detail="dépendance à relancer")
+                    continue
+                fingerprint = stage_fingerprint(stage, state["files"])
+                if not force and is_fresh(stage, fingerprint, state["stages"].get(name), time.time()):
+                    finish(name, "skipped", state["stages"][name].get("seconds", 0.0))
+                    continue
+                if dry_run:
+                    finish(name, "stale")
+                    continue
+                stage.fingerprint = fingerprint
+                running[pool.submit(_run_stage, stage.func, stage.kwargs)] = name
+                print(f"▶️ {name}")
+
+            if not running:
+                if len(report) < len(stages):
+                    raise RuntimeError("❌ Pipeline bloqué : étapes sans dépendances résolues")
+                continue
+            completed, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in completed:
+                name = running.pop(future)
+                stage = stages[name]
+                try:
+                    seconds = future.result()
+                except Exception as e:
+                    finish(name, "failed", detail=f"{type(e).__name__}: {e}")
+                    print(f"❌ {name} : {e}")
+                    continue
+                finish(name, "ran", seconds)
+                state["stages"][name] = {
+                    "status": "ran",
+                    # Empreinte d'avant l'exécution : une entrée modifiée pendant l'étape la relancera
+                    "fingerprint": stage.fingerprint,
+                    "finished_at": time.time(),
+                    "seconds": seconds,
+                    "outputs": [p for p in stage.outputs if os.path.exists(p)],
+                }
+                save_state(state, state_path)
+                print(f"✅ {name} ({seconds:.2f}s)")
+
+    if not dry_run:
+        save_state(state, state_path)
+    report = [report[name] for name in order if name in report]
+    print_report(report, time.perf_counter() - start)
+    return report
+
+def print_report(report, total_seconds):
+    icons = {"ran": "✅", "skipped": "⏭️", "stale": "🔄", "missing": "⚠️", "blocked": "⛔", "failed": "❌"}
+    print("\n📋 Pipeline :")
+    for row in report:
+        # Étape sautée : durée du dernier passage réel, pour référence
+        seconds = f"{row['seconds']:.2f}s" if row["seconds"] else ""
+        print(f"  {icons[row['status']]} {row['stage']:<28} {row['status']:<8} {seconds:>9}  {row['detail']}")
+    print(f"⏱️ Total : {total_seconds:.2f}s")
+
+# --------------- ÉTAPES DU PROJET --------------- #
+# Imports dans les fonctions : un rerun sans travail n'importe ni pandas ni sklearn
+
+def fetch_prices(asset):
+    from src.data_collection.fetch_price_data import update_prices
+
+    rows = update_prices([asset], n_workers=1)
+    if "error" in rows[0]:
+        raise RuntimeError(rows[0]["error"])
+
+def ingest_reddit(assets, periods):
+    from src.data_collection.incremental_ingestion import incremental_ingest
+
+    incremental_ingest(assets={a: ASSETS[a] for a in assets}, periods={p: PERIODS[p] for p in periods})
+
+def analyze_sentiment(input_path, output_path):
+    from src.nlp.sentiment_analysis import run_sentiment_analysis
+
+    run_sentiment_analysis(input_path, output_path)
+
+def aggregate_daily_sentiment(input_path, output_path):
+    from src.nlp.sentiment_aggregation import aggregate_sentiment_by_day
+
+    aggregate_sentiment_by_day(input_path, output_path)
+
+def merge_periods():
+    from src.data_collection.merge_sentiment_periods import merge_sentiment_periods
+
+    merge_sentiment_periods()
+
+def build_features_stage(assets, period):
+    from src.storage.feature_store import build_store
+
+    build_store(assets, [period])
+
+def run_batch_stage(assets, periods, output):
+    from src.modeling.batch_runner import run_batch
+
+    run_batch(assets, periods).to_csv(output, index=False)
+
+def run_sweep_stage(assets, period, output):
+    from src.modeling.parameter_sweep import sweep_assets
+
+    sweep_assets(assets, period).to_csv(output, index=False)
+
+def _sources(*modules):
+    return [SRC_DIR / m for m in modules]
+
+def default_stages(assets=ASSETS, periods=PERIODS, data_dir=DATA_DIR):
+    data_dir = Path(data_dir)
+    assets, periods = list(assets), list(periods)
+    price_files = [data_dir / f"{a.lower()}_prices.csv" for a in assets]
+    daily_files = {p: [data_dir / f"daily_sentiment_{a}_{p}.csv" for a in assets] for p in periods}
+    feature_files = {p: [data_dir / "features" / f"{a}_{p}.parquet" for a in assets] for p in periods}
+    modeling_code = _sources("modeling/compute_performance.py", "storage/market_data.py", "storage/parquet_store.py")
+
+    stages = [
+        Stage(f"prices:{a}", fetch_prices, {"asset": a}, outputs=[data_dir / f"{a.lower()}_prices.csv"],
+              code=_sources("data_collection/fetch_price_data.py"), ttl=ONE_DAY)
+        for a in assets if a in PRICE_TICKERS
+    ]
+    stages.append(Stage(
+        "reddit", ingest_reddit, {"assets": assets, "periods": periods},
+        outputs=[
+            data_dir / f"{prefix}_{a}_{p}.csv"
+            for a in assets for p in periods for prefix in ("reddit", "daily_sentiment", "sentiment_features")
+        ],
+        code=_sources("data_collection/incremental_ingestion.py", "data_collection/reddit_ingestion.py"),
+        ttl=ONE_DAY,
+    ))
+
+    # Chaîne historique (fichiers sans actif)
+    stages.append(Stage(
+        "sentiment:legacy", analyze_sentiment,
+        {"input_path": str(data_dir / "reddit_sp500_clean.csv"), "output_path": str(data_dir / "reddit_sp500_sentiment.csv")},
+        inputs=[data_dir / "reddit_sp500_clean.csv"], outputs=[data_dir / "reddit_sp500_sentiment.csv"],
+        code=_sources("nlp/sentiment_analysis.py", "nlp/batch_scoring.py"),
+    ))
+    stages.append(Stage(
+        "aggregate:legacy", aggregate_daily_sentiment,
+        {"input_path": str(data_dir / "reddit_sp500_sentiment.csv"), "output_path": str(data_dir / "daily_sentiment.csv")},
+        inputs=[data_dir / "reddit_sp500_sentiment.csv"], outputs=[data_dir / "daily_sentiment.csv"],
+        code=_sources("nlp/sentiment_aggregation.py"),
+    ))
+    stages.append(Stage(
+        "merge_periods", merge_periods,
+        inputs=[data_dir / f"daily_sentiment_{p}.csv" for p in MERGE_PERIODS],
+        outputs=[data_dir / "daily_sentiment_full.csv"],
+        code=_sources("data_collection/merge_sentiment_periods.py"),
+    ))
+
+    # Feature store (data/features/) : seules les nouvelles dates sont calculées
+    for p in periods:
+        stages.append(Stage(
+            f"features:{p}", build_features_stage, {"assets": assets, "period": p},
+            inputs=price_files + daily_files[p] + [data_dir / f"sentiment_features_{a}_{p}.csv" for a in assets],
+            outputs=feature_files[p],
+            code=modeling_code + _sources("storage/feature_store.py"),
+        ))
+
+    # Modélisation
+    stages.append(Stage(
+        "batch", run_batch_stage, {"assets": assets, "periods": periods, "output": str(data_dir / "batch_results.csv")},
+        inputs=[f for files in feature_files.values() for f in files],
+        outputs=[data_dir / "batch_results.csv"],
+        code=modeling_code + _sources("modeling/batch_runner.py"),
+    ))
+    for p in periods:
+        output = data_dir / f"threshold_sweep_{p}.csv"
+        stages.append(Stage(
+            f"sweep:{p}", run_sweep_stage, {"assets": assets, "period": p, "output": str(output)},
+            inputs=feature_files[p], outputs=[output],
+            code=modeling_code + _sources("modeling/parameter_sweep.py"),
+        ))
+    return stages
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Pipeline complet (graphe de dépendances, étapes à jour sautées)")
+    parser.add_argument("--only", nargs="+", default=None, help="étapes (ou préfixes, ex. prices) et leurs dépendances")
+    parser.add_argument("--force", action="store_true", help="relance même les étapes à jour")
+    parser.add_argument("--dry-run", action="store_true", help="affiche les étapes à relancer sans rien exécuter")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--processes", action="store_true", help="pool de processus au lieu de threads")
+    parser.add_argument("--state", default=str(STATE_PATH))
+    args = parser.parse_args()
+
+    run_pipeline(default_stages(), args.only, args.force, args.workers, args.processes, args.state, args.dry_run)
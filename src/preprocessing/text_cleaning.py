@@ -1,26 +1,28 @@
 import re
-import nltk
-import spacy
-from nltk.corpus import stopwords
 
-nlp = spacy.load("en_core_web_sm")
-STOPWORDS = set(stopwords.words("english"))
+from src.instrumentation import instrument
+from src.resources import get_spacy_model, get_stopwords
+
+# Une seule passe regex : URLs puis tout ce qui n'est ni lettre ni espace
+# (même résultat que les trois re.sub successifs)
+CLEAN_PATTERN = re.compile(r"http\S+|[^a-z\s]")
+
+# Composants spaCy inutiles pour obtenir les lemmes
+UNUSED_COMPONENTS = ["parser", "ner"]
 
 def clean_text(text):
     if not isinstance(text, str):
         return ""
 
-    text = text.lower()
-    text = re.sub(r"http\S+", "", text)                    # URLs
-    text = re.sub(r"[^a-z\s]", "", text)                   # Punctuation & numbers
-    text = re.sub(r"\s+", " ", text).strip()               # Extra whitespace
-    return text
+    text = CLEAN_PATTERN.sub("", text.lower())    # URLs, ponctuation & chiffres
+    return " ".join(text.split())                  # Extra whitespace
 
 def remove_stopwords(text):
-    return " ".join([word for word in text.split() if word not in STOPWORDS])
+    stopwords = get_stopwords()
+    return " ".join([word for word in text.split() if word not in stopwords])
 
 def lemmatize(text):
-    doc = nlp(text)
+    doc = get_spacy_model()(text)
     return " ".join([token.lemma_ for token in doc if token.lemma_ != "-PRON-"])
 
 def preprocess_pipeline(text):
@@ -29,3 +31,23 @@ def preprocess_pipeline(text):
     text = lemmatize(text)
     return text
 
+@instrument("preprocess_batch", rows=len)
+def preprocess_batch(texts, batch_size=1000, n_process=1):
+    # Version lot de preprocess_pipeline : nettoyage + stopwords en une passe,
+    # puis nlp.pipe sans parser/NER. Les lemmes dépendent du contexte (POS),
+    # ils sont donc mémoïsés par document nettoyé identique.
+    stopwords = get_stopwords()
+    nlp = get_spacy_model()
+    cleaned = [
+        " ".join(word for word in clean_text(text).split() if word not in stopwords)
+        for text in texts
+    ]
+    unique_texts = list(dict.fromkeys(cleaned))
+
+    disable = [name for name in UNUSED_COMPONENTS if name in nlp.pipe_names]
+    docs = nlp.pipe(unique_texts, batch_size=batch_size, n_process=n_process, disable=disable)
+    lemmas = {
+        text: " ".join(token.lemma_ for token in doc if token.lemma_ != "-PRON-")
+        for text, doc in zip(unique_texts, docs)
+    }
+    return [lemmas[text] for text in cleaned]
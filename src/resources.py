@@ -0,0 +1,78 @@
+import os
+from pathlib import Path
+
+from src.instrumentation import measure
+
+# --------------- CONFIG --------------- #
+
+# Dossier local des modèles (fonctionne hors ligne) :
+#   <RESOURCES_DIR>/nltk_data/          → corpus NLTK (vader_lexicon, stopwords)
+#   <RESOURCES_DIR>/en_core_web_sm/     → modèle spaCy (optionnel, sinon paquet installé)
+RESOURCES_DIR = Path(os.environ.get("MARKET_NLP_RESOURCES", "models"))
+
+# MARKET_NLP_OFFLINE=1 : jamais de tentative de téléchargement
+OFFLINE = os.environ.get("MARKET_NLP_OFFLINE", "0") == "1"
+
+NLTK_RESOURCES = {
+    "vader_lexicon": "sentiment/vader_lexicon.zip",
+    "stopwords": "corpora/stopwords",
+}
+
+# --------------- REGISTRE --------------- #
+
+# Ressources chargées une seule fois par processus, au premier usage.
+# Les imports nltk / spacy sont faits ici (et pas en tête de module)
+# pour que l'import des modules de src/ reste instantané.
+_resources = {}
+
+def _get_or_load(name, loader):
+    if name not in _resources:
+        # Temps de chargement dans les mesures (résumé CLI, metrics.json, panneau de l'app)
+        with measure(f"load:{name}"):
+            _resources[name] = loader()
+    return _resources[name]
+
+def _ensure_nltk_resource(resource):
+    import nltk
+
+    local_dir = RESOURCES_DIR / "nltk_data"
+    if str(local_dir) not in nltk.data.path:
+        nltk.data.path.insert(0, str(local_dir))
+    try:
+        nltk.data.find(NLTK_RESOURCES[resource])
+        return
+    except LookupError:
+        if OFFLINE:
+            raise LookupError(
+                f"❌ Ressource NLTK '{resource}' introuvable hors ligne (attendue dans {local_dir})"
+            )
+
+    print(f"📥 Téléchargement NLTK : {resource} → {local_dir}")
+    if not nltk.download(resource, download_dir=str(local_dir), quiet=True):
+        raise LookupError(f"❌ Impossible de télécharger '{resource}' (copier le corpus dans {local_dir})")
+
+# --------------- ACCESSEURS --------------- #
+
+def get_vader():
+    def load():
+        from nltk.sentiment.vader import SentimentIntensityAnalyzer
+
+        _ensure_nltk_resource("vader_lexicon")
+        return SentimentIntensityAnalyzer()
+    return _get_or_load("vader", load)
+
+def get_stopwords(lang="english"):
+    def load():
+        from nltk.corpus import stopwords
+
+        _ensure_nltk_resource("stopwords")
+        return frozenset(stopwords.words(lang))
+    return _get_or_load(f"stopwords_{lang}", load)
+
+def get_spacy_model(name="en_core_web_sm"):
+    def load():
+        import spacy
+
+        local_path = RESOURCES_DIR / name
+        return spacy.load(local_path if local_path.exists() else name)
+    return _get_or_load(f"spacy_{name}", load)
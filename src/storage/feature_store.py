@@ -0,0 +1,274 @@
+import argparse
+import json
+import os
+from collections import OrderedDict
+from datetime import datetime
+from pathlib import Path
+
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import IsolationForest
+
+from src.config import ASSETS, PERIODS
+from src.instrumentation import instrument
+from src.storage.market_data import DATA_DIR, file_version, load_asset_frame, price_path, sentiment_path
+
+# --------------- CONFIG --------------- #
+
+# À incrémenter quand la définition d'une feature change : tout est reconstruit
+FEATURE_VERSION = 1
+
+ANOMALY_PARAMS = {"contamination": 0.1, "random_state": 42}
+
+# Statistiques glissantes du sentiment et du volume de posts
+SENTIMENT_WINDOWS = (5, 20)
+ZSCORE_WINDOW = 20
+MAX_WINDOW = max(*SENTIMENT_WINDOWS, ZSCORE_WINDOW)
+
+ROLLING_FEATURES = [
+    *(f"sentiment_ma_{w}" for w in SENTIMENT_WINDOWS),
+    f"sentiment_std_{ZSCORE_WINDOW}", f"sentiment_zscore_{ZSCORE_WINDOW}",
+    f"n_posts_ma_{ZSCORE_WINDOW}", f"n_posts_zscore_{ZSCORE_WINDOW}",
+]
+
+# Colonnes comparées pour détecter les lignes ajoutées ou réécrites depuis le dernier build
+SOURCE_COLUMNS = ["avg_sentiment", "Close", "return", "n_posts"]
+
+# Feature stores gardés en mémoire (clé : fichier, version des sources)
+MAX_CACHED_FEATURES = 16
+
+# --------------- FICHIERS --------------- #
+
+def features_dir(data_dir=DATA_DIR):
+    return Path(data_dir) / "features"
+
+def feature_paths(asset, period_key, data_dir=DATA_DIR):
+    # (features .parquet, métadonnées .json, IsolationForest .joblib)
+    base = features_dir(data_dir) / f"{asset}_{period_key}"
+    return base.with_suffix(".parquet"), base.with_suffix(".json"), base.with_suffix(".joblib")
+
+# Statistiques de sentiment_features_<ASSET>_<période>.csv (sentiment_aggregation), ajoutées
+# à la lecture sur demande (with_sentiment_features) : ni stockées ni utilisées par défaut
+SENTIMENT_FEATURES = [
+    "sentiment_std", "sentiment_score_weighted", "sentiment_comment_weighted",
+    "sentiment_q10", "sentiment_q50", "sentiment_q90", "total_score", "total_comments",
+]
+
+def post_counts_path(asset, period_key, data_dir=DATA_DIR):
+    # Écrit par build_asset_datasets / incremental_ingestion (sentiment_aggregation)
+    return Path(data_dir) / f"sentiment_features_{asset}_{period_key}.csv"
+
+def source_version(asset, period_key, data_dir=DATA_DIR):
+    return list(file_version(
+        sentiment_path(asset, period_key, data_dir), price_path(asset, data_dir),
+        post_counts_path(asset, period_key, data_dir),
+    ))
+
+def _write_atomic(path, write):
+    tmp_path = path.with_name(path.name + ".tmp")
+    write(tmp_path)
+    os.replace(tmp_path, path)
+
+# --------------- CALCUL DES FEATURES --------------- #
+
+def load_source_frame(asset, period_key, data_dir=DATA_DIR, price_df=None):
+    # Sentiment + prix alignés (market_data), cible, variation du sentiment et nombre
+    # de posts par jour. Lignes incomplètes gardées : l'IsolationForest est ajusté
+    # dessus comme dans compute_performance.load_data (complete_rows les retire).
+    df = load_asset_frame(asset, period_key, data_dir, price_df=price_df)
+    df["target"] = (df["return"].shift(-1) > 0).astype(int)
+    df["sentiment_change"] = df["avg_sentiment"].diff()
+    if df.empty or df[["avg_sentiment", "return"]].dropna().empty:
+        raise ValueError(f"⚠️ Données vides ou inexploitables pour {asset} - {period_key}")
+
+    # n_posts du fichier journalier (aggregate_daily, même jour calendaire que avg_sentiment) ;
+    # sentiment_features seulement pour les anciens fichiers qui n'ont pas la colonne
+    if "n_posts" not in df.columns:
+        counts_file = post_counts_path(asset, period_key, data_dir)
+        if counts_file.exists():
+            counts = pd.read_csv(counts_file, usecols=["date", "n_posts"])
+            counts["date"] = pd.to_datetime(counts["date"]).dt.date
+            df = pd.merge(df, counts, on="date", how="left")
+        else:
+            df["n_posts"] = np.nan
+    df["n_posts"] = df["n_posts"].fillna(0).astype(float)
+    return df
+
+def add_sentiment_features(df, asset, period_key, data_dir=DATA_DIR):
+    # Jours sans post : 0 (pas de dispersion, pas de volume) plutôt qu'une ligne perdue
+    path = post_counts_path(asset, period_key, data_dir)
+    if not path.exists():
+        raise FileNotFoundError(f"❌ Fichier de features introuvable : {path}")
+    features = pd.read_csv(path, usecols=["date", *SENTIMENT_FEATURES])
+    features["date"] = pd.to_datetime(features["date"]).dt.date
+    df = pd.merge(df, features, on="date", how="left")
+    df[SENTIMENT_FEATURES] = df[SENTIMENT_FEATURES].fillna(0)
+    return df
+
+def complete_rows(df):
+    return df.dropna().reset_index(drop=True)
+
+def anomaly_inputs(df):
+    return df[["avg_sentiment", "return"]].fillna(0)
+
+def add_rolling_features(df, start=0):
+    # Recalcule les statistiques glissantes des lignes start.. en ne relisant que
+    # les MAX_WINDOW - 1 lignes précédentes
+    first = max(start - MAX_WINDOW + 1, 0)
+    sentiment = df["avg_sentiment"].iloc[first:]
+    posts = df["n_posts"].iloc[first:]
+
+    rolling = pd.DataFrame(index=sentiment.index)
+    for w in SENTIMENT_WINDOWS:
+        rolling[f"sentiment_ma_{w}"] = sentiment.rolling(w, min_periods=1).mean()
+    for name, values in [("sentiment", sentiment), ("n_posts", posts)]:
+        mean = values.rolling(ZSCORE_WINDOW, min_periods=1).mean()
+        std = values.rolling(ZSCORE_WINDOW, min_periods=2).std()
+        # Écart-type nul ou indéfini (début d'historique) : z-score 0
+        zscore = ((values - mean) / std.where(std > 0)).fillna(0)
+        if name == "sentiment":
+            rolling[f"sentiment_std_{ZSCORE_WINDOW}"] = std.fillna(0)
+        else:
+            rolling[f"n_posts_ma_{ZSCORE_WINDOW}"] = mean
+        rolling[f"{name}_zscore_{ZSCORE_WINDOW}"] = zscore
+
+    for column in ROLLING_FEATURES:
+        if column not in df.columns:
+            df[column] = 0.0
+        df.loc[start:, column] = rolling[column].loc[start:].to_numpy()
+    return df
+
+def build_features(source):
+    # Build complet : IsolationForest ajusté sur tout l'historique (comme load_data)
+    df = source.copy()
+    model = IsolationForest(**ANOMALY_PARAMS).fit(anomaly_inputs(df))
+    df["anomaly"] = model.predict(anomaly_inputs(df))
+    return add_rolling_features(complete_rows(df)), model
+
+def first_changed_row(stored, source):
+    # Index de la première ligne ajoutée ou réécrite (len(stored) si simple ajout)
+    n = min(len(stored), len(source))
+    same_dates = stored["date"].iloc[:n].to_numpy() == source["date"].iloc[:n].to_numpy()
+    same_values = np.all(
+        stored[SOURCE_COLUMNS].iloc[:n].to_numpy() == source[SOURCE_COLUMNS].iloc[:n].to_numpy(), axis=1
+    )
+    changed = np.flatnonzero(~(same_dates & same_values))
+    if len(changed):
+        return int(changed[0])
+    return n
+
+def update_features(stored, source, model):
+    # Lignes inchangées conservées ; lignes nouvelles ou réécrites scorées par le modèle
+    # du dernier build, statistiques glissantes recalculées à partir de la première d'entre elles.
+    # La cible de la dernière ligne stockée (rendement du lendemain inconnu) est mise à jour.
+    source = complete_rows(source)
+    start = first_changed_row(stored, source)
+    df = pd.concat([stored.iloc[:start], source.iloc[start:]], ignore_index=True)
+    df["target"] = source["target"].to_numpy()
+    if start < len(df):
+        df.loc[start:, "anomaly"] = model.predict(anomaly_inputs(df.iloc[start:]))
+    df["anomaly"] = df["anomaly"].astype(int)
+    return add_rolling_features(df, start), len(df) - start
+
+# --------------- STORE --------------- #
+
+_feature_cache = OrderedDict()
+
+def clear_cache():
+    _feature_cache.clear()
+
+def read_meta(meta_path):
+    if not meta_path.exists():
+        return None
+    with open(meta_path) as f:
+        return json.load(f)
+
+def save_features(df, model, meta, paths):
+    parquet_path, meta_path, model_path = paths
+    parquet_path.parent.mkdir(parents=True, exist_ok=True)
+    _write_atomic(parquet_path, lambda p: df.to_parquet(p, index=False))
+    if model is not None:
+        _write_atomic(model_path, lambda p: joblib.dump(model, p))
+    # Métadonnées en dernier : elles valident les deux fichiers précédents
+    _write_atomic(meta_path, lambda p: p.write_text(json.dumps(meta, indent=2)))
+
+def read_features(parquet_path):
+    df = pd.read_parquet(parquet_path)
+    df["date"] = pd.to_datetime(df["date"]).dt.date
+    return df
+
+def refresh_features(asset, period_key, data_dir=DATA_DIR, price_df=None, rebuild=False):
+    # Met le store à jour si les sources ont changé ; renvoie (features, statut)
+    paths = feature_paths(asset, period_key, data_dir)
+    parquet_path, meta_path, model_path = paths
+    version = source_version(asset, period_key, data_dir)
+    meta = read_meta(meta_path)
+    usable = (not rebuild and meta is not None and meta["feature_version"] == FEATURE_VERSION
+              and parquet_path.exists() and model_path.exists())
+
+    if usable and meta["source_version"] == version:
+        return read_features(parquet_path), "fresh"
+
+    source = load_source_frame(asset, period_key, data_dir, price_df)
+    if usable:
+        model = joblib.load(model_path)
+        df, n_updated = update_features(read_features(parquet_path), source, model)
+        status = f"+{n_updated} lignes"
+        meta.update({"updated_rows": meta.get("updated_rows", 0) + n_updated})
+        model = None  # inchangé sur disque
+    else:
+        df, model = build_features(source)
+        status = "reconstruit"
+        meta = {"feature_version": FEATURE_VERSION, "built_at": datetime.now().isoformat(timespec="seconds"),
+                "updated_rows": 0}
+
+    meta.update({"source_version": version, "rows": len(df),
+                 "last_date": str(df["date"].iloc[-1]), "columns": list(df.columns)})
+    save_features(df, model, meta, paths)
+    return df, status
+
+@instrument("load_features", rows=len)
+def load_features(asset, period_key, data_dir=DATA_DIR, columns=None, price_df=None, rebuild=False,
+                  with_sentiment_features=False):
+    # Features prêtes pour fit_model / simulate_strategy : aucune recomputation si
+    # les sources n'ont pas changé, seulement les nouvelles dates sinon.
+    # with_sentiment_features : ajoute SENTIMENT_FEATURES (std, moyennes pondérées, quantiles)
+    parquet_path = feature_paths(asset, period_key, data_dir)[0]
+    key = (str(parquet_path), tuple(source_version(asset, period_key, data_dir)))
+    if not rebuild and key in _feature_cache:
+        _feature_cache.move_to_end(key)
+        df = _feature_cache[key]
+    else:
+        df, _ = refresh_features(asset, period_key, data_dir, price_df, rebuild)
+        _feature_cache[key] = df
+        if len(_feature_cache) > MAX_CACHED_FEATURES:
+            _feature_cache.popitem(last=False)
+    if with_sentiment_features:
+        df = add_sentiment_features(df, asset, period_key, data_dir)
+    return (df if columns is None else df[["date", *columns]]).copy()
+
+def feature_matrix(asset, period_key, columns, data_dir=DATA_DIR):
+    # (dates, X float64 aligné, cible) pour un modèle
+    df = load_features(asset, period_key, data_dir)
+    return df["date"].to_numpy(), df[columns].to_numpy(dtype=float), df["target"].to_numpy()
+
+def build_store(assets=ASSETS, periods=PERIODS, data_dir=DATA_DIR, rebuild=False):
+    for asset in assets:
+        for period_key in periods:
+            try:
+                df, status = refresh_features(asset, period_key, data_dir, rebuild=rebuild)
+            except (FileNotFoundError, ValueError) as e:
+                print(f"⏭️ {asset} - {period_key} : {e}")
+                continue
+            icon = "✅" if status == "fresh" else "🗄️"
+            print(f"{icon} {asset} - {period_key} : {status} ({len(df)} jours) → {feature_paths(asset, period_key, data_dir)[0]}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Feature store : features par actif matérialisées et mises à jour incrémentalement")
+    parser.add_argument("--assets", nargs="+", default=list(ASSETS))
+    parser.add_argument("--periods", nargs="+", default=list(PERIODS))
+    parser.add_argument("--data-dir", default=str(DATA_DIR))
+    parser.add_argument("--rebuild", action="store_true", help="réajuste l'IsolationForest sur tout l'historique")
+    args = parser.parse_args()
+    build_store(args.assets, args.periods, args.data_dir, args.rebuild)
@@ -0,0 +1,116 @@
+from collections import OrderedDict
+from datetime import timedelta
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from src.storage.parquet_store import MANIFEST_NAME, read_frame, store_dir
+
+# --------------- CONFIG --------------- #
+
+DATA_DIR = Path("data")
+
+# Frames alignés gardés en mémoire (clé : fichiers, plage de dates, version des fichiers)
+MAX_CACHED_FRAMES = 32
+
+def sentiment_path(asset, period_key, data_dir=DATA_DIR):
+    return Path(data_dir) / f"daily_sentiment_{asset}_{period_key}.csv"
+
+def price_path(asset, data_dir=DATA_DIR):
+    return Path(data_dir) / f"{asset.lower()}_prices.csv"
+
+def file_version(*paths):
+    # mtimes des fichiers et du manifest du store : toute réécriture invalide le cache
+    paths = [Path(p) for p in paths]
+    paths += list(dict.fromkeys(store_dir(p.parent) / MANIFEST_NAME for p in paths))
+    return tuple(p.stat().st_mtime if p.exists() else None for p in paths)
+
+# --------------- ALIGNEMENT SUR INDEX INT64 --------------- #
+
+EPOCH_ORDINAL = 719163  # date(1970, 1, 1).toordinal()
+
+def to_day_index(dates):
+    # Objets date / datetime64 → jours depuis l'epoch (int64). Pour des objets date,
+    # toordinal() est ~10x plus rapide que la conversion NumPy élément par élément.
+    dates = pd.Series(dates)
+    if pd.api.types.is_datetime64_any_dtype(dates):
+        return dates.to_numpy(dtype="datetime64[D]").view(np.int64)
+    return np.fromiter((d.toordinal() for d in dates), dtype=np.int64, count=len(dates)) - EPOCH_ORDINAL
+
+def align_on_days(left_days, right_days, tolerance=0):
+    # left_days, right_days triés. Pour chaque jour de gauche, dernier jour de droite
+    # ≤ jour de gauche, à moins de tolerance jours (0 : égalité stricte, comme un inner join)
+    position = np.searchsorted(right_days, left_days, side="right") - 1
+    matched = position >= 0
+    matched[matched] = left_days[matched] - right_days[position[matched]] <= tolerance
+    return np.flatnonzero(matched), position[matched]
+
+def align_frames(sentiment_df, price_df, tolerance=0):
+    # Équivalent de pd.merge(sentiment, prix, left_on="date", right_on="Date") pour des
+    # jours uniques, sans comparer d'objets date Python
+    sentiment_df = sentiment_df.sort_values("date", kind="stable")
+    price_df = price_df.sort_values("Date", kind="stable")
+    left, right = align_on_days(
+        to_day_index(sentiment_df["date"]), to_day_index(price_df["Date"]), tolerance
+    )
+    return pd.concat([
+        sentiment_df.iloc[left].reset_index(drop=True),
+        price_df.iloc[right].reset_index(drop=True),
+    ], axis=1)
+
+# --------------- CHARGEMENT PARTAGÉ --------------- #
+
+_frame_cache = OrderedDict()
+
+def clear_cache():
+    _frame_cache.clear()
+
+def _read_aligned(sentiment_file, price_file, start, end, lookback_days, tolerance, price_df):
+    # Quelques jours avant start pour que le premier rendement soit défini
+    read_start = start - timedelta(days=lookback_days) if start is not None else None
+    sentiment_df = read_frame(sentiment_file, read_start, end)
+    if sentiment_df.empty:
+        raise ValueError(f"⚠️ Données vides ou inexploitables : {sentiment_file}")
+
+    # Seule la plage de dates couverte par le sentiment est lue côté prix
+    first, last = sentiment_df["date"].min(), sentiment_df["date"].max()
+    if price_df is None:
+        price_df = read_frame(price_file, first - timedelta(days=tolerance), last)
+    else:
+        price_df = price_df[(price_df["Date"] >= first - timedelta(days=tolerance)) & (price_df["Date"] <= last)]
+
+    df = align_frames(sentiment_df, price_df, tolerance)
+    df["return"] = df["Close"].pct_change()
+    if start is not None:
+        df = df[df["date"] >= start].reset_index(drop=True)
+    return df
+
+def load_market_frame(sentiment_file, price_file, start=None, end=None, lookback_days=0,
+                      tolerance=0, price_df=None):
+    # Sentiment + prix normalisés (parquet_store), alignés par jour, avec "return".
+    # price_df : prix déjà chargés par l'appelant (pas de mise en cache dans ce cas).
+    # Chaque appel renvoie une copie : les appelants ajoutent leurs propres colonnes.
+    sentiment_file, price_file = Path(sentiment_file), Path(price_file)
+    if not sentiment_file.exists():
+        raise FileNotFoundError(f"❌ Fichier sentiment introuvable : {sentiment_file}")
+    if price_df is None and not price_file.exists():
+        raise FileNotFoundError(f"❌ Fichier prix introuvable : {price_file}")
+
+    if price_df is not None:
+        return _read_aligned(sentiment_file, price_file, start, end, lookback_days, tolerance, price_df)
+
+    key = (str(sentiment_file), str(price_file), start, end, lookback_days, tolerance,
+           file_version(sentiment_file, price_file))
+    if key in _frame_cache:
+        _frame_cache.move_to_end(key)
+        return _frame_cache[key].copy()
+
+    df = _read_aligned(sentiment_file, price_file, start, end, lookback_days, tolerance, None)
+    _frame_cache[key] = df
+    if len(_frame_cache) > MAX_CACHED_FRAMES:
+        _frame_cache.popitem(last=False)
+    return df.copy()
+
+def load_asset_frame(asset, period_key, data_dir=DATA_DIR, **kwargs):
+    return load_market_frame(sentiment_path(asset, period_key, data_dir), price_path(asset, data_dir), **kwargs)
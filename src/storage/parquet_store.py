@@ -0,0 +1,186 @@
+import json
+import re
+from pathlib import Path
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+from pyarrow import fs
+
+from src.config import ASSETS
+from src.instrumentation import instrument
+
+# --------------- CONFIG --------------- #
+
+STORE_DIRNAME = "store"
+MANIFEST_NAME = "manifest.json"
+
+KNOWN_ASSETS = list(ASSETS)
+
+# Colonne date et partitions de chaque jeu de données
+DATASETS = {
+    "prices": {"date_col": "Date", "partitions": ["asset", "year"]},
+    "daily_sentiment": {"date_col": "date", "partitions": ["asset", "period"]},
+    "reddit_posts": {"date_col": "date", "partitions": ["asset", "period"]},
+}
+
+# Lecture memory-mappée des fichiers Parquet
+_LOCAL_FS = fs.LocalFileSystem(use_mmap=True)
+
+# --------------- NORMALISATION --------------- #
+
+def normalize_price_frame(price_df):
+    # Gère les CSV yfinance : ligne "Ticker,SPY,SPY,...", ligne "Date,,,,",
+    # colonne date nommée "Price", "Unnamed: 0" ou "index"
+    if "Date" not in price_df.columns:
+        price_df = price_df.rename(columns={price_df.columns[0]: "Date"})
+    price_df = price_df[price_df["Date"].astype(str).str.match(r"\d")].copy()
+    price_df["Date"] = pd.to_datetime(price_df["Date"], utc=True, format="ISO8601")
+    for col in price_df.columns.drop("Date"):
+        price_df[col] = pd.to_numeric(price_df[col], errors="coerce")
+    price_df["Date"] = price_df["Date"].dt.date
+    return price_df.reset_index(drop=True)
+
+def normalize_sentiment_frame(sentiment_df, date_col="date"):
+    sentiment_df = sentiment_df.copy()
+    if date_col not in sentiment_df.columns and "created_utc" in sentiment_df.columns:
+        sentiment_df[date_col] = sentiment_df["created_utc"]
+    sentiment_df[date_col] = pd.to_datetime(sentiment_df[date_col]).dt.date
+    return sentiment_df
+
+def _normalize(dataset, df):
+    if dataset == "prices":
+        return normalize_price_frame(df)
+    return normalize_sentiment_frame(df, DATASETS[dataset]["date_col"])
+
+# --------------- ÉCRITURE --------------- #
+
+def store_dir(data_dir):
+    return Path(data_dir) / STORE_DIRNAME
+
+def write_dataset(data_dir, dataset, df, asset, period=None):
+    config = DATASETS[dataset]
+    df = _normalize(dataset, df).assign(asset=asset)
+    if "period" in config["partitions"]:
+        df = df.assign(period=period)
+    if "year" in config["partitions"]:
+        df = df.assign(year=pd.to_datetime(df[config["date_col"]]).dt.year)
+
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    partition_schema = pa.schema([table.schema.field(p) for p in config["partitions"]])
+    ds.write_dataset(
+        table,
+        str(store_dir(data_dir) / dataset),
+        format="parquet",
+        partitioning=ds.partitioning(partition_schema, flavor="hive"),
+        existing_data_behavior="delete_matching",
+        filesystem=_LOCAL_FS,
+    )
+
+# --------------- LECTURE --------------- #
+
+def read_dataset(data_dir, dataset, asset, period=None, start=None, end=None, columns=None):
+    # Predicate pushdown : partitions élaguées (actif, période, année)
+    # puis row groups filtrés sur la plage de dates
+    config = DATASETS[dataset]
+    date_field = ds.field(config["date_col"])
+    expr = ds.field("asset") == asset
+    if period is not None and "period" in config["partitions"]:
+        expr &= ds.field("period") == period
+    if start is not None:
+        expr &= date_field >= pa.scalar(start, pa.date32())
+        if "year" in config["partitions"]:
+            expr &= ds.field("year") >= start.year
+    if end is not None:
+        expr &= date_field <= pa.scalar(end, pa.date32())
+        if "year" in config["partitions"]:
+            expr &= ds.field("year") <= end.year
+
+    dataset_obj = ds.dataset(
+        str(store_dir(data_dir) / dataset), format="parquet",
+        partitioning="hive", filesystem=_LOCAL_FS
+    )
+    if columns is not None:
+        columns = list(dict.fromkeys([*columns, config["date_col"]]))
+    table = dataset_obj.to_table(columns=columns, filter=expr)
+    df = table.to_pandas()
+    df = df.drop(columns=[c for c in config["partitions"] if c in df.columns])
+    return df.sort_values(config["date_col"]).reset_index(drop=True)
+
+def load_manifest(data_dir):
+    path = store_dir(data_dir) / MANIFEST_NAME
+    if not path.exists():
+        return {}
+    with open(path) as f:
+        return json.load(f)
+
+@instrument("read_frame", rows=len)
+def read_frame(csv_path, start=None, end=None, columns=None):
+    # Lit depuis le store Parquet si le CSV a été migré, sinon depuis le CSV.
+    # Dans les deux cas les dates sont déjà des objets date.
+    csv_path = Path(csv_path)
+    entry = load_manifest(csv_path.parent).get(csv_path.name)
+    # Un CSV réécrit après la migration (scraping incrémental, ...) fait foi
+    stale = entry is not None and csv_path.exists() and csv_path.stat().st_mtime > entry["csv_mtime"]
+    if entry is not None and not stale:
+        return read_dataset(
+            csv_path.parent, entry["dataset"], entry["asset"], entry.get("period"),
+            start=start, end=end, columns=columns
+        )
+
+    dataset = classify_csv(csv_path.name)
+    dataset = dataset[0] if dataset else "daily_sentiment"
+    df = _normalize(dataset, pd.read_csv(csv_path))
+    date_col = DATASETS[dataset]["date_col"]
+    if start is not None:
+        df = df[df[date_col] >= start]
+    if end is not None:
+        df = df[df[date_col] <= end]
+    if columns is not None:
+        df = df[columns]
+    return df.reset_index(drop=True)
+
+# --------------- MIGRATION CSV → PARQUET --------------- #
+
+def classify_csv(filename):
+    # Retourne (dataset, asset, période) d'après les conventions de nommage de data/
+    stem = Path(filename).stem
+    m = re.fullmatch(r"([a-z]+)_prices", stem)
+    if m:
+        return "prices", m.group(1).upper(), None
+
+    for prefix, dataset in [("daily_sentiment", "daily_sentiment"), ("reddit", "reddit_posts")]:
+        if stem != prefix and not stem.startswith(prefix + "_"):
+            continue
+        rest = stem[len(prefix) + 1:]
+        head, _, tail = rest.partition("_")
+        if head in KNOWN_ASSETS:
+            return dataset, head, tail or "full"
+        if dataset == "daily_sentiment":
+            # Fichiers historiques sans actif (daily_sentiment.csv, daily_sentiment_full.csv, ...)
+            return dataset, "UNTAGGED", rest or "default"
+    return None
+
+def migrate_csvs(data_dir="data"):
+    data_dir = Path(data_dir)
+    manifest = load_manifest(data_dir)
+    for csv_path in sorted(data_dir.glob("*.csv")):
+        target = classify_csv(csv_path.name)
+        if target is None:
+            print(f"⏭️ Ignoré : {csv_path.name}")
+            continue
+        dataset, asset, period = target
+        write_dataset(data_dir, dataset, pd.read_csv(csv_path), asset, period)
+        manifest[csv_path.name] = {
+            "dataset": dataset, "asset": asset, "period": period,
+            "csv_mtime": csv_path.stat().st_mtime,
+        }
+        print(f"✅ {csv_path.name} → {dataset} (asset={asset}, period={period})")
+
+    store_dir(data_dir).mkdir(parents=True, exist_ok=True)
+    with open(store_dir(data_dir) / MANIFEST_NAME, "w") as f:
+        json.dump(manifest, f, indent=2)
+    return manifest
+
+if __name__ == "__main__":
+    migrate_csvs()
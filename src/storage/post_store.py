@@ -0,0 +1,234 @@
+import argparse
+import json
+import os
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+from pandas.api.types import union_categoricals
+
+from src.config import ASSETS, PERIODS
+from src.instrumentation import measure
+from src.storage.market_data import DATA_DIR
+from src.storage.parquet_store import store_dir
+
+# Posts Reddit bruts stockés une seule fois (clé : id), quel que soit le nombre de
+# fichiers reddit_<ASSET>_<période> qui les contiennent :
+# - subreddit, titres, selftext, fil de commentaires : catégories (dictionnaire,
+#   textes répétés stockés une fois : selftext vides, [removed], reposts)
+# - appartenance aux (actif, période) : un bit par couple dans un entier
+# - full_text, clean_text, date : dérivés à la lecture (frame), jamais stockés
+
+# --------------- CONFIG --------------- #
+
+POSTS_FILENAME = "posts.parquet"
+KEYS_METADATA = b"post_store_keys"
+
+CATEGORICAL_COLUMNS = ["subreddit", "title", "selftext", "kind", "link_id", "parent_id"]
+# Renseignées seulement par la collecte asynchrone (commentaires)
+OPTIONAL_COLUMNS = ["kind", "link_id", "parent_id"]
+
+MEMBERSHIP_DTYPES = (np.uint8, np.uint16, np.uint32, np.uint64)
+
+def route_keys(assets=ASSETS, periods=PERIODS):
+    return [(asset, period_name) for asset in assets for period_name in periods]
+
+def membership_dtype(n_keys):
+    for dtype in MEMBERSHIP_DTYPES:
+        if n_keys <= np.iinfo(dtype).bits:
+            return dtype
+    raise ValueError(f"❌ {n_keys} couples (actif, période) : 64 au maximum")
+
+def store_path(data_dir=DATA_DIR):
+    return store_dir(data_dir) / POSTS_FILENAME
+
+def raw_csv_path(asset, period_name, data_dir=DATA_DIR):
+    return Path(data_dir) / f"reddit_{asset}_{period_name}.csv"
+
+# --------------- ENCODAGE --------------- #
+
+def as_category(values):
+    # Catégories toujours en str (même colonne vide) : union_categoricals reste possible
+    return pd.Series(values, dtype="str").astype("category")
+
+def compact_posts(df):
+    # Colonnes brutes (submission_to_post + sentiment) → types compacts
+    n = len(df)
+    out = pd.DataFrame({"id": pd.Series(df["id"], dtype="str").to_numpy()})
+    out["created_utc"] = pd.to_datetime(df["created_utc"]).to_numpy().astype("datetime64[s]")
+    out["score"] = df["score"].to_numpy(dtype=np.int32)
+    out["num_comments"] = df["num_comments"].to_numpy(dtype=np.int32)
+    for column in CATEGORICAL_COLUMNS:
+        values = df[column].to_numpy() if column in df.columns else [None] * n
+        out[column] = as_category(values).array
+    # Compound VADER arrondi à 4 décimales : float32 suffit, arrondi rétabli à la lecture
+    out["sentiment"] = df["sentiment"].to_numpy(dtype=np.float32)
+    return out
+
+def concat_posts(stored, new):
+    columns = {}
+    for column in stored.columns:
+        if column in CATEGORICAL_COLUMNS:
+            columns[column] = union_categoricals([stored[column], new[column]], ignore_order=True)
+        else:
+            columns[column] = np.concatenate([stored[column].to_numpy(), new[column].to_numpy()])
+    return pd.DataFrame(columns)
+
+def derive_clean_text(full_text):
+    # clean_text une fois par texte distinct
+    from src.data_collection.build_asset_datasets import clean_text
+
+    codes, uniques = pd.factorize(full_text)
+    with measure("clean_text", rows=len(uniques)):
+        cleaned = uniques.map(clean_text)
+    return pd.Series(cleaned, dtype="str").take(codes).reset_index(drop=True)
+
+# --------------- STORE --------------- #
+
+class PostStore:
+    # Un post par id ; bit i de membership = présent dans le fichier de keys[i]
+
+    def __init__(self, keys=None, posts=None):
+        self.keys = [tuple(key) for key in (route_keys() if keys is None else keys)]
+        self.bits = {key: i for i, key in enumerate(self.keys)}
+        self.dtype = membership_dtype(len(self.keys))
+        self.posts = posts
+
+    def __len__(self):
+        return 0 if self.posts is None else len(self.posts)
+
+    def add(self, posts_by_key):
+        # posts_by_key : {(actif, période): posts}, comme ingest_all. Les posts déjà connus
+        # ne gagnent qu'un bit ; les nouveaux sont scorés une seule fois si besoin.
+        frames = []
+        for key, posts in posts_by_key.items():
+            df = pd.DataFrame(posts)
+            if not df.empty:
+                frames.append(df.assign(membership=self.dtype(1) << self.dtype(self.bits[tuple(key)])))
+        if not frames:
+            return 0
+        incoming = pd.concat(frames, ignore_index=True)
+
+        codes, ids = pd.factorize(incoming["id"].astype("str"))
+        membership = np.zeros(len(ids), dtype=self.dtype)
+        np.bitwise_or.at(membership, codes, incoming["membership"].to_numpy(dtype=self.dtype))
+        first = incoming.drop_duplicates("id").reset_index(drop=True)
+
+        known = np.zeros(len(ids), dtype=bool)
+        if self.posts is not None:
+            position = pd.Index(self.posts["id"]).get_indexer(ids)
+            known = position >= 0
+            stored = self.posts["membership"].to_numpy(copy=True)
+            stored[position[known]] |= membership[known]
+            self.posts["membership"] = stored
+
+        new = first[~known]
+        if new.empty:
+            return 0
+        if "sentiment" not in new.columns:
+            from src.data_collection.build_asset_datasets import score_posts
+            new = score_posts(new.drop(columns="membership").to_dict("records"))
+        new = compact_posts(new).assign(membership=membership[~known])
+        self.posts = new if self.posts is None else concat_posts(self.posts, new)
+        return len(new)
+
+    def mask(self, asset, period_name):
+        bit = self.dtype(1) << self.dtype(self.bits[(asset, period_name)])
+        return (self.posts["membership"].to_numpy() & bit) != 0
+
+    def counts(self):
+        # Nombre de posts par (actif, période) : lignes de l'ancien format
+        return {key: int(self.mask(*key).sum()) for key in self.keys} if self.posts is not None else {}
+
+    def frame(self, asset, period_name):
+        # Même colonnes que score_posts / data/reddit_<ASSET>_<période>.csv
+        if self.posts is None or (asset, period_name) not in self.bits:
+            return pd.DataFrame()
+        rows = self.posts[self.mask(asset, period_name)].reset_index(drop=True)
+        df = pd.DataFrame({
+            "id": rows["id"],
+            "title": rows["title"].astype("str"),
+            "selftext": rows["selftext"].astype("str"),
+            "score": rows["score"].astype(np.int64),
+            "num_comments": rows["num_comments"].astype(np.int64),
+            "created_utc": rows["created_utc"].astype("datetime64[us]"),
+            "subreddit": rows["subreddit"].astype("str"),
+        })
+        for column in OPTIONAL_COLUMNS:
+            if rows[column].notna().any():
+                df[column] = rows[column].astype("str")
+        df["full_text"] = df["title"].fillna("") + " " + df["selftext"].fillna("")
+        df["clean_text"] = derive_clean_text(df["full_text"])
+        df["sentiment"] = rows["sentiment"].astype(np.float64).round(4)
+        df["date"] = df["created_utc"].dt.date
+        return df
+
+    def memory_usage(self):
+        return 0 if self.posts is None else int(self.posts.memory_usage(deep=True).sum())
+
+    # --------------- PERSISTANCE --------------- #
+
+    def save(self, path=None):
+        path = Path(path or store_path())
+        path.parent.mkdir(parents=True, exist_ok=True)
+        table = pa.Table.from_pandas(self.posts, preserve_index=False)
+        table = table.replace_schema_metadata({**table.schema.metadata, KEYS_METADATA: json.dumps(self.keys).encode()})
+        tmp_path = path.with_name(path.name + ".tmp")
+        pq.write_table(table, tmp_path)
+        os.replace(tmp_path, path)
+        return path
+
+    @classmethod
+    def load(cls, path=None):
+        table = pq.read_table(path or store_path())
+        keys = json.loads(table.schema.metadata[KEYS_METADATA])
+        posts = table.to_pandas()
+        # Parquet : horodatages en ms et catégories vides relues en object
+        posts["created_utc"] = posts["created_utc"].to_numpy().astype("datetime64[s]")
+        for column in CATEGORICAL_COLUMNS:
+            posts[column] = posts[column].cat.set_categories(posts[column].cat.categories.astype("str"))
+        return cls(keys, posts)
+
+    @classmethod
+    def from_csvs(cls, data_dir=DATA_DIR, assets=ASSETS, periods=PERIODS):
+        # Migration depuis les fichiers reddit_<ASSET>_<période>.csv (déjà scorés)
+        store = cls(route_keys(assets, periods))
+        for key in store.keys:
+            path = raw_csv_path(*key, data_dir)
+            if path.exists():
+                store.add({key: pd.read_csv(path, dtype={"id": str})})
+        return store
+
+# --------------- RAPPORT MÉMOIRE --------------- #
+
+def memory_report(store, csv_bytes, csv_rows):
+    # Comparaison avec l'ancien format (un DataFrame par fichier, textes dérivés stockés)
+    n = len(store)
+    per_million = 1e6 / n if n else 0.0
+    print(f"\n📊 {n:,} posts uniques, {csv_rows:,} lignes dans les fichiers par (actif, période)")
+    print(f"  Fichiers par (actif, période) : {csv_bytes / 1e6:10.1f} Mo  ({csv_bytes * per_million / 1e6:10.1f} Mo / million de posts)")
+    print(f"  Store dédupliqué              : {store.memory_usage() / 1e6:10.1f} Mo  "
+          f"({store.memory_usage() * per_million / 1e6:10.1f} Mo / million de posts)  "
+          f"x{csv_bytes / max(store.memory_usage(), 1):.1f}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Store des posts Reddit bruts : un post par id, appartenance en bits")
+    parser.add_argument("--data-dir", default=str(DATA_DIR))
+    args = parser.parse_args()
+
+    store = PostStore.from_csvs(args.data_dir)
+    if not len(store):
+        print(f"⚠️ Aucun fichier reddit_<ASSET>_<période>.csv dans {args.data_dir}")
+    else:
+        csv_bytes, csv_rows = 0, 0
+        for key in store.keys:
+            path = raw_csv_path(*key, args.data_dir)
+            if path.exists():
+                df = pd.read_csv(path)
+                csv_bytes += int(df.memory_usage(deep=True).sum())
+                csv_rows += len(df)
+        path = store.save(store_path(args.data_dir))
+        print(f"✅ Store enregistré → {path}")
+        memory_report(store, csv_bytes, csv_rows)